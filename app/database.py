@@ -1,5 +1,5 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 from sqlalchemy.orm import sessionmaker
 
 # Define the database URL. 
@@ -16,3 +16,16 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 class Base(DeclarativeBase):
     pass
+
+def identificador_bd(db: Session) -> str:
+    """
+    Identifica la base de datos de una sesión, para las cachés de proceso.
+
+    Es la URL sin contraseña; las bases de datos SQLite en memoria son una
+    por engine, así que se distinguen además por el engine.
+    """
+    engine_sesion = db.get_bind().engine
+    url = engine_sesion.url
+    if url.database in (None, "", ":memory:"):
+        return f"{url.render_as_string()}#{id(engine_sesion)}"
+    return url.render_as_string()
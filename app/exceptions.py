@@ -17,3 +17,40 @@ class EjercicioCerradoError(Exception):
 class EjercicioNoEncontradoError(Exception):
     """Excepción lanzada cuando no se encuentra un ejercicio fiscal válido para la fecha."""
     pass
+
+class ImporteFueraDeRangoError(Exception):
+    """Excepción lanzada cuando un importe no cabe en el rango monetario soportado."""
+    def __init__(self, importe):
+        self.importe = importe
+        super().__init__(f"El importe {importe} está fuera del rango permitido")
+
+class EjercicioAbiertoError(Exception):
+    """Excepción lanzada cuando una operación requiere un ejercicio cerrado."""
+    pass
+
+class EjercicioArchivadoError(Exception):
+    """Excepción lanzada cuando se intenta operar sobre un ejercicio ya archivado."""
+    pass
+
+class TipoCambioNoEncontradoError(Exception):
+    """Excepción lanzada cuando no hay tipo de cambio publicado para una divisa y fecha."""
+    def __init__(self, moneda: str, fecha):
+        self.moneda = moneda
+        self.fecha = fecha
+        super().__init__(f"No hay tipo de cambio de {moneda} vigente el {fecha}")
+
+class ClaveIdempotenciaReutilizadaError(Exception):
+    """Excepción lanzada cuando una clave de idempotencia llega con un contenido distinto del registrado."""
+    def __init__(self, clave: str):
+        self.clave = clave
+        super().__init__(f"La clave de idempotencia '{clave}' ya se usó para un asiento distinto")
+
+class ConflictoCadenaError(Exception):
+    """Excepción lanzada cuando registros concurrentes impiden encadenar un asiento tras varios reintentos."""
+    def __init__(self, ejercicio_id):
+        self.ejercicio_id = ejercicio_id
+        super().__init__(f"No se pudo encadenar el asiento en el ejercicio {ejercicio_id}: registros concurrentes")
+
+class CursorInvalidoError(Exception):
+    """Excepción lanzada cuando un cursor de paginación está corrupto o es de otro listado."""
+    pass
@@ -4,3 +4,8 @@ from .cuenta import CuentaContable
 from .tercero import Tercero
 from .asiento import Asiento
 from .apunte import ApunteContable
+from .cadena_hash import PuntoControlCadena
+from .activo_fijo import ActivoFijo
+from .tipo_cambio import TipoCambio
+from .evento_contable import EventoContable
+from . import busqueda  # Índice de texto completo (DDL ligada a apuntes_contables)
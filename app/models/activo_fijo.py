@@ -0,0 +1,49 @@
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import ForeignKey, Date, String, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
+class ActivoFijo(Base):
+    """
+    Modelo que representa un elemento del inmovilizado (grupo 2 del PGC)
+    sujeto a amortización.
+
+    Attributes:
+        id (int): Identificador único.
+        empresa_id (int): ID de la empresa propietaria.
+        codigo (str): Código interno del activo en el registro. Único.
+        descripcion (str): Descripción del activo.
+        cuenta_amortizacion_id (int): Cuenta de amortización acumulada (281x), al Haber.
+        cuenta_gasto_id (int): Cuenta de dotación a la amortización (681x), al Debe.
+        fecha_alta (date): Fecha de puesta en funcionamiento (se amortiza desde ese mes).
+        fecha_baja (date): Fecha de baja; no se amortiza a partir del mes siguiente.
+        valor_adquisicion (Decimal): Precio de adquisición o coste de producción.
+        valor_residual (Decimal): Importe que no se amortiza.
+        vida_util_meses (int): Vida útil en meses.
+        metodo (str): Método de amortización ("lineal" o "digitos").
+        amortizacion_acumulada (Decimal): Total ya contabilizado como amortización.
+    """
+    __tablename__ = "activos_fijos"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    empresa_id: Mapped[int] = mapped_column(ForeignKey("empresas.id"), index=True)
+    codigo: Mapped[str] = mapped_column(String(20), unique=True, index=True)
+    descripcion: Mapped[str] = mapped_column(String(200))
+    cuenta_amortizacion_id: Mapped[int] = mapped_column(ForeignKey("cuentas_contables.id"))
+    cuenta_gasto_id: Mapped[int] = mapped_column(ForeignKey("cuentas_contables.id"))
+    fecha_alta: Mapped[date] = mapped_column(Date)
+    fecha_baja: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    valor_adquisicion: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    valor_residual: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
+    vida_util_meses: Mapped[int] = mapped_column(Integer)
+    metodo: Mapped[str] = mapped_column(String(20), default="lineal")
+    amortizacion_acumulada: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
+
+    # Relaciones
+    cuenta_amortizacion: Mapped["CuentaContable"] = relationship(foreign_keys=[cuenta_amortizacion_id])
+    cuenta_gasto: Mapped["CuentaContable"] = relationship(foreign_keys=[cuenta_gasto_id])
+
+    def __repr__(self) -> str:
+        return f"<ActivoFijo(codigo='{self.codigo}', metodo='{self.metodo}')>"
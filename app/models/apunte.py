@@ -1,6 +1,7 @@
+from datetime import date
 from decimal import Decimal
-from typing import Optional
-from sqlalchemy import ForeignKey, String, Numeric
+from typing import Any, Optional
+from sqlalchemy import ForeignKey, Date, String, Numeric, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from app.database import Base
 
@@ -15,8 +16,20 @@ class ApunteContable(Base):
         descripcion (str): Descripción del apunte.
         debe (Decimal): Importe al Debe.
         haber (Decimal): Importe al Haber.
+        moneda (str): Código ISO 4217 si el apunte se origina en divisa (NULL = euros).
+        importe_divisa (Decimal): Importe en divisa con signo (positivo al Debe, negativo al Haber).
+        ejercicio_id (int): Copia del ejercicio del asiento.
+        fecha (date): Copia de la fecha del asiento.
+        numero (int): Copia del número del asiento (se actualiza al renumerar).
     """
     __tablename__ = "apuntes_contables"
+    __table_args__ = (
+        # Mayor de una cuenta en un ejercicio, en el orden del mayor (paginación por clave)
+        Index(
+            "ix_apuntes_contables_cuenta_ejercicio_fecha_numero_id",
+            "cuenta_id", "ejercicio_id", "fecha", "numero", "id"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     asiento_id: Mapped[int] = mapped_column(ForeignKey("asientos.id"), index=True)
@@ -24,6 +37,13 @@ class ApunteContable(Base):
     descripcion: Mapped[str] = mapped_column(String(255))
     debe: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
     haber: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
+    moneda: Mapped[Optional[str]] = mapped_column(String(3), nullable=True)
+    importe_divisa: Mapped[Optional[Decimal]] = mapped_column(Numeric(12, 2), nullable=True)
+    # Desnormalizados del asiento para ordenar y filtrar el mayor sin cruzar con
+    # asientos; sin FK propia (la de asiento_id ya garantiza el ejercicio)
+    ejercicio_id: Mapped[int] = mapped_column()
+    fecha: Mapped[date] = mapped_column(Date)
+    numero: Mapped[int] = mapped_column()
 
     # Relaciones
     asiento: Mapped["Asiento"] = relationship(back_populates="apuntes")
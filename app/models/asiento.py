@@ -1,6 +1,6 @@
 from datetime import date
 from typing import List, Optional
-from sqlalchemy import ForeignKey, Date, String, Integer
+from sqlalchemy import ForeignKey, Date, String, Integer, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -15,8 +15,18 @@ class Asiento(Base):
         numero (int): Número secuencial del asiento dentro del ejercicio.
         fecha (date): Fecha del asiento.
         concepto (str): Descripción general del asiento.
+        posicion_cadena (int): Posición del asiento en la cadena de hashes del ejercicio (orden de registro).
+        hash_cadena (str): SHA-256 del contenido canónico encadenado con el asiento anterior.
+        clave_idempotencia (str): Clave única del envío (del cliente o hash del payload) para reintentos seguros.
     """
     __tablename__ = "asientos"
+    __table_args__ = (
+        UniqueConstraint("ejercicio_id", "posicion_cadena"),
+        # Orden cronológico del libro diario (renumeración al cierre)
+        Index("ix_asientos_ejercicio_fecha_id", "ejercicio_id", "fecha", "id"),
+        # Orden de consulta del diario (paginación por clave)
+        Index("ix_asientos_ejercicio_fecha_numero_id", "ejercicio_id", "fecha", "numero", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     ejercicio_id: Mapped[int] = mapped_column(ForeignKey("ejercicios_fiscales.id"), index=True)
@@ -24,6 +34,9 @@ class Asiento(Base):
     numero: Mapped[int] = mapped_column(Integer, index=True)
     fecha: Mapped[date] = mapped_column(Date, index=True)
     concepto: Mapped[str] = mapped_column(String(255))
+    posicion_cadena: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    hash_cadena: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    clave_idempotencia: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, unique=True, index=True)
 
     # Relaciones
     ejercicio: Mapped["EjercicioFiscal"] = relationship(back_populates="asientos")
@@ -0,0 +1,110 @@
+"""
+Índice de texto completo sobre Asiento.concepto y ApunteContable.descripcion.
+
+No es un modelo ORM: la tabla `busqueda_apuntes` (una fila por apunte) se crea
+junto a `apuntes_contables` y se mantiene sincronizada mediante triggers, de
+modo que cualquier escritura (ORM, Core o SQL directo) queda indexada.
+
+- SQLite: tabla virtual FTS5 (rowid = apuntes_contables.id).
+- PostgreSQL: tabla con columna tsvector e índice GIN.
+"""
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import DDL, event
+from sqlalchemy.engine import Connection
+
+from app.models.apunte import ApunteContable
+
+TABLA_BUSQUEDA = "busqueda_apuntes"
+
+TRIGGERS_SQLITE = ("tr_busqueda_apuntes_ai", "tr_busqueda_apuntes_au", "tr_busqueda_apuntes_ad", "tr_busqueda_asientos_au")
+
+DDL_TRIGGERS_SQLITE = [
+    """CREATE TRIGGER IF NOT EXISTS tr_busqueda_apuntes_ai AFTER INSERT ON apuntes_contables BEGIN
+        INSERT INTO busqueda_apuntes (rowid, concepto, descripcion)
+        SELECT NEW.id, a.concepto, NEW.descripcion FROM asientos a WHERE a.id = NEW.asiento_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tr_busqueda_apuntes_au AFTER UPDATE OF descripcion, asiento_id ON apuntes_contables BEGIN
+        DELETE FROM busqueda_apuntes WHERE rowid = OLD.id;
+        INSERT INTO busqueda_apuntes (rowid, concepto, descripcion)
+        SELECT NEW.id, a.concepto, NEW.descripcion FROM asientos a WHERE a.id = NEW.asiento_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tr_busqueda_apuntes_ad AFTER DELETE ON apuntes_contables BEGIN
+        DELETE FROM busqueda_apuntes WHERE rowid = OLD.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tr_busqueda_asientos_au AFTER UPDATE OF concepto ON asientos BEGIN
+        UPDATE busqueda_apuntes SET concepto = NEW.concepto
+        WHERE rowid IN (SELECT id FROM apuntes_contables WHERE asiento_id = NEW.id);
+    END""",
+]
+
+DDL_SQLITE = [
+    # remove_diacritics: "facturacion" encuentra "facturación"
+    """CREATE VIRTUAL TABLE IF NOT EXISTS busqueda_apuntes USING fts5(
+        concepto, descripcion, tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    *DDL_TRIGGERS_SQLITE,
+]
+
+DDL_POSTGRESQL = [
+    """CREATE TABLE IF NOT EXISTS busqueda_apuntes (
+        apunte_id INTEGER PRIMARY KEY REFERENCES apuntes_contables (id) ON DELETE CASCADE,
+        documento TSVECTOR NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_busqueda_apuntes_documento ON busqueda_apuntes USING GIN (documento)",
+    # El concepto del asiento pesa más (A) que la descripción del apunte (B)
+    """CREATE OR REPLACE FUNCTION busqueda_apuntes_sync() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO busqueda_apuntes (apunte_id, documento)
+        SELECT NEW.id,
+               setweight(to_tsvector('spanish', a.concepto), 'A')
+               || setweight(to_tsvector('spanish', NEW.descripcion), 'B')
+        FROM asientos a WHERE a.id = NEW.asiento_id
+        ON CONFLICT (apunte_id) DO UPDATE SET documento = EXCLUDED.documento;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER tr_busqueda_apuntes AFTER INSERT OR UPDATE OF descripcion, asiento_id
+        ON apuntes_contables FOR EACH ROW EXECUTE FUNCTION busqueda_apuntes_sync()""",
+    """CREATE OR REPLACE FUNCTION busqueda_asientos_sync() RETURNS trigger AS $$
+    BEGIN
+        UPDATE busqueda_apuntes b
+        SET documento = setweight(to_tsvector('spanish', NEW.concepto), 'A')
+                        || setweight(to_tsvector('spanish', ap.descripcion), 'B')
+        FROM apuntes_contables ap
+        WHERE ap.asiento_id = NEW.id AND b.apunte_id = ap.id;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER tr_busqueda_asientos AFTER UPDATE OF concepto
+        ON asientos FOR EACH ROW EXECUTE FUNCTION busqueda_asientos_sync()""",
+]
+
+for _sentencia in DDL_SQLITE:
+    event.listen(ApunteContable.__table__, "after_create", DDL(_sentencia).execute_if(dialect="sqlite"))
+for _sentencia in DDL_POSTGRESQL:
+    event.listen(ApunteContable.__table__, "after_create", DDL(_sentencia).execute_if(dialect="postgresql"))
+
+event.listen(
+    ApunteContable.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS busqueda_apuntes").execute_if(dialect=("sqlite", "postgresql"))
+)
+
+
+@contextmanager
+def sin_triggers_busqueda(conexion: Connection) -> Iterator[None]:
+    """
+    Retira los triggers de búsqueda de SQLite durante un batch de Alembic sobre asientos o apuntes.
+
+    El modo batch recrea la tabla (copia, DROP y RENAME) y SQLite rechaza el
+    RENAME mientras haya triggers que referencian la tabla original. Los
+    triggers se vuelven a crear al salir; en otros motores no hace nada.
+    """
+    if conexion.dialect.name != "sqlite":
+        yield
+        return
+    for trigger in TRIGGERS_SQLITE:
+        conexion.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    yield
+    for sentencia in DDL_TRIGGERS_SQLITE:
+        conexion.exec_driver_sql(sentencia)
@@ -0,0 +1,29 @@
+from sqlalchemy import ForeignKey, String, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class PuntoControlCadena(Base):
+    """
+    Punto de control de la cadena de hashes de asientos de un ejercicio.
+
+    Se guarda uno cada N asientos encadenados. Cada tramo entre dos puntos de
+    control puede verificarse de forma independiente (y en paralelo).
+
+    Attributes:
+        id (int): Identificador único.
+        ejercicio_id (int): ID del ejercicio fiscal de la cadena.
+        posicion (int): Posición en la cadena del último asiento incluido.
+        asiento_id (int): ID del asiento en esa posición.
+        hash_cadena (str): Hash encadenado (SHA-256 hex) en esa posición.
+    """
+    __tablename__ = "puntos_control_cadena"
+    __table_args__ = (UniqueConstraint("ejercicio_id", "posicion"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    ejercicio_id: Mapped[int] = mapped_column(ForeignKey("ejercicios_fiscales.id"))
+    posicion: Mapped[int] = mapped_column(Integer)
+    asiento_id: Mapped[int] = mapped_column(ForeignKey("asientos.id"))
+    hash_cadena: Mapped[str] = mapped_column(String(64))
+
+    def __repr__(self) -> str:
+        return f"<PuntoControlCadena(ejercicio_id={self.ejercicio_id}, posicion={self.posicion})>"
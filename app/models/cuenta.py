@@ -1,5 +1,5 @@
 from typing import List, Optional
-from sqlalchemy import String, Integer, ForeignKey
+from sqlalchemy import String, Integer, ForeignKey, literal_column
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -13,6 +13,7 @@ class CuentaContable(Base):
         codigo (str): Código de la cuenta (ej. "430", "572"). Único.
         descripcion (str): Nombre o descripción de la cuenta.
         parent_id (int): ID de la cuenta padre (para jerarquía).
+        revision (int): Se incrementa en cada UPDATE; invalida el mapeo de estados financieros.
     """
     __tablename__ = "cuentas_contables"
 
@@ -20,6 +21,9 @@ class CuentaContable(Base):
     codigo: Mapped[str] = mapped_column(String(20), unique=True, index=True)
     descripcion: Mapped[str] = mapped_column(String(200))
     parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("cuentas_contables.id"))
+    revision: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", onupdate=literal_column("revision + 1")
+    )
 
     # Relaciones
     parent: Mapped[Optional["CuentaContable"]] = relationship(
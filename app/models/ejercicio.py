@@ -1,6 +1,6 @@
 from datetime import date
 from typing import List
-from sqlalchemy import ForeignKey, Date, Boolean
+from sqlalchemy import ForeignKey, Date, Boolean, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -14,6 +14,7 @@ class EjercicioFiscal(Base):
         fecha_inicio (date): Fecha de inicio del ejercicio.
         fecha_fin (date): Fecha de fin del ejercicio.
         estado (bool): Estado del ejercicio (True=Abierto, False=Cerrado).
+        archivado (bool): Sus asientos se han movido al archivo en frío (ver ArchivoService).
     """
     __tablename__ = "ejercicios_fiscales"
 
@@ -22,6 +23,7 @@ class EjercicioFiscal(Base):
     fecha_inicio: Mapped[date] = mapped_column(Date)
     fecha_fin: Mapped[date] = mapped_column(Date)
     estado: Mapped[bool] = mapped_column(Boolean, default=True, comment="True=Abierto, False=Cerrado")
+    archivado: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
 
     # Relaciones
     empresa: Mapped["Empresa"] = relationship(back_populates="ejercicios")
@@ -0,0 +1,37 @@
+from typing import Any, Optional
+from sqlalchemy import BigInteger, ForeignKey, Index, String, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class EventoContable(Base):
+    """
+    Evento de la bandeja de salida (outbox) para consumidores externos.
+
+    Se inserta en la misma transacción que el cambio que describe, de modo
+    que un evento existe si y solo si su cambio se confirmó. Los consumidores
+    avanzan por (transaccion, id), el orden en que se hacen visibles.
+
+    Attributes:
+        id (int): Secuencia del evento (nunca se reutiliza, ni tras purgar).
+        tipo (str): Tipo de evento (p. ej. asiento_registrado).
+        ejercicio_id (int): ID del ejercicio fiscal afectado.
+        asiento_id (int): ID del asiento, en eventos de un asiento (sin FK: el archivo borra asientos).
+        carga (dict): Contenido del evento (JSON).
+        transaccion (int): Id de la transacción que lo insertó en PostgreSQL (0 en SQLite).
+    """
+    __tablename__ = "eventos_contables"
+    __table_args__ = (
+        Index("ix_eventos_contables_transaccion_id", "transaccion", "id"),
+        # AUTOINCREMENT en SQLite: sin él, purgar los últimos eventos permitiría reutilizar sus ids
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    tipo: Mapped[str] = mapped_column(String(40))
+    ejercicio_id: Mapped[int] = mapped_column(ForeignKey("ejercicios_fiscales.id"))
+    asiento_id: Mapped[Optional[int]] = mapped_column(nullable=True)
+    carga: Mapped[dict[str, Any]] = mapped_column(JSON)
+    transaccion: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+
+    def __repr__(self) -> str:
+        return f"<EventoContable(id={self.id}, tipo='{self.tipo}', asiento_id={self.asiento_id})>"
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlalchemy import String, Integer, ForeignKey
+from sqlalchemy import String, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -14,6 +14,10 @@ class Tercero(Base):
         cuenta_contable_id (int): ID de la cuenta contable asociada (ej. 430xxxx, 400xxxx).
     """
     __tablename__ = "terceros"
+    __table_args__ = (
+        # Listado alfabético (paginación por clave)
+        Index("ix_terceros_nombre_id", "nombre", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     nif: Mapped[str] = mapped_column(String(20), unique=True, index=True)
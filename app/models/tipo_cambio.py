@@ -0,0 +1,33 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import String, Date, Integer, Numeric, UniqueConstraint, literal_column
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class TipoCambio(Base):
+    """
+    Modelo que representa el tipo de cambio de una divisa frente al euro en una fecha.
+
+    Sigue la convención del BCE: unidades de divisa por 1 EUR
+    (importe en euros = importe en divisa / tipo).
+
+    Attributes:
+        id (int): Identificador único.
+        moneda (str): Código ISO 4217 de la divisa (ej. USD, GBP).
+        fecha (date): Fecha de vigencia; rige hasta la siguiente fecha publicada.
+        tipo (Decimal): Unidades de divisa por euro.
+        revision (int): Se incrementa en cada UPDATE; invalida las cachés de tipos.
+    """
+    __tablename__ = "tipos_cambio"
+    __table_args__ = (UniqueConstraint("moneda", "fecha"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    moneda: Mapped[str] = mapped_column(String(3))
+    fecha: Mapped[date] = mapped_column(Date)
+    tipo: Mapped[Decimal] = mapped_column(Numeric(12, 6))
+    revision: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", onupdate=literal_column("revision + 1")
+    )
+
+    def __repr__(self) -> str:
+        return f"<TipoCambio(moneda='{self.moneda}', fecha='{self.fecha}', tipo={self.tipo})>"
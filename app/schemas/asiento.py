@@ -1,14 +1,37 @@
+import hashlib
+import json
 from datetime import date
 from decimal import Decimal
-from typing import List
-from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Sequence, Tuple
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, model_validator
+
+DESCRIPCION_MAX = 255
+CLAVE_IDEMPOTENCIA_MAX = 64
 
 class ApunteCreate(BaseModel):
     """Schema for creating a new Apunte."""
     cuenta_codigo: str = Field(..., description="Código de la cuenta contable")
     debe: Decimal = Field(default=Decimal("0.0"), ge=0, decimal_places=2)
     haber: Decimal = Field(default=Decimal("0.0"), ge=0, decimal_places=2)
-    descripcion: str = Field(..., max_length=255)
+    descripcion: str = Field(..., max_length=DESCRIPCION_MAX)
+    moneda: Optional[str] = Field(
+        default=None,
+        min_length=3,
+        max_length=3,
+        description="Código ISO 4217 si el apunte se origina en divisa (ej. USD, GBP)"
+    )
+    importe_divisa: Optional[Decimal] = Field(
+        default=None,
+        decimal_places=2,
+        description="Importe en divisa con signo (positivo al Debe, negativo al Haber). "
+                    "Si debe y haber son cero, se convierten al tipo de cambio de la fecha"
+    )
+
+    @model_validator(mode="after")
+    def validar_divisa(self) -> "ApunteCreate":
+        if (self.moneda is None) != (self.importe_divisa is None):
+            raise ValueError("moneda e importe_divisa deben indicarse juntos")
+        return self
 
 class AsientoCreate(BaseModel):
     """Schema for creating a new Asiento with its Apuntes."""
@@ -16,6 +39,11 @@ class AsientoCreate(BaseModel):
     concepto: str = Field(..., max_length=255)
     ejercicio_id: int # Optionally passed, or could be inferred from date
     apuntes: List[ApunteCreate]
+    clave_idempotencia: Optional[str] = Field(
+        default=None,
+        max_length=CLAVE_IDEMPOTENCIA_MAX,
+        description="Clave del cliente: un reintento con la misma clave devuelve el asiento original"
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -36,3 +64,75 @@ class FacturaCreate(BaseModel):
     # Para cumplir "Automáticamente los tres apuntes", pediremos cuenta tercero y cuenta base.
     cuenta_tercero: str = Field(..., description="Código de la cuenta del tercero (ej. 430, 400)")
     es_gasto: bool = Field(default=True, description="True=Factura Recibida (Gasto), False=Factura Emitida (Ingreso)")
+    clave_idempotencia: Optional[str] = Field(
+        default=None,
+        max_length=CLAVE_IDEMPOTENCIA_MAX,
+        description="Clave del cliente: un reintento con la misma clave devuelve el asiento original"
+    )
+
+
+def _canonico(valor):
+    if isinstance(valor, Decimal):
+        # Importes normalizados a céntimos: "100.0" y "100.00" son la misma factura
+        return str(valor.quantize(Decimal("0.01")))
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor)}")
+
+
+def clave_idempotencia_de(datos: BaseModel) -> str:
+    """
+    Clave de idempotencia derivada del contenido canónico de un payload.
+
+    SHA-256 (hex, 64 caracteres) del tipo de payload y sus campos, excluida la
+    propia clave. Dos envíos con el mismo contenido producen la misma clave.
+    Los campos opcionales vacíos no intervienen, así que añadir campos nuevos
+    a un esquema no altera las claves ya registradas.
+    """
+    contenido = json.dumps(
+        [type(datos).__name__, datos.model_dump(exclude={"clave_idempotencia"}, exclude_none=True)],
+        default=_canonico,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True
+    )
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+# --- Validación en bloque ---
+# El TypeAdapter compila el validador una sola vez; validar una lista completa
+# en una llamada evita el coste de construir cada modelo por separado.
+
+# Apunte ya validado para llamadores internos: (cuenta_codigo, descripcion, debe, haber)
+ApunteTupla = Tuple[str, str, Decimal, Decimal]
+# Origen en divisa de un apunte: (moneda, importe_divisa con signo)
+ApunteDivisa = Tuple[str, Decimal]
+
+_asientos_adapter: TypeAdapter[List[AsientoCreate]] = TypeAdapter(List[AsientoCreate])
+
+
+def validar_asientos(payload: Sequence[dict]) -> List[AsientoCreate]:
+    """
+    Valida en una sola llamada una lista de asientos (con sus apuntes).
+
+    Args:
+        payload: Lista de diccionarios (p. ej. JSON decodificado) con la forma de AsientoCreate.
+
+    Returns:
+        List[AsientoCreate]: Asientos validados.
+
+    Raises:
+        pydantic.ValidationError: Si algún asiento o apunte no es válido. La
+            localización del error incluye el índice del asiento afectado.
+    """
+    return _asientos_adapter.validate_python(payload)
+
+
+def validar_asientos_json(payload: bytes | str) -> List[AsientoCreate]:
+    """
+    Valida directamente un documento JSON con una lista de asientos.
+
+    Evita el paso intermedio por objetos Python (json.loads + validate).
+    """
+    return _asientos_adapter.validate_json(payload)
+
@@ -0,0 +1,272 @@
+import calendar
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from app.models.activo_fijo import ActivoFijo
+from app.models.cuenta import CuentaContable
+from app.models.ejercicio import EjercicioFiscal
+from app.services.asiento_service import AsientoService, AsientoRegistrado
+from app.services.cadena_hash_service import es_conflicto_cadena
+from app.utils.dinero import a_centimos, centimos_sql, desde_centimos
+from app.utils.perfil_memoria import marcar_etapa, perfilado
+from app.exceptions import ConflictoCadenaError, EjercicioCerradoError, EjercicioNoEncontradoError
+
+METODO_LINEAL = "lineal"
+METODO_DIGITOS = "digitos"  # Suma de dígitos decreciente (mensual)
+METODOS_AMORTIZACION = (METODO_LINEAL, METODO_DIGITOS)
+
+
+def amortizacion_acumulada_centimos(base: int, vida_util_meses: int, meses: int, metodo: str) -> int:
+    """
+    Amortización acumulada teórica (en céntimos) tras `meses` meses de vida útil.
+
+    La cuota de un mes es la diferencia entre dos acumulados consecutivos, de modo
+    que el redondeo nunca se arrastra y el último mes deja el activo exactamente
+    en su valor residual.
+
+    Args:
+        base: Base amortizable en céntimos (adquisición - residual).
+        vida_util_meses: Vida útil en meses.
+        meses: Meses transcurridos desde el alta (se limita a [0, vida útil]).
+        metodo: METODO_LINEAL o METODO_DIGITOS.
+    """
+    n = vida_util_meses
+    k = min(max(meses, 0), n)
+    if metodo == METODO_LINEAL:
+        numerador, denominador = k, n
+    elif metodo == METODO_DIGITOS:
+        # Pesos n, n-1, ..., 1: acumulado k(2n-k+1)/2 sobre n(n+1)/2
+        numerador, denominador = k * (2 * n - k + 1), n * (n + 1)
+    else:
+        raise ValueError(f"Método de amortización no válido: {metodo}")
+    # Redondeo al céntimo más próximo (mitades hacia arriba) en aritmética entera
+    return (2 * base * numerador + denominador) // (2 * denominador)
+
+
+def _meses_desde_alta(fecha_alta: date, anio: int, mes: int) -> int:
+    """Meses amortizables hasta el periodo incluido (el mes de alta cuenta entero)."""
+    return (anio - fecha_alta.year) * 12 + mes - fecha_alta.month + 1
+
+
+@dataclass(frozen=True)
+class CuotaAmortizacion:
+    """Cuota de amortización de un activo en un periodo, en céntimos."""
+    activo_id: int
+    codigo: str
+    cuenta_gasto: str
+    cuenta_amortizacion: str
+    cuota: int
+    acumulada: int
+
+
+@dataclass
+class ResultadoAmortizacion:
+    """Resultado de contabilizar la amortización de un periodo."""
+    periodo: date
+    cuotas: List[CuotaAmortizacion] = field(default_factory=list)
+    asientos: List[AsientoRegistrado] = field(default_factory=list)
+
+    @property
+    def total(self) -> Decimal:
+        return desde_centimos(sum(c.cuota for c in self.cuotas))
+
+
+class AmortizacionService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def cuadro_amortizacion(self, activo: ActivoFijo) -> List[Tuple[date, Decimal]]:
+        """
+        Plan de amortización completo del activo: (fin de mes, cuota) por mes de vida útil.
+        """
+        base = self._base_centimos(activo)
+        cuadro = []
+        anterior = 0
+        for k in range(1, activo.vida_util_meses + 1):
+            acumulada = amortizacion_acumulada_centimos(base, activo.vida_util_meses, k, activo.metodo)
+            indice = activo.fecha_alta.month - 1 + (k - 1)
+            anio, mes = activo.fecha_alta.year + indice // 12, indice % 12 + 1
+            cuadro.append((self._fin_de_mes(anio, mes), desde_centimos(acumulada - anterior)))
+            anterior = acumulada
+        return cuadro
+
+    def calcular_cuotas(self, empresa_id: int, anio: int, mes: int) -> List[CuotaAmortizacion]:
+        """
+        Calcula la cuota del periodo de todos los activos de la empresa en una pasada.
+
+        Los activos se leen con una única consulta (importes ya en céntimos desde
+        SQL, cuentas resueltas por JOIN) y las cuotas se calculan en aritmética
+        entera sin cargar objetos del ORM. La cuota es lo que falta para llegar al
+        acumulado teórico del periodo, así que un mes sin contabilizar se recupera
+        en el siguiente y repetir un periodo ya contabilizado no genera cuotas.
+        """
+        inicio_periodo = date(anio, mes, 1)
+        gasto = aliased(CuentaContable)
+        amortizacion = aliased(CuentaContable)
+        filas = self.db.execute(
+            select(
+                ActivoFijo.id,
+                ActivoFijo.codigo,
+                gasto.codigo,
+                amortizacion.codigo,
+                ActivoFijo.fecha_alta,
+                ActivoFijo.vida_util_meses,
+                ActivoFijo.metodo,
+                centimos_sql(ActivoFijo.valor_adquisicion),
+                centimos_sql(ActivoFijo.valor_residual),
+                centimos_sql(ActivoFijo.amortizacion_acumulada)
+            )
+            .join(gasto, gasto.id == ActivoFijo.cuenta_gasto_id)
+            .join(amortizacion, amortizacion.id == ActivoFijo.cuenta_amortizacion_id)
+            .where(
+                ActivoFijo.empresa_id == empresa_id,
+                ActivoFijo.fecha_alta <= self._fin_de_mes(anio, mes),
+                or_(ActivoFijo.fecha_baja.is_(None), ActivoFijo.fecha_baja >= inicio_periodo)
+            )
+            .order_by(ActivoFijo.id)
+        ).all()
+
+        cuotas = []
+        for activo_id, codigo, cuenta_gasto, cuenta_amortizacion, fecha_alta, vida, metodo, valor, residual, acumulada in filas:
+            objetivo = amortizacion_acumulada_centimos(
+                valor - residual, vida, _meses_desde_alta(fecha_alta, anio, mes), metodo
+            )
+            if objetivo > acumulada:
+                cuotas.append(CuotaAmortizacion(
+                    activo_id, codigo, cuenta_gasto, cuenta_amortizacion, objetivo - acumulada, objetivo
+                ))
+        return cuotas
+
+    @perfilado("amortizacion")
+    def contabilizar_periodo(
+        self, empresa_id: int, anio: int, mes: int, por_activo: bool = False
+    ) -> ResultadoAmortizacion:
+        """
+        Contabiliza la amortización mensual del inmovilizado (681x a 281x).
+
+        Todo el periodo se registra en una sola transacción: un único asiento
+        agregado por cuentas o, con `por_activo=True`, un asiento por activo.
+        La amortización acumulada de los activos se actualiza en la misma
+        transacción con un UPDATE masivo por clave primaria, solo para las
+        cuotas que se han contabilizado.
+
+        La clave de idempotencia incluye el acumulado que alcanza cada activo:
+        un reintento de las mismas cuotas (p. ej. una ejecución concurrente) no
+        registra ni actualiza nada, y una diferencia posterior del mismo mes
+        (un activo dado de alta después) se registra con una clave distinta.
+
+        Raises:
+            EjercicioNoEncontradoError: Si no hay ejercicio para el fin de mes.
+            EjercicioCerradoError: Si el ejercicio está cerrado.
+            ConflictoCadenaError: Si otro registro concurrente ocupó la cadena del ejercicio.
+        """
+        fecha = self._fin_de_mes(anio, mes)
+        ejercicio_id = self._ejercicio_abierto(empresa_id, fecha)
+        cuotas = self.calcular_cuotas(empresa_id, anio, mes)
+        resultado = ResultadoAmortizacion(fecha)
+        if not cuotas:
+            return resultado
+        marcar_etapa("cálculo de cuotas")
+
+        concepto = f"Amortización inmovilizado {mes:02d}/{anio}"
+        asiento_service = AsientoService(self.db)
+        if por_activo:
+            claves = [self._clave(f"activo:{cuota.activo_id}", anio, mes, [cuota]) for cuota in cuotas]
+        else:
+            claves = [self._clave(f"empresa:{empresa_id}", anio, mes, cuotas)]
+        existentes = asiento_service.claves_existentes(claves)
+        try:
+            if por_activo:
+                # Los activos cuya cuota ya está registrada no se vuelven a contabilizar
+                resultado.cuotas = [cuota for cuota, clave in zip(cuotas, claves) if clave not in existentes]
+                resultado.asientos = asiento_service._insertar_lote(fecha, ejercicio_id, [
+                    (
+                        f"{concepto} - {cuota.codigo}",
+                        [
+                            (cuota.cuenta_gasto, concepto, desde_centimos(cuota.cuota), Decimal(0)),
+                            (cuota.cuenta_amortizacion, concepto, Decimal(0), desde_centimos(cuota.cuota)),
+                        ],
+                        clave
+                    )
+                    for cuota, clave in zip(cuotas, claves) if clave not in existentes
+                ])
+            elif not existentes:
+                resultado.cuotas = cuotas
+                asiento = asiento_service._insertar_asiento(
+                    fecha,
+                    concepto,
+                    ejercicio_id,
+                    self._apuntes_agregados(cuotas, concepto),
+                    clave_idempotencia=claves[0]
+                )
+                self.db.flush()
+                resultado.asientos = [AsientoRegistrado(asiento.id, asiento.numero, asiento.ejercicio_id)]
+            marcar_etapa("inserción de asientos")
+            if resultado.cuotas:
+                self.db.execute(
+                    update(ActivoFijo),
+                    [
+                        {"id": cuota.activo_id, "amortizacion_acumulada": desde_centimos(cuota.acumulada)}
+                        for cuota in resultado.cuotas
+                    ]
+                )
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            if es_conflicto_cadena(e):
+                raise ConflictoCadenaError(ejercicio_id) from e
+            raise
+        except Exception:
+            self.db.rollback()
+            raise
+        return resultado
+
+    @staticmethod
+    def _apuntes_agregados(cuotas: List[CuotaAmortizacion], concepto: str):
+        debe: Dict[str, int] = defaultdict(int)
+        haber: Dict[str, int] = defaultdict(int)
+        for cuota in cuotas:
+            debe[cuota.cuenta_gasto] += cuota.cuota
+            haber[cuota.cuenta_amortizacion] += cuota.cuota
+        return (
+            [(cuenta, concepto, desde_centimos(importe), Decimal(0)) for cuenta, importe in sorted(debe.items())]
+            + [(cuenta, concepto, Decimal(0), desde_centimos(importe)) for cuenta, importe in sorted(haber.items())]
+        )
+
+    def _ejercicio_abierto(self, empresa_id: int, fecha: date) -> int:
+        ejercicio = self.db.execute(
+            select(EjercicioFiscal).where(
+                EjercicioFiscal.empresa_id == empresa_id,
+                EjercicioFiscal.fecha_inicio <= fecha,
+                EjercicioFiscal.fecha_fin >= fecha
+            )
+        ).scalar_one_or_none()
+        if not ejercicio:
+            raise EjercicioNoEncontradoError(f"No existe ejercicio fiscal para la fecha {fecha}")
+        if not ejercicio.estado:
+            raise EjercicioCerradoError(f"El ejercicio {ejercicio.id} está cerrado")
+        return ejercicio.id
+
+    @staticmethod
+    def _clave(ambito: str, anio: int, mes: int, cuotas: List[CuotaAmortizacion]) -> str:
+        """Clave del periodo y de los acumulados que alcanza cada activo de las cuotas."""
+        acumulados = ",".join(f"{cuota.activo_id}={cuota.acumulada}" for cuota in cuotas)
+        return hashlib.sha256(
+            f"amortizacion:{ambito}:{anio:04d}-{mes:02d}:{acumulados}".encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def _base_centimos(activo: ActivoFijo) -> int:
+        return a_centimos(activo.valor_adquisicion) - a_centimos(activo.valor_residual or Decimal(0))
+
+    @staticmethod
+    def _fin_de_mes(anio: int, mes: int) -> date:
+        return date(anio, mes, calendar.monthrange(anio, mes)[1])
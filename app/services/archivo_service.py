@@ -0,0 +1,187 @@
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.cuenta import CuentaContable
+from app.models.cadena_hash import PuntoControlCadena
+from app.models.ejercicio import EjercicioFiscal
+from app.utils.columnar import EscritorColumnar, LectorColumnar
+from app.utils.dinero import centimos_sql
+from app.utils.perfil_memoria import marcar_etapa, perfilado
+from app.exceptions import (
+    EjercicioAbiertoError,
+    EjercicioArchivadoError,
+    EjercicioNoEncontradoError
+)
+
+DIRECTORIO_ARCHIVO = Path("./archivo")
+FILAS_POR_GRUPO = 100_000
+
+COLUMNAS_ASIENTOS = {
+    "id": "entero",
+    "numero": "entero",
+    "fecha": "fecha",
+    "concepto": "texto",
+    "tercero_id": "entero",
+    "posicion_cadena": "entero",
+    "hash_cadena": "texto",
+    "clave_idempotencia": "texto",
+}
+# Los apuntes se guardan desnormalizados (fecha, número, código de cuenta) y
+# ordenados por (fecha, numero, id) para leer diario y mayor sin cruces.
+COLUMNAS_APUNTES = {
+    "id": "entero",
+    "asiento_id": "entero",
+    "fecha": "fecha",
+    "numero": "entero",
+    "cuenta_id": "entero",
+    "cuenta_codigo": "texto",
+    "descripcion": "texto",
+    "debe": "entero",
+    "haber": "entero",
+    "moneda": "texto",
+    "importe_divisa": "entero",
+}
+COLUMNAS_PUNTOS_CONTROL = {"posicion": "entero", "asiento_id": "entero", "hash_cadena": "texto"}
+COLUMNAS_SALDOS = {"cuenta_id": "entero", "cuenta_codigo": "texto", "debe": "entero", "haber": "entero"}
+
+
+def ruta_archivo(ejercicio_id: int, directorio: Path = DIRECTORIO_ARCHIVO) -> Path:
+    """Ruta del fichero de archivo de un ejercicio."""
+    return Path(directorio) / f"ejercicio_{ejercicio_id}.pgca"
+
+
+def saldos_archivados(ejercicio_id: int, directorio: Path = DIRECTORIO_ARCHIVO) -> Dict[int, Tuple[int, int]]:
+    """Sumas finales (debe, haber) en céntimos por cuenta de un ejercicio archivado."""
+    with LectorColumnar(ruta_archivo(ejercicio_id, directorio)) as lector:
+        return {
+            cuenta_id: (debe, haber)
+            for cuenta_id, debe, haber in lector.filas("saldos", ["cuenta_id", "debe", "haber"])
+        }
+
+
+def _por_lotes(filas: Iterable[tuple], tamano: int) -> Iterable[list]:
+    lote = []
+    for fila in filas:
+        lote.append(tuple(fila))
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class ArchivoService:
+    """Archivo en frío de ejercicios cerrados en ficheros columnares comprimidos."""
+
+    def __init__(self, db: Session, directorio: Path = DIRECTORIO_ARCHIVO):
+        self.db = db
+        self.directorio = Path(directorio)
+
+    @perfilado("archivo")
+    def archivar_ejercicio(self, ejercicio_id: int) -> Path:
+        """
+        Exporta un ejercicio cerrado a su fichero de archivo y lo elimina de las tablas vivas.
+
+        El fichero se escribe completo (con fsync) bajo un nombre temporal, se
+        renombra y se relee para comprobar los recuentos antes de borrar nada.
+        El borrado de asientos, apuntes y puntos de control y la marca
+        `archivado` se confirman en una única transacción. La fila de
+        EjercicioFiscal se conserva.
+
+        Returns:
+            Path: Ruta del fichero generado.
+        """
+        ejercicio = self.db.get(EjercicioFiscal, ejercicio_id)
+        if not ejercicio:
+            raise EjercicioNoEncontradoError(f"No existe el ejercicio fiscal {ejercicio_id}")
+        if ejercicio.archivado:
+            raise EjercicioArchivadoError(f"El ejercicio {ejercicio_id} ya está archivado")
+        if ejercicio.estado:
+            raise EjercicioAbiertoError(f"El ejercicio {ejercicio_id} está abierto; ciérrelo antes de archivarlo")
+
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        ruta = ruta_archivo(ejercicio_id, self.directorio)
+        temporal = ruta.with_suffix(".tmp")
+        recuentos = self._exportar(ejercicio, temporal)
+        os.replace(temporal, ruta)
+        marcar_etapa("exportación")
+
+        with LectorColumnar(ruta) as lector:
+            for tabla, esperado in recuentos.items():
+                if lector.num_filas(tabla) != esperado:
+                    raise RuntimeError(f"Archivo incompleto: la tabla {tabla} no coincide con la base de datos")
+
+        asientos_ejercicio = select(Asiento.id).where(Asiento.ejercicio_id == ejercicio_id)
+        self.db.execute(delete(PuntoControlCadena).where(PuntoControlCadena.ejercicio_id == ejercicio_id))
+        self.db.execute(delete(ApunteContable).where(ApunteContable.asiento_id.in_(asientos_ejercicio)))
+        self.db.execute(delete(Asiento).where(Asiento.ejercicio_id == ejercicio_id))
+        ejercicio.archivado = True
+        self.db.commit()
+        return ruta
+
+    def _exportar(self, ejercicio: EjercicioFiscal, ruta: Path) -> Dict[str, int]:
+        metadatos = {
+            "ejercicio": {
+                "id": ejercicio.id,
+                "empresa_id": ejercicio.empresa_id,
+                "fecha_inicio": ejercicio.fecha_inicio.isoformat(),
+                "fecha_fin": ejercicio.fecha_fin.isoformat(),
+            },
+            "generado": datetime.now().isoformat(timespec="seconds"),
+        }
+        recuentos: Dict[str, int] = {}
+        consultas: Tuple[Tuple[str, dict, object], ...] = (
+            ("asientos", COLUMNAS_ASIENTOS, (
+                select(
+                    Asiento.id, Asiento.numero, Asiento.fecha, Asiento.concepto,
+                    Asiento.tercero_id, Asiento.posicion_cadena, Asiento.hash_cadena,
+                    Asiento.clave_idempotencia
+                )
+                .where(Asiento.ejercicio_id == ejercicio.id)
+                .order_by(Asiento.fecha, Asiento.numero, Asiento.id)
+            )),
+            ("apuntes", COLUMNAS_APUNTES, (
+                select(
+                    ApunteContable.id, ApunteContable.asiento_id, Asiento.fecha, Asiento.numero,
+                    ApunteContable.cuenta_id, CuentaContable.codigo, ApunteContable.descripcion,
+                    centimos_sql(ApunteContable.debe), centimos_sql(ApunteContable.haber),
+                    ApunteContable.moneda, centimos_sql(ApunteContable.importe_divisa)
+                )
+                .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+                .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+                .where(Asiento.ejercicio_id == ejercicio.id)
+                .order_by(Asiento.fecha, Asiento.numero, ApunteContable.id)
+            )),
+            ("puntos_control", COLUMNAS_PUNTOS_CONTROL, (
+                select(PuntoControlCadena.posicion, PuntoControlCadena.asiento_id, PuntoControlCadena.hash_cadena)
+                .where(PuntoControlCadena.ejercicio_id == ejercicio.id)
+                .order_by(PuntoControlCadena.posicion)
+            )),
+            ("saldos", COLUMNAS_SALDOS, (
+                select(
+                    ApunteContable.cuenta_id, CuentaContable.codigo,
+                    func.sum(centimos_sql(ApunteContable.debe)), func.sum(centimos_sql(ApunteContable.haber))
+                )
+                .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+                .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+                .where(Asiento.ejercicio_id == ejercicio.id)
+                .group_by(ApunteContable.cuenta_id, CuentaContable.codigo)
+                .order_by(CuentaContable.codigo)
+            )),
+        )
+        with EscritorColumnar(ruta, metadatos) as escritor:
+            for tabla, columnas, consulta in consultas:
+                escritor.definir_tabla(tabla, columnas)
+                recuentos[tabla] = 0
+                filas = self.db.execute(consulta.execution_options(yield_per=FILAS_POR_GRUPO))
+                for lote in _por_lotes(filas, FILAS_POR_GRUPO):
+                    escritor.escribir(tabla, lote)
+                    recuentos[tabla] += len(lote)
+        return recuentos
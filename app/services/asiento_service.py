@@ -1,19 +1,58 @@
+from dataclasses import dataclass
+from datetime import date
 from decimal import Decimal
-from typing import List
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert
+from sqlalchemy.exc import IntegrityError
 
 from app.models.asiento import Asiento
 from app.models.apunte import ApunteContable
 from app.models.cuenta import CuentaContable
+from app.models.cadena_hash import PuntoControlCadena
 from app.models.ejercicio import EjercicioFiscal
-from app.schemas.asiento import AsientoCreate, FacturaCreate, ApunteCreate
+from app.schemas.asiento import (
+    AsientoCreate,
+    FacturaCreate,
+    ApunteCreate,
+    ApunteTupla,
+    ApunteDivisa,
+    DESCRIPCION_MAX,
+    clave_idempotencia_de
+)
+from app.services.divisa_service import DivisaService, divisas_de
+from app.services.cadena_hash_service import (
+    CadenaHashService,
+    INTERVALO_PUNTO_CONTROL,
+    es_conflicto_cadena,
+    hash_asiento
+)
+from app.services.eventos_service import evento_asiento, publicar_eventos
+from app.utils.dinero import a_centimos, centimos_sql
+from app.utils.perfil_memoria import marcar_etapa, perfilado
 from app.exceptions import (
     AsientoDescuadradoError, 
+    ClaveIdempotenciaReutilizadaError,
+    ConflictoCadenaError,
     CuentaNoEncontradaError,
     EjercicioNoEncontradoError
 )
 
+# Claves por consulta IN en la detección masiva de duplicados
+TAMANO_BLOQUE_CLAVES = 500
+# Reintentos de un registro cuando otro concurrente ocupa la misma posición de la cadena
+INTENTOS_CADENA = 3
+
+@dataclass(frozen=True)
+class AsientoRegistrado:
+    """Resultado ligero de un registro: identifica el asiento sin cargarlo en el ORM."""
+    id: int
+    numero: int
+    ejercicio_id: int
+
+# Resultado de un registro: el Asiento del ORM o su versión ligera
+_Registro = TypeVar("_Registro", Asiento, AsientoRegistrado)
+
 class AsientoService:
     def __init__(self, db: Session):
         self.db = db
@@ -22,82 +61,545 @@ class AsientoService:
         """
         Crea un nuevo asiento contable asegurando que esté cuadrado,
         que las cuentas existan y asignando el número correlativo correspondiente.
+        Los apuntes en divisa sin importe en euros se convierten al tipo de cambio de la fecha.
+        """
+        if any(a.moneda for a in datos.apuntes):
+            datos = DivisaService(self.db).convertir_asientos([datos])[0]
+        return self._registrar_asiento(
+            datos.fecha,
+            datos.concepto,
+            datos.ejercicio_id,
+            [(a.cuenta_codigo, a.descripcion, a.debe, a.haber) for a in datos.apuntes],
+            clave_idempotencia=datos.clave_idempotencia,
+            divisas=divisas_de(datos)
+        )
+
+    def registrar_asiento(self, datos: AsientoCreate) -> AsientoRegistrado:
+        """
+        Variante ligera de crear_asiento: mismas validaciones y errores, sin ORM.
+
+        El asiento se inserta con INSERT ... RETURNING y sus apuntes con un
+        único executemany, sin construir objetos del ORM, sin flush y sin
+        refresh tras el commit. Devuelve solo (id, numero, ejercicio_id); usar
+        cargar_asiento() si se necesita el objeto Asiento.
+        """
+        if any(a.moneda for a in datos.apuntes):
+            datos = DivisaService(self.db).convertir_asientos([datos])[0]
+        return self._con_reintentos(
+            lambda: self.insertar_asiento(datos),
+            self._registrado_por_clave,
+            datos.fecha,
+            datos.concepto,
+            datos.ejercicio_id,
+            [(a.cuenta_codigo, a.descripcion, a.debe, a.haber) for a in datos.apuntes],
+            clave_idempotencia=datos.clave_idempotencia
+        )
+
+    def insertar_asiento(self, datos: AsientoCreate) -> AsientoRegistrado:
+        """
+        Inserta un asiento ya convertido a euros sin confirmar la transacción.
+
+        Permite agrupar varios asientos en una misma transacción (ColaAsientos):
+        el llamador decide cuándo confirmar y qué hacer si uno falla. Mismas
+        validaciones y errores que registrar_asiento, sin reintentos.
+        """
+        return self._insertar_asiento_core(
+            datos.fecha,
+            datos.concepto,
+            datos.ejercicio_id,
+            [(a.cuenta_codigo, a.descripcion, a.debe, a.haber) for a in datos.apuntes],
+            clave_idempotencia=datos.clave_idempotencia,
+            divisas=divisas_de(datos)
+        )
+
+    def cargar_asiento(self, registrado: AsientoRegistrado) -> Asiento:
+        """Hidrata el Asiento del ORM de un registro ligero."""
+        return self.db.get(Asiento, registrado.id)
+
+    def claves_existentes(self, claves: Iterable[str]) -> Set[str]:
+        """
+        Devuelve las claves de idempotencia que ya tienen asiento registrado.
+
+        Consulta el índice único por bloques, sin recorrer la tabla de asientos.
+        """
+        claves = list(dict.fromkeys(claves))
+        existentes: Set[str] = set()
+        for inicio in range(0, len(claves), TAMANO_BLOQUE_CLAVES):
+            bloque = claves[inicio:inicio + TAMANO_BLOQUE_CLAVES]
+            existentes.update(self.db.execute(
+                select(Asiento.clave_idempotencia).where(Asiento.clave_idempotencia.in_(bloque))
+            ).scalars())
+        return existentes
+
+    @perfilado("importacion")
+    def filtrar_duplicados(
+        self, lote: Sequence[AsientoCreate]
+    ) -> Tuple[List[AsientoCreate], List[AsientoCreate]]:
+        """
+        Separa un lote de importación en asientos nuevos y duplicados.
+
+        Un asiento es duplicado si su clave (la del cliente o, si no la tiene, el
+        hash de su contenido) ya está registrada o aparece antes en el mismo lote.
+        Los asientos nuevos se devuelven con la clave asignada, listos para registrar.
+
+        Returns:
+            Tuple[List[AsientoCreate], List[AsientoCreate]]: (nuevos, duplicados).
+        """
+        con_clave = [
+            datos if datos.clave_idempotencia
+            else datos.model_copy(update={"clave_idempotencia": clave_idempotencia_de(datos)})
+            for datos in lote
+        ]
+        vistas = self.claves_existentes(datos.clave_idempotencia for datos in con_clave)
+        marcar_etapa("consulta de claves")
+        nuevos, duplicados = [], []
+        for datos in con_clave:
+            if datos.clave_idempotencia in vistas:
+                duplicados.append(datos)
+            else:
+                vistas.add(datos.clave_idempotencia)
+                nuevos.append(datos)
+        return nuevos, duplicados
+
+    def _asiento_por_clave(self, clave_idempotencia: str) -> Optional[Asiento]:
+        return self.db.execute(
+            select(Asiento).where(Asiento.clave_idempotencia == clave_idempotencia)
+        ).scalar_one_or_none()
+
+    def _registrado_por_clave(self, clave_idempotencia: str) -> Optional[AsientoRegistrado]:
+        fila = self.db.execute(
+            select(Asiento.id, Asiento.numero, Asiento.ejercicio_id)
+            .where(Asiento.clave_idempotencia == clave_idempotencia)
+        ).first()
+        return AsientoRegistrado(*fila) if fila else None
+
+    def _comprobar_reintento(
+        self,
+        asiento_id: int,
+        clave_idempotencia: str,
+        fecha: date,
+        concepto: str,
+        apuntes: Sequence[ApunteTupla],
+        tercero_id: Optional[int] = None
+    ) -> None:
+        """
+        Comprueba que un envío con una clave ya registrada es el mismo asiento.
+
+        Compara fecha, concepto, tercero y apuntes (cuenta, descripción e
+        importes en céntimos, en orden) con el asiento registrado.
+
+        Raises:
+            ClaveIdempotenciaReutilizadaError: Si el contenido no coincide.
+        """
+        registrado = self.db.execute(
+            select(Asiento.fecha, Asiento.concepto, Asiento.tercero_id).where(Asiento.id == asiento_id)
+        ).one()
+        lineas = self.db.execute(
+            select(
+                CuentaContable.codigo, ApunteContable.descripcion,
+                centimos_sql(ApunteContable.debe), centimos_sql(ApunteContable.haber)
+            )
+            .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+            .where(ApunteContable.asiento_id == asiento_id)
+            .order_by(ApunteContable.id)
+        ).all()
+        esperadas = [
+            (cuenta_codigo, descripcion, a_centimos(debe), a_centimos(haber))
+            for cuenta_codigo, descripcion, debe, haber in apuntes
+        ]
+        if tuple(registrado) != (fecha, concepto, tercero_id) or [tuple(l) for l in lineas] != esperadas:
+            raise ClaveIdempotenciaReutilizadaError(clave_idempotencia)
+
+    def _registrar_asiento(
+        self,
+        fecha: date,
+        concepto: str,
+        ejercicio_id: Optional[int],
+        apuntes: Sequence[ApunteTupla],
+        tercero_id: Optional[int] = None,
+        clave_idempotencia: Optional[str] = None,
+        divisas: Optional[Sequence[Optional[ApunteDivisa]]] = None
+    ) -> Asiento:
+        """
+        Núcleo de crear_asiento para datos ya validados por el esquema.
+
+        Los llamadores internos (p. ej. crear_asiento_factura) construyen las
+        tuplas directamente y evitan crear y revalidar modelos pydantic.
+
+        Si un registro concurrente ocupa antes la misma posición de la cadena
+        de hashes, se reintenta con el nuevo último eslabón (INTENTOS_CADENA
+        veces como mucho).
+
+        Raises:
+            ConflictoCadenaError: Si la cadena sigue ocupada tras los reintentos.
+        """
+        asiento = self._con_reintentos(
+            lambda: self._insertar_asiento(
+                fecha, concepto, ejercicio_id, apuntes, tercero_id, clave_idempotencia, divisas
+            ),
+            self._asiento_por_clave,
+            fecha,
+            concepto,
+            ejercicio_id,
+            apuntes,
+            tercero_id,
+            clave_idempotencia
+        )
+        self.db.refresh(asiento)
+        return asiento
+
+    def _con_reintentos(
+        self,
+        insertar: Callable[[], _Registro],
+        por_clave: Callable[[str], Optional[_Registro]],
+        fecha: date,
+        concepto: str,
+        ejercicio_id: Optional[int],
+        apuntes: Sequence[ApunteTupla],
+        tercero_id: Optional[int] = None,
+        clave_idempotencia: Optional[str] = None
+    ) -> _Registro:
+        """
+        Ejecuta `insertar` y confirma, reintentando los conflictos de cadena.
+
+        Si un envío concurrente con la misma clave de idempotencia se confirmó
+        antes, devuelve ese registro (buscado con `por_clave`) tras comprobar
+        que su contenido coincide.
+
+        Raises:
+            ConflictoCadenaError: Si la cadena sigue ocupada tras INTENTOS_CADENA intentos.
+        """
+        for _ in range(INTENTOS_CADENA):
+            try:
+                registro = insertar()
+                self.db.commit()
+                return registro
+            except IntegrityError as e:
+                self.db.rollback()
+                existente = por_clave(clave_idempotencia) if clave_idempotencia else None
+                if existente is not None:
+                    self._comprobar_reintento(existente.id, clave_idempotencia, fecha, concepto, apuntes, tercero_id)
+                    return existente
+                if not es_conflicto_cadena(e):
+                    raise
+        raise ConflictoCadenaError(ejercicio_id)
+
+    def _insertar_asiento(
+        self,
+        fecha: date,
+        concepto: str,
+        ejercicio_id: Optional[int],
+        apuntes: Sequence[ApunteTupla],
+        tercero_id: Optional[int] = None,
+        clave_idempotencia: Optional[str] = None,
+        divisas: Optional[Sequence[Optional[ApunteDivisa]]] = None
+    ) -> Asiento:
+        """
+        Valida, numera e inserta el asiento sin confirmar la transacción.
+
+        Permite agrupar varios asientos en una misma transacción (ColaAsientos).
+        Si ya existe un asiento con la misma clave de idempotencia y el mismo
+        contenido se devuelve ese asiento sin registrar nada; con otro
+        contenido se lanza ClaveIdempotenciaReutilizadaError. `divisas`,
+        alineado con `apuntes`, indica el origen en divisa (moneda, importe)
+        de cada apunte o None.
+        """
+        # 0. Reintento: una única búsqueda por el índice único de la clave
+        if clave_idempotencia is not None:
+            existente = self._asiento_por_clave(clave_idempotencia)
+            if existente is not None:
+                self._comprobar_reintento(existente.id, clave_idempotencia, fecha, concepto, apuntes, tercero_id)
+                return existente
+
+        fila, cuenta_map, divisas = self._preparar_asiento(
+            fecha, concepto, ejercicio_id, apuntes, tercero_id, clave_idempotencia, divisas
+        )
+
+        # 6. Crear Asiento y Apuntes
+        nuevo_asiento = Asiento(**fila)
+        self.db.add(nuevo_asiento)
+        self.db.flush() # Para obtener nuevo_asiento.id
+        CadenaHashService(self.db).registrar_punto_control(nuevo_asiento)
+
+        for (cuenta_codigo, descripcion, debe, haber), divisa in zip(apuntes, divisas):
+            # Forzar validación adicional de valores positivos si se requiere 
+            # (ya cubierto por pydantic ge=0, pero Decimal permite negativos)
+            # Aquí asumimos que pydantic ya filtró los negativos.
+            
+            apunte = ApunteContable(
+                asiento_id=nuevo_asiento.id,
+                ejercicio_id=fila["ejercicio_id"],
+                fecha=fila["fecha"],
+                numero=fila["numero"],
+                cuenta_id=cuenta_map[cuenta_codigo],
+                descripcion=descripcion,
+                debe=debe,
+                haber=haber,
+                moneda=divisa[0] if divisa else None,
+                importe_divisa=divisa[1] if divisa else None
+            )
+            self.db.add(apunte)
+
+        # 7. Evento para los consumidores externos (misma transacción)
+        publicar_eventos(self.db, [evento_asiento(nuevo_asiento.id, fila, apuntes, divisas)])
+        return nuevo_asiento
+
+    def _insertar_asiento_core(
+        self,
+        fecha: date,
+        concepto: str,
+        ejercicio_id: Optional[int],
+        apuntes: Sequence[ApunteTupla],
+        tercero_id: Optional[int] = None,
+        clave_idempotencia: Optional[str] = None,
+        divisas: Optional[Sequence[Optional[ApunteDivisa]]] = None
+    ) -> AsientoRegistrado:
+        """
+        Equivalente a _insertar_asiento con SQLAlchemy Core, sin confirmar la transacción.
+
+        No pasa por la unidad de trabajo del ORM: la validación de importes
+        nulos de ApunteContable (@validates) se repite aquí explícitamente,
+        antes de que el cuadre opere con ellos.
+        """
+        for _, _, debe, haber in apuntes:
+            for campo, valor in (("debe", debe), ("haber", haber)):
+                if valor is None:
+                    raise ValueError(f"El campo '{campo}' no puede ser nulo.")
+
+        if clave_idempotencia is not None:
+            existente = self._registrado_por_clave(clave_idempotencia)
+            if existente is not None:
+                self._comprobar_reintento(existente.id, clave_idempotencia, fecha, concepto, apuntes, tercero_id)
+                return existente
+
+        fila, cuenta_map, divisas = self._preparar_asiento(
+            fecha, concepto, ejercicio_id, apuntes, tercero_id, clave_idempotencia, divisas
+        )
+
+        asiento_id = self.db.execute(insert(Asiento).values(fila).returning(Asiento.id)).scalar_one()
+        self.db.execute(insert(ApunteContable), [
+            {
+                "asiento_id": asiento_id,
+                "ejercicio_id": fila["ejercicio_id"],
+                "fecha": fila["fecha"],
+                "numero": fila["numero"],
+                "cuenta_id": cuenta_map[cuenta_codigo],
+                "descripcion": descripcion,
+                "debe": debe,
+                "haber": haber,
+                "moneda": divisa[0] if divisa else None,
+                "importe_divisa": divisa[1] if divisa else None
+            }
+            for (cuenta_codigo, descripcion, debe, haber), divisa in zip(apuntes, divisas)
+        ])
+        if fila["posicion_cadena"] % INTERVALO_PUNTO_CONTROL == 0:
+            self.db.execute(insert(PuntoControlCadena).values(
+                ejercicio_id=fila["ejercicio_id"],
+                posicion=fila["posicion_cadena"],
+                asiento_id=asiento_id,
+                hash_cadena=fila["hash_cadena"]
+            ))
+        publicar_eventos(self.db, [evento_asiento(asiento_id, fila, apuntes, divisas)])
+        return AsientoRegistrado(asiento_id, fila["numero"], fila["ejercicio_id"])
+
+    def _preparar_asiento(
+        self,
+        fecha: date,
+        concepto: str,
+        ejercicio_id: Optional[int],
+        apuntes: Sequence[ApunteTupla],
+        tercero_id: Optional[int],
+        clave_idempotencia: Optional[str],
+        divisas: Optional[Sequence[Optional[ApunteDivisa]]]
+    ) -> Tuple[Dict, Dict[str, int], Sequence[Optional[ApunteDivisa]]]:
+        """
+        Validaciones, numeración y sellado comunes a los caminos ORM y Core.
+
+        Returns:
+            Tuple: (fila del asiento, mapa código -> id de cuenta, divisas por apunte).
         """
         # 1. Validar cuadre (Debe == Haber)
-        total_debe = sum(apunte.debe for apunte in datos.apuntes)
-        total_haber = sum(apunte.haber for apunte in datos.apuntes)
-        
-        # Usamos diferencia absoluta menor a un epsilon muy pequeño para "igualdad"
-        # aunque con Decimal debería ser exacto.
-        if total_debe != total_haber:
-            diferencia = total_debe - total_haber
-            raise AsientoDescuadradoError(diferencia)
+        self._validar_cuadre(apuntes)
 
         # 2. Verificar existencia de cuentas y obtener IDs
-        cuenta_map = {}
-        for apunte_schema in datos.apuntes:
-            if apunte_schema.cuenta_codigo not in cuenta_map:
-                cuenta = self.db.execute(
-                    select(CuentaContable).where(CuentaContable.codigo == apunte_schema.cuenta_codigo)
-                ).scalar_one_or_none()
-                
-                if not cuenta:
-                    raise CuentaNoEncontradaError(apunte_schema.cuenta_codigo)
-                cuenta_map[apunte_schema.cuenta_codigo] = cuenta.id
+        cuenta_map = self._mapa_cuentas(cuenta_codigo for cuenta_codigo, _, _, _ in apuntes)
 
         # 3. Validar ejercicio fiscal (si no se proporciona ID, buscar por fecha)
-        if not datos.ejercicio_id:
+        if not ejercicio_id:
              # Buscar ejercicio abierto que contenga la fecha
              ejercicio = self.db.execute(
                  select(EjercicioFiscal).where(
-                     EjercicioFiscal.fecha_inicio <= datos.fecha,
-                     EjercicioFiscal.fecha_fin >= datos.fecha,
+                     EjercicioFiscal.fecha_inicio <= fecha,
+                     EjercicioFiscal.fecha_fin >= fecha,
                      # EjercicioFiscal.estado == True # Opcional: solo permitir en abiertos
                  )
              ).scalar_one_or_none()
              if not ejercicio:
-                 raise EjercicioNoEncontradoError(f"No existe ejercicio fiscal para la fecha {datos.fecha}")
+                 raise EjercicioNoEncontradoError(f"No existe ejercicio fiscal para la fecha {fecha}")
              ejercicio_id = ejercicio.id
-        else:
-            ejercicio_id = datos.ejercicio_id
 
         # 4. Obtener siguiente número de asiento
         ultimo_numero = self.db.execute(
             select(func.max(Asiento.numero)).where(Asiento.ejercicio_id == ejercicio_id)
         ).scalar() or 0
-        nuevo_numero = ultimo_numero + 1
-
-        # 5. Crear Asiento y Apuntes
-        nuevo_asiento = Asiento(
-            ejercicio_id=ejercicio_id,
-            numero=nuevo_numero,
-            fecha=datos.fecha,
-            concepto=datos.concepto
+
+        # 5. Sellar el asiento en la cadena de hashes del ejercicio (misma transacción)
+        divisas = divisas or [None] * len(apuntes)
+        posicion_cadena, hash_cadena = CadenaHashService(self.db).siguiente_eslabon(
+            ejercicio_id,
+            fecha,
+            concepto,
+            tercero_id,
+            [
+                (cuenta_map[cuenta_codigo], descripcion, a_centimos(debe), a_centimos(haber))
+                + ((divisa[0], a_centimos(divisa[1])) if divisa else ())
+                for (cuenta_codigo, descripcion, debe, haber), divisa in zip(apuntes, divisas)
+            ]
         )
-        self.db.add(nuevo_asiento)
-        self.db.flush() # Para obtener nuevo_asiento.id
 
-        for apunte_schema in datos.apuntes:
-            # Forzar validación adicional de valores positivos si se requiere 
-            # (ya cubierto por pydantic ge=0, pero Decimal permite negativos)
-            # Aquí asumimos que pydantic ya filtró los negativos.
-            
-            apunte = ApunteContable(
-                asiento_id=nuevo_asiento.id,
-                cuenta_id=cuenta_map[apunte_schema.cuenta_codigo],
-                descripcion=apunte_schema.descripcion,
-                debe=apunte_schema.debe,
-                haber=apunte_schema.haber
+        fila = {
+            "ejercicio_id": ejercicio_id,
+            "tercero_id": tercero_id,
+            "numero": ultimo_numero + 1,
+            "fecha": fecha,
+            "concepto": concepto,
+            "posicion_cadena": posicion_cadena,
+            "hash_cadena": hash_cadena,
+            "clave_idempotencia": clave_idempotencia
+        }
+        return fila, cuenta_map, divisas
+
+    @staticmethod
+    def _validar_cuadre(apuntes: Sequence[ApunteTupla]) -> None:
+        total_debe = sum(debe for _, _, debe, _ in apuntes)
+        total_haber = sum(haber for _, _, _, haber in apuntes)
+        # Con Decimal la comparación es exacta
+        if total_debe != total_haber:
+            raise AsientoDescuadradoError(total_debe - total_haber)
+
+    def _mapa_cuentas(self, codigos: Iterable[str]) -> Dict[str, int]:
+        """
+        Resuelve los códigos de cuenta a sus IDs con una sola consulta.
+
+        Raises:
+            CuentaNoEncontradaError: Con el primer código inexistente, en orden de aparición.
+        """
+        codigos = list(dict.fromkeys(codigos))
+        cuenta_map = dict(self.db.execute(
+            select(CuentaContable.codigo, CuentaContable.id).where(CuentaContable.codigo.in_(codigos))
+        ).all())
+        for codigo in codigos:
+            if codigo not in cuenta_map:
+                raise CuentaNoEncontradaError(codigo)
+        return cuenta_map
+
+    def _insertar_lote(
+        self,
+        fecha: date,
+        ejercicio_id: int,
+        asientos: Sequence[Tuple[str, Sequence[ApunteTupla], Optional[str]]]
+    ) -> List[AsientoRegistrado]:
+        """
+        Inserta un lote de asientos de una misma fecha y ejercicio sin confirmar.
+
+        Para procesos masivos (p. ej. amortizaciones con un asiento por activo):
+        las validaciones son las de _insertar_asiento, pero las cuentas se
+        resuelven con una sola consulta, numeración y cadena de hashes se
+        calculan en memoria a partir del último asiento, y asientos, apuntes y
+        puntos de control se insertan con INSERT masivos en lugar de un flush
+        por asiento. Los asientos cuya clave de idempotencia ya está registrada
+        se omiten.
+
+        Args:
+            asientos: Tuplas (concepto, apuntes, clave_idempotencia).
+
+        Returns:
+            List[AsientoRegistrado]: Los asientos insertados, en el orden recibido.
+        """
+        existentes = self.claves_existentes(clave for _, _, clave in asientos if clave)
+        asientos = [a for a in asientos if a[2] is None or a[2] not in existentes]
+        if not asientos:
+            return []
+
+        for _, apuntes, _ in asientos:
+            self._validar_cuadre(apuntes)
+        cuenta_map = self._mapa_cuentas(
+            cuenta_codigo for _, apuntes, _ in asientos for cuenta_codigo, _, _, _ in apuntes
+        )
+
+        numero = self.db.execute(
+            select(func.max(Asiento.numero)).where(Asiento.ejercicio_id == ejercicio_id)
+        ).scalar() or 0
+        posicion, hash_cadena = CadenaHashService(self.db).ultimo_eslabon(ejercicio_id)
+
+        filas_asientos = []
+        for concepto, apuntes, clave in asientos:
+            numero += 1
+            posicion += 1
+            hash_cadena = hash_asiento(
+                hash_cadena, ejercicio_id, posicion, fecha, concepto, None,
+                [
+                    (cuenta_map[cuenta_codigo], descripcion, a_centimos(debe), a_centimos(haber))
+                    for cuenta_codigo, descripcion, debe, haber in apuntes
+                ]
             )
-            self.db.add(apunte)
+            filas_asientos.append({
+                "ejercicio_id": ejercicio_id,
+                "numero": numero,
+                "fecha": fecha,
+                "concepto": concepto,
+                "posicion_cadena": posicion,
+                "hash_cadena": hash_cadena,
+                "clave_idempotencia": clave
+            })
 
-        self.db.commit()
-        self.db.refresh(nuevo_asiento)
-        return nuevo_asiento
+        ids = self.db.execute(
+            insert(Asiento).returning(Asiento.id, sort_by_parameter_order=True), filas_asientos
+        ).scalars().all()
+        self.db.execute(insert(ApunteContable), [
+            {
+                "asiento_id": asiento_id,
+                "ejercicio_id": ejercicio_id,
+                "fecha": fecha,
+                "numero": fila["numero"],
+                "cuenta_id": cuenta_map[cuenta_codigo],
+                "descripcion": descripcion,
+                "debe": debe,
+                "haber": haber
+            }
+            for asiento_id, fila, (_, apuntes, _) in zip(ids, filas_asientos, asientos)
+            for cuenta_codigo, descripcion, debe, haber in apuntes
+        ])
+        puntos_control = [
+            {
+                "ejercicio_id": ejercicio_id,
+                "posicion": fila["posicion_cadena"],
+                "asiento_id": asiento_id,
+                "hash_cadena": fila["hash_cadena"]
+            }
+            for asiento_id, fila in zip(ids, filas_asientos)
+            if fila["posicion_cadena"] % INTERVALO_PUNTO_CONTROL == 0
+        ]
+        if puntos_control:
+            self.db.execute(insert(PuntoControlCadena), puntos_control)
+        publicar_eventos(self.db, [
+            evento_asiento(asiento_id, fila, apuntes)
+            for asiento_id, fila, (_, apuntes, _) in zip(ids, filas_asientos, asientos)
+        ])
+
+        return [
+            AsientoRegistrado(asiento_id, fila["numero"], ejercicio_id)
+            for asiento_id, fila in zip(ids, filas_asientos)
+        ]
 
     def crear_asiento_factura(self, datos: FacturaCreate) -> Asiento:
         """
         Genera automáticamente un asiento de factura con cálculo de IVA.
+
+        Con `clave_idempotencia`, un reintento devuelve el asiento ya
+        registrado. Sin clave, cada llamada registra una factura: dos facturas
+        reales idénticas son dos asientos (la deduplicación por contenido es
+        explícita, con filtrar_duplicados).
         """
         # 1. Validar Tipo de IVA
         if datos.tipo_iva not in [4, 10, 21]:
@@ -114,70 +616,43 @@ class AsientoService:
         # Si es ingreso (venta), el IVA es Repercutido (477) y va al HABER.
         codigo_iva = "472" if datos.es_gasto else "477"
         
-        # 4. Construir Apuntes
-        apuntes = []
-
+        # 4. Construir Apuntes como tuplas (cuenta, descripcion, debe, haber)
         if datos.es_gasto:
             # Factura Recibida (Compra)
             # Debe: Gasto + IVA
             # Haber: Proveedor (Total)
-            apuntes.append(ApunteCreate(
-                cuenta_codigo=datos.cuenta_ingreso_gasto,
-                descripcion=f"Base {datos.concepto}",
-                debe=datos.base_imponible,
-                haber=Decimal(0)
-            ))
-            apuntes.append(ApunteCreate(
-                cuenta_codigo=codigo_iva,
-                descripcion=f"IVA {datos.tipo_iva}% {datos.concepto}",
-                debe=cuota_iva,
-                haber=Decimal(0)
-            ))
-            apuntes.append(ApunteCreate(
-                cuenta_codigo=datos.cuenta_tercero,
-                descripcion=f"Total {datos.concepto}",
-                debe=Decimal(0),
-                haber=total_factura
-            ))
+            tuplas = [
+                (datos.cuenta_ingreso_gasto, f"Base {datos.concepto}", datos.base_imponible, Decimal(0)),
+                (codigo_iva, f"IVA {datos.tipo_iva}% {datos.concepto}", cuota_iva, Decimal(0)),
+                (datos.cuenta_tercero, f"Total {datos.concepto}", Decimal(0), total_factura),
+            ]
         else:
             # Factura Emitida (Venta)
             # Debe: Cliente (Total)
             # Haber: Ingreso + IVA
-            apuntes.append(ApunteCreate(
-                cuenta_codigo=datos.cuenta_tercero,
-                descripcion=f"Total {datos.concepto}",
-                debe=total_factura,
-                haber=Decimal(0)
-            ))
-            apuntes.append(ApunteCreate(
-                cuenta_codigo=datos.cuenta_ingreso_gasto,
-                descripcion=f"Base {datos.concepto}",
-                debe=Decimal(0),
-                haber=datos.base_imponible
-            ))
-            apuntes.append(ApunteCreate(
-                cuenta_codigo=codigo_iva,
-                descripcion=f"IVA {datos.tipo_iva}% {datos.concepto}",
-                debe=Decimal(0),
-                haber=cuota_iva
-            ))
+            tuplas = [
+                (datos.cuenta_tercero, f"Total {datos.concepto}", total_factura, Decimal(0)),
+                (datos.cuenta_ingreso_gasto, f"Base {datos.concepto}", Decimal(0), datos.base_imponible),
+                (codigo_iva, f"IVA {datos.tipo_iva}% {datos.concepto}", Decimal(0), cuota_iva),
+            ]
+
+        # Los importes proceden de FacturaCreate (ya validado) y se cuantizan a
+        # céntimos, así que no se revalidan. Solo la descripción (prefijo + concepto)
+        # puede superar el límite; en ese caso se valida con el esquema para
+        # lanzar el mismo ValidationError que antes.
+        for cuenta, descripcion, debe, haber in tuplas:
+            if len(descripcion) > DESCRIPCION_MAX:
+                ApunteCreate(cuenta_codigo=cuenta, descripcion=descripcion, debe=debe, haber=haber)
 
-        # 5. Delegar en crear_asiento para validación final y persistencia
-        asiento_create = AsientoCreate(
-            fecha=datos.fecha,
-            concepto=datos.concepto,
-            ejercicio_id=datos.ejercicio_id,
-            apuntes=apuntes
+        # 5. Delegar en el núcleo de crear_asiento para validación final y persistencia.
+        # El tercero se vincula en la misma transacción (y queda cubierto por el hash).
+        nuevo_asiento = self._registrar_asiento(
+            datos.fecha,
+            datos.concepto,
+            datos.ejercicio_id,
+            tuplas,
+            tercero_id=datos.tercero_id,
+            clave_idempotencia=datos.clave_idempotencia
         )
         
-        nuevo_asiento = self.crear_asiento(asiento_create)
-        
-        # 6. Vincular Tercero
-        # Esto requiere hacer un update posterior o modificar crear_asiento para aceptar tercero_id.
-        # Modificaremos el objeto retornado y haremos commit.
-        nuevo_asiento.tercero_id = datos.tercero_id
-        self.db.add(nuevo_asiento)
-        self.db.commit()
-        self.db.refresh(nuevo_asiento)
-        
         return nuevo_asiento
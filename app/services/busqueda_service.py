@@ -0,0 +1,136 @@
+import re
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import column, func, literal_column, select, table
+from sqlalchemy.orm import Session
+
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.cuenta import CuentaContable
+from app.models.busqueda import TABLA_BUSQUEDA
+
+
+@dataclass
+class ResultadoBusqueda:
+    """Apunte encontrado por la búsqueda de texto, con su relevancia (mayor = mejor)."""
+    apunte_id: int
+    asiento_id: int
+    numero: int
+    fecha: date
+    concepto: str
+    descripcion: str
+    cuenta_codigo: str
+    debe: Decimal
+    haber: Decimal
+    relevancia: float
+
+
+def _consulta_fts5(texto: str) -> str:
+    """
+    Convierte texto libre en una consulta FTS5 segura.
+
+    Cada palabra se cita (evita interpretar operadores como AND, NEAR o '-')
+    y se busca por prefijo: "factu" encuentra "factura".
+    """
+    terminos = [palabra.replace('"', '""') for palabra in texto.split()]
+    return " ".join(f'"{termino}"*' for termino in terminos)
+
+
+def _consulta_tsquery(texto: str) -> str:
+    """
+    Convierte texto libre en una consulta to_tsquery de PostgreSQL.
+
+    Igual que en FTS5, todas las palabras deben aparecer y se buscan por
+    prefijo ("factu:*"). Solo se conservan letras y dígitos de cada palabra,
+    así que los operadores de tsquery (&, |, !, :, paréntesis) no llegan a la consulta.
+    """
+    return " & ".join(f"{termino}:*" for termino in re.findall(r"\w+", texto))
+
+
+class BusquedaService:
+    """Búsqueda de texto completo sobre conceptos de asientos y descripciones de apuntes."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def buscar(
+        self,
+        texto: str,
+        ejercicio_id: Optional[int] = None,
+        cuenta_codigo: Optional[str] = None,
+        importe_min: Optional[Decimal] = None,
+        importe_max: Optional[Decimal] = None,
+        limite: int = 50
+    ) -> List[ResultadoBusqueda]:
+        """
+        Busca apuntes cuyo concepto (del asiento) o descripción contengan el texto.
+
+        La búsqueda se resuelve en el índice de texto completo y los filtros se
+        aplican sobre el resultado por clave primaria, sin recorrer el diario.
+
+        Args:
+            texto: Palabras a buscar (todas deben aparecer, por prefijo).
+            ejercicio_id: Limita a un ejercicio fiscal.
+            cuenta_codigo: Limita a la cuenta y sus subcuentas (prefijo del código).
+            importe_min: Importe mínimo del apunte (debe o haber).
+            importe_max: Importe máximo del apunte (debe o haber).
+            limite: Número máximo de resultados, ordenados por relevancia.
+
+        Returns:
+            List[ResultadoBusqueda]: Apuntes encontrados, el más relevante primero.
+        """
+        if not texto.strip():
+            return []
+
+        dialecto = self.db.get_bind().dialect.name
+        if dialecto == "postgresql":
+            terminos = _consulta_tsquery(texto)
+            if not terminos:
+                return []
+            indice = table(TABLA_BUSQUEDA, column("apunte_id"), column("documento"))
+            consulta_ts = func.to_tsquery("spanish", terminos)
+            relevancia = func.ts_rank(indice.c.documento, consulta_ts)
+            clave = indice.c.apunte_id
+            coincide = indice.c.documento.op("@@")(consulta_ts)
+        else:
+            indice = table(TABLA_BUSQUEDA, column("rowid"))
+            # bm25 devuelve valores menores para mejores coincidencias
+            relevancia = -func.bm25(literal_column(TABLA_BUSQUEDA))
+            clave = indice.c.rowid
+            coincide = literal_column(TABLA_BUSQUEDA).op("MATCH")(_consulta_fts5(texto))
+
+        consulta = (
+            select(
+                ApunteContable.id,
+                Asiento.id,
+                Asiento.numero,
+                Asiento.fecha,
+                Asiento.concepto,
+                ApunteContable.descripcion,
+                CuentaContable.codigo,
+                ApunteContable.debe,
+                ApunteContable.haber,
+                relevancia.label("relevancia")
+            )
+            .select_from(indice)
+            .join(ApunteContable, ApunteContable.id == clave)
+            .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+            .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+            .where(coincide)
+        )
+        if ejercicio_id is not None:
+            consulta = consulta.where(Asiento.ejercicio_id == ejercicio_id)
+        if cuenta_codigo is not None:
+            consulta = consulta.where(CuentaContable.codigo.startswith(cuenta_codigo, autoescape=True))
+        # Un apunte tiene importe en el Debe o en el Haber; la suma es su importe
+        importe = ApunteContable.debe + ApunteContable.haber
+        if importe_min is not None:
+            consulta = consulta.where(importe >= importe_min)
+        if importe_max is not None:
+            consulta = consulta.where(importe <= importe_max)
+
+        consulta = consulta.order_by(literal_column("relevancia").desc(), ApunteContable.id).limit(limite)
+        return [ResultadoBusqueda(*fila) for fila in self.db.execute(consulta)]
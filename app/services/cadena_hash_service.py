@@ -0,0 +1,341 @@
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import groupby
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine, select, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.cadena_hash import PuntoControlCadena
+from app.models.ejercicio import EjercicioFiscal
+from app.utils.dinero import centimos_sql
+
+# Cada cuántos asientos encadenados se guarda un punto de control.
+INTERVALO_PUNTO_CONTROL = 1000
+HASH_GENESIS = "0" * 64
+
+# Apunte en forma canónica: (cuenta_id, descripcion, debe_centimos, haber_centimos),
+# ampliado con (moneda, importe_divisa_centimos) solo si el apunte está en divisa,
+# de modo que los hashes de los apuntes en euros no cambian.
+ApunteCanonico = Tuple
+
+
+def hash_asiento(
+    hash_anterior: str,
+    ejercicio_id: int,
+    posicion: int,
+    fecha: date,
+    concepto: str,
+    tercero_id: Optional[int],
+    apuntes: Iterable[ApunteCanonico]
+) -> str:
+    """
+    Calcula el hash encadenado de un asiento a partir de su contenido canónico.
+
+    Los importes entran en céntimos enteros para que el resultado no dependa de
+    la representación del Decimal (p. ej. "1.5" frente a "1.50"). El número de
+    asiento no forma parte del hash: puede reasignarse legalmente al cierre
+    (orden cronológico del libro diario) sin romper la cadena.
+    """
+    contenido = json.dumps(
+        [ejercicio_id, posicion, fecha.isoformat(), concepto, tercero_id, [list(a) for a in apuntes]],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256((hash_anterior + contenido).encode("utf-8")).hexdigest()
+
+
+def es_conflicto_cadena(error: IntegrityError) -> bool:
+    """True si el error es la restricción única (ejercicio_id, posicion_cadena) de asientos."""
+    return "posicion_cadena" in str(error.orig)
+
+
+def _apunte_canonico(fila: Sequence) -> ApunteCanonico:
+    """(cuenta_id, descripcion, debe, haber, moneda, importe_divisa) leído en céntimos a forma canónica."""
+    return tuple(fila[:4]) + (tuple(fila[4:6]) if fila[4] is not None else ())
+
+
+@dataclass
+class IncidenciaCadena:
+    """Discrepancia detectada al verificar la cadena."""
+    posicion: int
+    asiento_id: Optional[int]
+    motivo: str
+
+
+@dataclass
+class ResultadoVerificacion:
+    """Resultado de verificar (un rango de) la cadena de un ejercicio."""
+    ejercicio_id: int
+    asientos_verificados: int = 0
+    incidencias: List[IncidenciaCadena] = field(default_factory=list)
+
+    @property
+    def valido(self) -> bool:
+        return not self.incidencias
+
+
+@dataclass
+class _Tramo:
+    inicio: int  # Posición exclusiva de arranque (la del punto de control previo)
+    hash_inicio: str
+    fin: Optional[int]  # Posición inclusiva final (None = hasta el último asiento)
+    hash_fin: Optional[str]  # Hash esperado en `fin` según el punto de control
+
+
+def _verificar_tramo(db: Session, ejercicio_id: int, tramo: _Tramo) -> ResultadoVerificacion:
+    """Recalcula un tramo de la cadena en streaming y lo compara con lo almacenado."""
+    resultado = ResultadoVerificacion(ejercicio_id)
+    consulta = (
+        select(
+            Asiento.posicion_cadena,
+            Asiento.id,
+            Asiento.hash_cadena,
+            Asiento.fecha,
+            Asiento.concepto,
+            Asiento.tercero_id,
+            ApunteContable.cuenta_id,
+            ApunteContable.descripcion,
+            centimos_sql(ApunteContable.debe),
+            centimos_sql(ApunteContable.haber),
+            ApunteContable.moneda,
+            centimos_sql(ApunteContable.importe_divisa)
+        )
+        .outerjoin(ApunteContable, ApunteContable.asiento_id == Asiento.id)
+        .where(Asiento.ejercicio_id == ejercicio_id, Asiento.posicion_cadena > tramo.inicio)
+        .order_by(Asiento.posicion_cadena, ApunteContable.id)
+    )
+    if tramo.fin is not None:
+        consulta = consulta.where(Asiento.posicion_cadena <= tramo.fin)
+
+    hash_actual = tramo.hash_inicio
+    posicion_esperada = tramo.inicio + 1
+    filas = db.execute(consulta.execution_options(yield_per=5000))
+    for posicion, grupo in groupby(filas, key=lambda fila: fila[0]):
+        grupo = list(grupo)
+        _, asiento_id, hash_guardado, fecha, concepto, tercero_id = grupo[0][:6]
+        if posicion != posicion_esperada:
+            resultado.incidencias.append(IncidenciaCadena(
+                posicion_esperada, None, f"Faltan asientos entre las posiciones {posicion_esperada} y {posicion - 1}"
+            ))
+        apuntes = [_apunte_canonico(fila[6:12]) for fila in grupo if fila[6] is not None]
+        hash_actual = hash_asiento(hash_actual, ejercicio_id, posicion, fecha, concepto, tercero_id, apuntes)
+        if hash_actual != hash_guardado:
+            resultado.incidencias.append(IncidenciaCadena(posicion, asiento_id, "Hash no coincide con el contenido"))
+            # Se continúa desde el hash almacenado para localizar cada alteración por separado
+            hash_actual = hash_guardado or hash_actual
+        resultado.asientos_verificados += 1
+        posicion_esperada = posicion + 1
+
+    if tramo.hash_fin is not None:
+        if posicion_esperada <= tramo.fin:
+            resultado.incidencias.append(IncidenciaCadena(
+                posicion_esperada, None, f"Faltan asientos hasta el punto de control {tramo.fin}"
+            ))
+        elif hash_actual != tramo.hash_fin:
+            resultado.incidencias.append(IncidenciaCadena(
+                tramo.fin, None, "El punto de control no coincide con la cadena"
+            ))
+    return resultado
+
+
+def _verificar_tramo_en_proceso(url: str, ejercicio_id: int, tramo: _Tramo) -> ResultadoVerificacion:
+    """Punto de entrada de los procesos trabajadores: cada uno abre su propia conexión."""
+    engine = create_engine(url)
+    try:
+        with Session(engine) as db:
+            return _verificar_tramo(db, ejercicio_id, tramo)
+    finally:
+        engine.dispose()
+
+
+class CadenaHashService:
+    """Cadena de hashes a prueba de manipulación sobre los asientos de cada ejercicio."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def siguiente_eslabon(
+        self,
+        ejercicio_id: int,
+        fecha: date,
+        concepto: str,
+        tercero_id: Optional[int],
+        apuntes: Sequence[ApunteCanonico]
+    ) -> Tuple[int, str]:
+        """
+        Calcula la posición y el hash del próximo asiento de la cadena del ejercicio.
+
+        Se llama dentro de la transacción de crear_asiento, antes del INSERT,
+        para que el asiento se escriba ya sellado. La lectura del último
+        eslabón bloquea la cadena del ejercicio hasta el commit, y la
+        restricción única (ejercicio_id, posicion_cadena) impide en cualquier
+        caso que dos registros concurrentes bifurquen la cadena.
+        """
+        posicion_anterior, hash_anterior = self.ultimo_eslabon(ejercicio_id)
+        posicion = posicion_anterior + 1
+        return posicion, hash_asiento(
+            hash_anterior, ejercicio_id, posicion, fecha, concepto, tercero_id, apuntes
+        )
+
+    def ultimo_eslabon(self, ejercicio_id: int) -> Tuple[int, str]:
+        """
+        Posición y hash del último asiento encadenado del ejercicio ((0, génesis) si no hay).
+
+        Solo para escritores: en PostgreSQL bloquea la fila del ejercicio
+        (FOR NO KEY UPDATE) hasta el commit, de modo que los registros
+        concurrentes del mismo ejercicio leen el último eslabón de uno en uno
+        sin impedir las claves foráneas de otras tablas. En SQLite los
+        escritores ya están serializados; si aun así dos registros leen el
+        mismo eslabón, el segundo choca con la restricción única y
+        AsientoService lo reintenta.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(
+                select(EjercicioFiscal.id).where(EjercicioFiscal.id == ejercicio_id).with_for_update(key_share=True)
+            )
+        ultimo = self.db.execute(
+            select(Asiento.posicion_cadena, Asiento.hash_cadena)
+            .where(Asiento.ejercicio_id == ejercicio_id, Asiento.posicion_cadena.is_not(None))
+            .order_by(Asiento.posicion_cadena.desc())
+            .limit(1)
+        ).first()
+        return tuple(ultimo) if ultimo else (0, HASH_GENESIS)
+
+    def registrar_punto_control(self, asiento: Asiento) -> None:
+        """Guarda un punto de control si el asiento cae en un múltiplo del intervalo."""
+        if asiento.posicion_cadena % INTERVALO_PUNTO_CONTROL == 0:
+            self.db.add(PuntoControlCadena(
+                ejercicio_id=asiento.ejercicio_id,
+                posicion=asiento.posicion_cadena,
+                asiento_id=asiento.id,
+                hash_cadena=asiento.hash_cadena
+            ))
+
+    def sellar_pendientes(self) -> int:
+        """
+        Encadena los asientos sin posición (registrados antes de existir la cadena).
+
+        Se añaden al final de la cadena de su ejercicio en orden de registro
+        (id), con sus puntos de control, de modo que verificar() también los
+        cubre. Lo ejecuta la migración que acompaña a la cadena de hashes.
+
+        Returns:
+            int: Número de asientos sellados.
+        """
+        consulta = (
+            select(
+                Asiento.ejercicio_id,
+                Asiento.id,
+                Asiento.fecha,
+                Asiento.concepto,
+                Asiento.tercero_id,
+                ApunteContable.cuenta_id,
+                ApunteContable.descripcion,
+                centimos_sql(ApunteContable.debe),
+                centimos_sql(ApunteContable.haber),
+                ApunteContable.moneda,
+                centimos_sql(ApunteContable.importe_divisa)
+            )
+            .outerjoin(ApunteContable, ApunteContable.asiento_id == Asiento.id)
+            .where(Asiento.posicion_cadena.is_(None))
+            .order_by(Asiento.ejercicio_id, Asiento.id, ApunteContable.id)
+        )
+        filas = self.db.execute(consulta).all()
+        sellados, puntos = [], []
+        for ejercicio_id, asientos in groupby(filas, key=lambda fila: fila[0]):
+            posicion, hash_cadena = self.ultimo_eslabon(ejercicio_id)
+            for asiento_id, grupo in groupby(asientos, key=lambda fila: fila[1]):
+                grupo = list(grupo)
+                _, _, fecha, concepto, tercero_id = grupo[0][:5]
+                apuntes = [_apunte_canonico(fila[5:11]) for fila in grupo if fila[5] is not None]
+                posicion += 1
+                hash_cadena = hash_asiento(hash_cadena, ejercicio_id, posicion, fecha, concepto, tercero_id, apuntes)
+                sellados.append({"id": asiento_id, "posicion_cadena": posicion, "hash_cadena": hash_cadena})
+                if posicion % INTERVALO_PUNTO_CONTROL == 0:
+                    puntos.append({
+                        "ejercicio_id": ejercicio_id,
+                        "posicion": posicion,
+                        "asiento_id": asiento_id,
+                        "hash_cadena": hash_cadena
+                    })
+        if sellados:
+            self.db.execute(update(Asiento), sellados)
+        if puntos:
+            self.db.execute(insert(PuntoControlCadena), puntos)
+        self.db.commit()
+        return len(sellados)
+
+    def verificar(
+        self,
+        ejercicio_id: int,
+        desde: Optional[int] = None,
+        hasta: Optional[int] = None,
+        workers: int = 1
+    ) -> ResultadoVerificacion:
+        """
+        Verifica la cadena de un ejercicio, completa o por rangos.
+
+        El rango se amplía al punto de control anterior a `desde`, de modo que
+        una verificación incremental solo recalcula los tramos nuevos. Cada
+        tramo entre puntos de control es independiente: con `workers > 1` se
+        reparten entre procesos (requiere una base de datos accesible por URL,
+        no SQLite en memoria).
+
+        Args:
+            ejercicio_id: Ejercicio cuya cadena se verifica.
+            desde: Primera posición a verificar (por defecto, el inicio).
+            hasta: Última posición a verificar (por defecto, el final).
+            workers: Número de procesos trabajadores.
+
+        Returns:
+            ResultadoVerificacion: Asientos verificados e incidencias encontradas.
+        """
+        tramos = self._tramos(ejercicio_id, desde, hasta)
+        url = self.db.get_bind().engine.url
+        if workers > 1 and len(tramos) > 1 and url.database not in (None, "", ":memory:"):
+            url_str = url.render_as_string(hide_password=False)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parciales = list(pool.map(
+                    _verificar_tramo_en_proceso,
+                    [url_str] * len(tramos),
+                    [ejercicio_id] * len(tramos),
+                    tramos
+                ))
+        else:
+            parciales = [_verificar_tramo(self.db, ejercicio_id, tramo) for tramo in tramos]
+
+        resultado = ResultadoVerificacion(ejercicio_id)
+        for parcial in parciales:
+            resultado.asientos_verificados += parcial.asientos_verificados
+            resultado.incidencias.extend(parcial.incidencias)
+        return resultado
+
+    def _tramos(self, ejercicio_id: int, desde: Optional[int], hasta: Optional[int]) -> List[_Tramo]:
+        """Divide el rango solicitado en tramos delimitados por puntos de control."""
+        puntos = self.db.execute(
+            select(PuntoControlCadena.posicion, PuntoControlCadena.hash_cadena)
+            .where(PuntoControlCadena.ejercicio_id == ejercicio_id)
+            .order_by(PuntoControlCadena.posicion)
+        ).all()
+
+        inicio, hash_inicio = 0, HASH_GENESIS
+        tramos: List[_Tramo] = []
+        for posicion, hash_punto in puntos:
+            if desde is not None and posicion < desde:
+                inicio, hash_inicio = posicion, hash_punto
+                continue
+            if hasta is not None and posicion > hasta:
+                break
+            tramos.append(_Tramo(inicio, hash_inicio, posicion, hash_punto))
+            inicio, hash_inicio = posicion, hash_punto
+        if hasta is None or inicio < hasta:
+            # Cola posterior al último punto de control
+            tramos.append(_Tramo(inicio, hash_inicio, hasta, None))
+        return tramos
@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.schemas.asiento import AsientoCreate
+from app.services.asiento_service import AsientoRegistrado, AsientoService, INTENTOS_CADENA
+from app.services.cadena_hash_service import es_conflicto_cadena
+from app.services.divisa_service import DivisaService
+from app.exceptions import ConflictoCadenaError
+from app.utils.perfil_memoria import marcar_etapa, perfil
+
+_FIN = object()
+
+
+class ColaAsientos:
+    """
+    Cola de registro de asientos con commit agrupado (group commit).
+
+    Los llamadores envían AsientoCreate y reciben un Future. Un único hilo
+    escritor agrupa los envíos en lotes de hasta `max_lote` asientos o
+    `max_espera_ms` milisegundos y los confirma en una sola transacción: un
+    fsync por lote en lugar de uno por asiento.
+
+    Cada asiento se inserta dentro de un SAVEPOINT con la misma validación y
+    numeración que AsientoService.crear_asiento, de modo que un asiento
+    erróneo solo falla su propio Future. Si otro registro ocupa antes su
+    posición de la cadena de hashes, el SAVEPOINT se reintenta como en
+    AsientoService.registrar_asiento. Si falla el commit del lote (o la
+    sesión), todos sus Future reciben la excepción y el escritor continúa
+    con una sesión nueva. Si el escritor no puede continuar, la cola se
+    cierra: los Future pendientes reciben el error y enviar() falla.
+
+    Uso:
+        with ColaAsientos(SessionLocal) as cola:
+            futuro = cola.enviar(datos)
+            registrado = futuro.result()
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_lote: int = 500,
+        max_espera_ms: float = 5.0
+    ):
+        self._session_factory = session_factory
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1000
+        self._cola: "queue.Queue" = queue.Queue()
+        self._cerrada = False
+        self._cierre = threading.Lock()
+        self._escritor = threading.Thread(target=self._bucle, name="cola-asientos", daemon=True)
+        self._escritor.start()
+
+    def enviar(self, datos: AsientoCreate) -> "Future[AsientoRegistrado]":
+        """Encola un asiento para su registro; el Future se resuelve tras el commit de su lote."""
+        futuro: "Future[AsientoRegistrado]" = Future()
+        with self._cierre:
+            if self._cerrada:
+                raise RuntimeError("La cola de asientos está cerrada")
+            self._cola.put((datos, futuro))
+        return futuro
+
+    def cerrar(self) -> None:
+        """Registra los asientos pendientes y detiene el hilo escritor."""
+        with self._cierre:
+            if self._cerrada:
+                return
+            self._cerrada = True
+            self._cola.put(_FIN)
+        self._escritor.join()
+
+    def __enter__(self) -> "ColaAsientos":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.cerrar()
+
+    def _bucle(self) -> None:
+        db: Optional[Session] = None
+        try:
+            db = self._session_factory()
+            for lote in self._lotes():
+                try:
+                    # Con el perfil de memoria activo, un resumen por lote: el
+                    # hilo escritor vive lo que la cola y no acumula etapas
+                    with perfil("cola_asientos: lote", db):
+                        self._procesar(db, lote)
+                except Exception as e:
+                    # Error de la sesión o de la base de datos fuera de un asiento
+                    # concreto: falla el lote entero y sigue con una sesión nueva
+                    self._fallar(lote, e)
+                    db.close()
+                    db = self._session_factory()
+        except Exception as e:
+            # El hilo no puede continuar (p. ej. no se abre la sesión): cerrar la
+            # cola para que enviar() falle y resolver lo que queda pendiente
+            self._abortar(e)
+        finally:
+            if db is not None:
+                db.close()
+
+    def _lotes(self) -> Iterator[List[Tuple[AsientoCreate, Future]]]:
+        fin = False
+        while not fin:
+            elemento = self._cola.get()
+            if elemento is _FIN:
+                return
+            lote = [elemento]
+            limite = time.monotonic() + self.max_espera
+            while len(lote) < self.max_lote:
+                restante = limite - time.monotonic()
+                try:
+                    elemento = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if elemento is _FIN:
+                    fin = True
+                    break
+                lote.append(elemento)
+            yield lote
+
+    @staticmethod
+    def _fallar(lote: List[Tuple[AsientoCreate, Future]], error: BaseException) -> None:
+        for _, futuro in lote:
+            if not futuro.done():
+                futuro.set_exception(error)
+
+    def _abortar(self, error: BaseException) -> None:
+        with self._cierre:
+            self._cerrada = True
+        pendientes = []
+        while True:
+            try:
+                elemento = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if elemento is not _FIN:
+                pendientes.append(elemento)
+        self._fallar(pendientes, error)
+
+    @staticmethod
+    def _insertar(db: Session, service: AsientoService, datos: AsientoCreate) -> AsientoRegistrado:
+        for _ in range(INTENTOS_CADENA):
+            try:
+                with db.begin_nested():
+                    return service.insertar_asiento(datos)
+            except IntegrityError as e:
+                if not es_conflicto_cadena(e):
+                    raise
+        raise ConflictoCadenaError(datos.ejercicio_id)
+
+    def _procesar(self, db: Session, lote: List[Tuple[AsientoCreate, Future]]) -> None:
+        service = AsientoService(db)
+        divisas = DivisaService(db)
+        # Tipos de cambio de todo el lote con una sola carga de la caché
+        divisas.precargar(a.moneda for datos, _ in lote for a in datos.apuntes if a.moneda)
+        registrados: List[Tuple[Future, AsientoRegistrado]] = []
+        for datos, futuro in lote:
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            try:
+                if any(a.moneda for a in datos.apuntes):
+                    datos = divisas.convertir_asiento(datos)
+                registrados.append((futuro, self._insertar(db, service, datos)))
+            except Exception as e:
+                futuro.set_exception(e)
+        marcar_etapa(f"{len(lote)} asientos insertados")
+
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for futuro, _ in registrados:
+                futuro.set_exception(e)
+            return
+        # Los objetos del lote ya no se necesitan: no acumularlos en el identity map
+        db.expunge_all()
+        for futuro, registrado in registrados:
+            futuro.set_result(registrado)
@@ -0,0 +1,267 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+
+from app.database import identificador_bd
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.cuenta import CuentaContable
+from app.models.ejercicio import EjercicioFiscal
+from app.models.empresa import Empresa
+from app.models.tercero import Tercero
+from app.exceptions import EjercicioNoEncontradoError
+from app.services.archivo_service import DIRECTORIO_ARCHIVO, saldos_archivados
+from app.services.estados_financieros_service import EstadoFinanciero, estados_desde_saldos
+from app.utils.dinero import a_centimos, centimos_sql, desde_centimos
+from app.utils.perfil_memoria import marcar_etapa, perfilado
+from app.utils.trie_prefijos import TriePrefijos
+
+# Cuentas recíprocas que se eliminan en los asientos intragrupo: créditos y
+# deudas comerciales (4), gastos (6) e ingresos (7). La tesorería (57) y el
+# resto de cuentas del asiento no son partidas entre empresas del grupo.
+CUENTAS_ELIMINACION = ("4", "6", "7")
+# Excepciones dentro de las anteriores: los saldos con las Administraciones
+# Públicas (IVA, retenciones) son frente a terceros ajenos al grupo.
+EXCLUIDAS_ELIMINACION = ("47",)
+
+# Saldos de una empresa: (cuenta del grupo, CIF de la contraparte del grupo o None) -> céntimos
+SaldosEmpresa = Dict[Tuple[str, Optional[str]], int]
+
+
+@dataclass
+class BalanceConsolidado:
+    """
+    Balance de sumas y saldos consolidado a una fecha, por cuenta del cuadro común.
+
+    Los saldos son deudores (negativos = acreedores), en euros.
+    """
+    fecha: date
+    empresa_ids: List[int]
+    agregado: Dict[str, Decimal] = field(default_factory=dict)
+    eliminaciones: Dict[str, Decimal] = field(default_factory=dict)
+    consolidado: Dict[str, Decimal] = field(default_factory=dict)
+    # Suma de todo lo eliminado: distinto de cero si las partidas recíprocas no casan
+    descuadre_intragrupo: Decimal = Decimal("0.00")
+    # Empresas cuyos saldos se recalcularon en esta llamada (el resto salió de la caché)
+    recalculadas: List[int] = field(default_factory=list)
+
+
+@dataclass
+class _EntradaCache:
+    version: Tuple
+    saldos: SaldosEmpresa
+
+
+# (base de datos, empresa_id, fecha, CIF del grupo) -> saldos de la empresa con su versión
+_cache_empresas: Dict[Tuple[str, int, date, Tuple[str, ...]], _EntradaCache] = {}
+
+
+def invalidar_cache_consolidacion() -> None:
+    """Descarta los saldos cacheados (p. ej. tras modificar cuentas o terceros)."""
+    _cache_empresas.clear()
+
+
+def _saldos_empresa(
+    db: Session,
+    ejercicio: EjercicioFiscal,
+    fecha: date,
+    cifs_grupo: Sequence[str],
+    directorio_archivo: Path
+) -> Dict[Tuple[str, Optional[str]], int]:
+    """
+    Saldos por (código de cuenta, CIF de contraparte del grupo) con una consulta agrupada.
+
+    Los apuntes de asientos cuyo tercero es otra empresa del grupo se separan
+    por su CIF; el resto queda con contraparte None. Los ejercicios archivados
+    aportan sus saldos finales, sin detalle de contraparte.
+    """
+    if ejercicio.archivado:
+        sumas = saldos_archivados(ejercicio.id, directorio_archivo)
+        codigos = dict(db.execute(
+            select(CuentaContable.id, CuentaContable.codigo).where(CuentaContable.id.in_(sumas.keys()))
+        ).all())
+        return {(codigos[cuenta_id], None): debe - haber for cuenta_id, (debe, haber) in sumas.items()}
+
+    contraparte = case((Tercero.nif.in_(cifs_grupo), Tercero.nif), else_=None).label("contraparte")
+    consulta = (
+        select(
+            CuentaContable.codigo,
+            contraparte,
+            func.sum(centimos_sql(ApunteContable.debe)) - func.sum(centimos_sql(ApunteContable.haber))
+        )
+        .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+        .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+        .outerjoin(Tercero, Tercero.id == Asiento.tercero_id)
+        .where(Asiento.ejercicio_id == ejercicio.id, Asiento.fecha <= fecha)
+        .group_by(CuentaContable.codigo, contraparte)
+    )
+    return {(codigo, cif): saldo for codigo, cif, saldo in db.execute(consulta)}
+
+
+class ConsolidacionService:
+    """Consolidación de las cuentas de varias empresas de un grupo."""
+
+    def __init__(self, db: Session, directorio_archivo: Path = DIRECTORIO_ARCHIVO):
+        self.db = db
+        self.directorio_archivo = Path(directorio_archivo)
+
+    @perfilado("balance_consolidado")
+    def balance_consolidado(
+        self,
+        empresa_ids: Sequence[int],
+        fecha: date,
+        workers: int = 1,
+        excluidas_eliminacion: Sequence[str] = EXCLUIDAS_ELIMINACION,
+        cuentas_eliminacion: Sequence[str] = CUENTAS_ELIMINACION
+    ) -> BalanceConsolidado:
+        """
+        Agrega los saldos de las empresas a una fecha y elimina las partidas intragrupo.
+
+        Cada empresa aporta una consulta agrupada sobre su ejercicio vigente en
+        la fecha; con `workers > 1` las consultas se lanzan en paralelo (cada
+        hilo con su propia sesión; requiere una base de datos accesible por
+        URL, no SQLite en memoria). Los códigos se traducen al cuadro común con
+        el mapeo de prefijos de `Empresa.configuracion["mapeo_consolidacion"]`
+        (por defecto, el mismo código).
+
+        Son intragrupo los apuntes de asientos cuyo tercero tiene como NIF el
+        CIF de otra empresa del grupo. Solo se eliminan las cuentas recíprocas
+        (`cuentas_eliminacion`: 4xx, 6xx y 7xx) salvo las de `excluidas_eliminacion`;
+        la tesorería y el resto del asiento se mantienen.
+
+        Los saldos de cada empresa se cachean por base de datos y fecha junto
+        con una versión (número de asientos, id máximo, archivado y mapeo): solo se recalculan
+        las empresas con asientos nuevos.
+
+        Raises:
+            EjercicioNoEncontradoError: Si alguna empresa no tiene ejercicio en la fecha.
+        """
+        empresas = {
+            empresa.id: empresa
+            for empresa in self.db.execute(select(Empresa).where(Empresa.id.in_(empresa_ids))).scalars()
+        }
+        ejercicios = {
+            ejercicio.empresa_id: ejercicio
+            for ejercicio in self.db.execute(
+                select(EjercicioFiscal).where(
+                    EjercicioFiscal.empresa_id.in_(empresa_ids),
+                    EjercicioFiscal.fecha_inicio <= fecha,
+                    EjercicioFiscal.fecha_fin >= fecha
+                )
+            ).scalars()
+        }
+        for empresa_id in empresa_ids:
+            if empresa_id not in ejercicios:
+                raise EjercicioNoEncontradoError(f"La empresa {empresa_id} no tiene ejercicio fiscal para la fecha {fecha}")
+
+        cifs_grupo = tuple(sorted(empresas[empresa_id].cif for empresa_id in empresa_ids))
+        bd = identificador_bd(self.db)
+        versiones = self._versiones(empresas, ejercicios, fecha)
+        pendientes = [
+            empresa_id for empresa_id in empresa_ids
+            if (entrada := _cache_empresas.get((bd, empresa_id, fecha, cifs_grupo))) is None
+            or entrada.version != versiones[empresa_id]
+        ]
+        for empresa_id, saldos in zip(pendientes, self._calcular(pendientes, ejercicios, fecha, cifs_grupo, workers)):
+            mapeo = self._mapeo(empresas[empresa_id])
+            traducidos: SaldosEmpresa = {}
+            for (codigo, cif), saldo in saldos.items():
+                clave = (mapeo.buscar(codigo) or codigo, cif)
+                traducidos[clave] = traducidos.get(clave, 0) + saldo
+            _cache_empresas[(bd, empresa_id, fecha, cifs_grupo)] = _EntradaCache(versiones[empresa_id], traducidos)
+        marcar_etapa("saldos por empresa")
+
+        agregado: Dict[str, int] = {}
+        eliminaciones: Dict[str, int] = {}
+        for empresa_id in empresa_ids:
+            propio = empresas[empresa_id].cif
+            for (cuenta, cif), saldo in _cache_empresas[(bd, empresa_id, fecha, cifs_grupo)].saldos.items():
+                agregado[cuenta] = agregado.get(cuenta, 0) + saldo
+                if (
+                    cif is not None and cif != propio
+                    and cuenta.startswith(tuple(cuentas_eliminacion))
+                    and not cuenta.startswith(tuple(excluidas_eliminacion))
+                ):
+                    eliminaciones[cuenta] = eliminaciones.get(cuenta, 0) + saldo
+
+        return BalanceConsolidado(
+            fecha=fecha,
+            empresa_ids=list(empresa_ids),
+            agregado={cuenta: desde_centimos(saldo) for cuenta, saldo in sorted(agregado.items())},
+            eliminaciones={cuenta: desde_centimos(saldo) for cuenta, saldo in sorted(eliminaciones.items()) if saldo},
+            consolidado={
+                cuenta: desde_centimos(saldo - eliminaciones.get(cuenta, 0))
+                for cuenta, saldo in sorted(agregado.items())
+                if saldo - eliminaciones.get(cuenta, 0)
+            },
+            descuadre_intragrupo=desde_centimos(sum(eliminaciones.values())),
+            recalculadas=pendientes
+        )
+
+    def estados_consolidados(
+        self, empresa_ids: Sequence[int], fecha: date, workers: int = 1
+    ) -> Tuple[EstadoFinanciero, EstadoFinanciero]:
+        """Balance de Situación y Cuenta de Pérdidas y Ganancias consolidados a una fecha."""
+        balance = self.balance_consolidado(empresa_ids, fecha, workers)
+        return estados_desde_saldos(
+            {cuenta: a_centimos(saldo) for cuenta, saldo in balance.consolidado.items()},
+            "Balance de Situación consolidado",
+            "Cuenta de Pérdidas y Ganancias consolidada"
+        )
+
+    def _versiones(
+        self, empresas: Dict[int, Empresa], ejercicios: Dict[int, EjercicioFiscal], fecha: date
+    ) -> Dict[int, Tuple]:
+        """Versión de los datos de cada empresa a la fecha, con una sola consulta agrupada."""
+        recuentos = {
+            ejercicio_id: (numero, maximo)
+            for ejercicio_id, numero, maximo in self.db.execute(
+                select(Asiento.ejercicio_id, func.count(Asiento.id), func.max(Asiento.id))
+                .where(
+                    Asiento.ejercicio_id.in_([e.id for e in ejercicios.values()]),
+                    Asiento.fecha <= fecha
+                )
+                .group_by(Asiento.ejercicio_id)
+            )
+        }
+        return {
+            empresa_id: (
+                ejercicio.id,
+                ejercicio.archivado,
+                recuentos.get(ejercicio.id, (0, None)),
+                json.dumps((empresas[empresa_id].configuracion or {}).get("mapeo_consolidacion"), sort_keys=True)
+            )
+            for empresa_id, ejercicio in ejercicios.items()
+        }
+
+    def _calcular(
+        self,
+        empresa_ids: List[int],
+        ejercicios: Dict[int, EjercicioFiscal],
+        fecha: date,
+        cifs_grupo: Tuple[str, ...],
+        workers: int
+    ) -> List[Dict[Tuple[str, Optional[str]], int]]:
+        engine = self.db.get_bind().engine
+        if workers > 1 and len(empresa_ids) > 1 and engine.url.database not in (None, "", ":memory:"):
+            def calcular(empresa_id: int):
+                with Session(engine) as db:
+                    return _saldos_empresa(db, ejercicios[empresa_id], fecha, cifs_grupo, self.directorio_archivo)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(calcular, empresa_ids))
+        return [
+            _saldos_empresa(self.db, ejercicios[empresa_id], fecha, cifs_grupo, self.directorio_archivo)
+            for empresa_id in empresa_ids
+        ]
+
+    @staticmethod
+    def _mapeo(empresa: Empresa) -> TriePrefijos[str]:
+        return TriePrefijos(((empresa.configuracion or {}).get("mapeo_consolidacion") or {}).items())
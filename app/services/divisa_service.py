@@ -0,0 +1,270 @@
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import Session
+
+from app.database import identificador_bd
+from app.models.apunte import ApunteContable
+from app.models.asiento import Asiento
+from app.models.cuenta import CuentaContable
+from app.models.tipo_cambio import TipoCambio
+from app.schemas.asiento import AsientoCreate, ApunteDivisa
+from app.utils.dinero import a_centimos, centimos_sql, desde_centimos
+from app.exceptions import TipoCambioNoEncontradoError
+
+MONEDA_BASE = "EUR"
+# Prefijos de las partidas monetarias, las únicas que se revalorizan al cierre
+# (créditos, deudas, tesorería); las no monetarias quedan al tipo histórico.
+PARTIDAS_MONETARIAS = ("16", "17", "25", "26", "40", "41", "43", "44", "46", "47", "52", "54", "55", "56", "57")
+_CENTIMO = Decimal("0.01")
+
+
+@dataclass
+class SerieTipos:
+    """Tipos de cambio de una divisa ordenados por fecha (búsqueda binaria)."""
+    fechas: List[date] = field(default_factory=list)
+    tipos: List[Decimal] = field(default_factory=list)
+
+    def vigente(self, fecha: date) -> Optional[Decimal]:
+        """Último tipo publicado en o antes de `fecha`."""
+        indice = bisect_right(self.fechas, fecha)
+        return self.tipos[indice - 1] if indice else None
+
+
+# Series por base de datos y divisa, válidas para una versión de la tabla de
+# esa base de datos (número de filas, id máximo, suma de revisiones). Al cambiar
+# la versión se sustituye el diccionario de la base de datos en vez de vaciarlo:
+# quien esté leyendo el anterior (p. ej. el hilo de ColaAsientos) no se queda a medias.
+_cache_series: Dict[str, Dict[str, SerieTipos]] = {}
+_versiones_cache: Dict[str, Tuple[int, int, int]] = {}
+_lock_cache = threading.Lock()
+
+
+def invalidar_cache_tipos() -> None:
+    """Descarta los tipos cacheados (p. ej. tras corregir un tipo desde otro proceso)."""
+    with _lock_cache:
+        _cache_series.clear()
+        _versiones_cache.clear()
+
+
+def divisas_de(datos: AsientoCreate) -> Optional[List[Optional[ApunteDivisa]]]:
+    """Origen en divisa de cada apunte, alineado con datos.apuntes (None si todo es en euros)."""
+    if not any(a.moneda for a in datos.apuntes):
+        return None
+    return [(a.moneda, a.importe_divisa) if a.moneda else None for a in datos.apuntes]
+
+
+class DivisaService:
+    """Tipos de cambio, conversión a euros y revalorización de saldos en divisa."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._bd = identificador_bd(db)
+
+    @property
+    def _series(self) -> Dict[str, SerieTipos]:
+        with _lock_cache:
+            return _cache_series.setdefault(self._bd, {})
+
+    def registrar_tipo(self, moneda: str, fecha: date, tipo: Decimal) -> TipoCambio:
+        """Da de alta (o corrige) el tipo de cambio de una divisa en una fecha."""
+        tipo_cambio = self.db.execute(
+            select(TipoCambio).where(TipoCambio.moneda == moneda, TipoCambio.fecha == fecha)
+        ).scalar_one_or_none()
+        if tipo_cambio is None:
+            tipo_cambio = TipoCambio(moneda=moneda, fecha=fecha, tipo=tipo)
+            self.db.add(tipo_cambio)
+        else:
+            tipo_cambio.tipo = tipo
+        self.db.commit()
+        invalidar_cache_tipos()
+        self.db.refresh(tipo_cambio)
+        return tipo_cambio
+
+    def precargar(self, monedas: Iterable[str]) -> None:
+        """
+        Carga en la caché las series de las divisas indicadas con una sola consulta.
+
+        Cada llamada comprueba la versión de la tabla (una consulta agregada);
+        las búsquedas posteriores son en memoria, sin consultas por apunte.
+        """
+        version = tuple(self.db.execute(
+            select(
+                func.count(TipoCambio.id),
+                func.coalesce(func.max(TipoCambio.id), 0),
+                func.coalesce(func.sum(TipoCambio.revision), 0),
+            )
+        ).one())
+        with _lock_cache:
+            if version != _versiones_cache.get(self._bd):
+                _cache_series[self._bd] = {}
+                _versiones_cache[self._bd] = version
+        self._cargar(set(monedas))
+
+    def tipo_cambio(self, moneda: str, fecha: date) -> Decimal:
+        """
+        Tipo vigente en una fecha (unidades de divisa por euro).
+
+        Raises:
+            TipoCambioNoEncontradoError: Si no hay tipo publicado en o antes de la fecha.
+        """
+        if moneda != MONEDA_BASE and moneda not in self._series:
+            self.precargar([moneda])
+        return self._tipo(moneda, fecha)
+
+    def convertir(self, importe_divisa: Decimal, moneda: str, fecha: date) -> Decimal:
+        """Importe en euros, redondeado al céntimo, de un importe en divisa."""
+        return (importe_divisa / self.tipo_cambio(moneda, fecha)).quantize(_CENTIMO, rounding=ROUND_HALF_UP)
+
+    def convertir_asientos(self, lote: Sequence[AsientoCreate]) -> List[AsientoCreate]:
+        """
+        Convierte a euros los apuntes en divisa de un lote de asientos.
+
+        Los tipos de todas las divisas del lote se cargan de una vez; cada
+        conversión es una búsqueda binaria en memoria.
+        """
+        self.precargar(a.moneda for datos in lote for a in datos.apuntes if a.moneda)
+        return [self.convertir_asiento(datos) for datos in lote]
+
+    def convertir_asiento(self, datos: AsientoCreate) -> AsientoCreate:
+        """
+        Rellena debe/haber de los apuntes en divisa que no traen importe en euros.
+
+        El signo de importe_divisa decide el lado. Si todos los apuntes se han
+        convertido desde la misma divisa, el descuadre por redondeo (como mucho
+        un céntimo por apunte) se ajusta en el apunte de mayor importe.
+        """
+        apuntes = []
+        convertidos = 0
+        for apunte in datos.apuntes:
+            if apunte.moneda and not apunte.debe and not apunte.haber:
+                euros = (apunte.importe_divisa.copy_abs() / self._tipo(apunte.moneda, datos.fecha)).quantize(
+                    _CENTIMO, rounding=ROUND_HALF_UP
+                )
+                lado = "debe" if apunte.importe_divisa > 0 else "haber"
+                apunte = apunte.model_copy(update={lado: euros})
+                convertidos += 1
+            apuntes.append(apunte)
+        if not convertidos:
+            return datos
+
+        diferencia = sum(a.debe for a in apuntes) - sum(a.haber for a in apuntes)
+        if (
+            diferencia
+            and convertidos == len(apuntes)
+            and len({a.moneda for a in apuntes}) == 1
+            and abs(diferencia) <= _CENTIMO * len(apuntes)
+        ):
+            lado = "debe" if diferencia > 0 else "haber"
+            indice = max(range(len(apuntes)), key=lambda i: getattr(apuntes[i], lado))
+            apuntes[indice] = apuntes[indice].model_copy(
+                update={lado: getattr(apuntes[indice], lado) - abs(diferencia)}
+            )
+        return datos.model_copy(update={"apuntes": apuntes})
+
+    def revalorizar(
+        self,
+        ejercicio_id: int,
+        fecha: date,
+        cuenta_diferencias_negativas: str = "668",
+        cuenta_diferencias_positivas: str = "768",
+        prefijos_monetarios: Sequence[str] = PARTIDAS_MONETARIAS
+    ) -> Optional[Asiento]:
+        """
+        Registra las diferencias de cambio de las partidas monetarias en divisa a una fecha.
+
+        Los saldos en divisa y en euros de cada (cuenta, divisa) salen de una
+        única consulta agrupada; cada saldo se valora al tipo de cierre y la
+        diferencia se contabiliza contra 668 (negativas) o 768 (positivas) en
+        un solo asiento. Los ajustes llevan la divisa con importe 0, de modo que
+        una revalorización posterior parte del saldo ya ajustado.
+
+        Returns:
+            Optional[Asiento]: El asiento de diferencias, o None si no hay ninguna.
+        """
+        # Importación local: AsientoService depende de este módulo para convertir.
+        from app.services.asiento_service import AsientoService
+
+        saldos = self.db.execute(
+            select(
+                CuentaContable.codigo,
+                ApunteContable.moneda,
+                func.sum(centimos_sql(ApunteContable.importe_divisa)),
+                func.sum(centimos_sql(ApunteContable.debe) - centimos_sql(ApunteContable.haber))
+            )
+            .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+            .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+            .where(
+                Asiento.ejercicio_id == ejercicio_id,
+                Asiento.fecha <= fecha,
+                ApunteContable.moneda.is_not(None),
+                or_(*[CuentaContable.codigo.startswith(prefijo) for prefijo in prefijos_monetarios])
+            )
+            .group_by(CuentaContable.codigo, ApunteContable.moneda)
+            .order_by(CuentaContable.codigo, ApunteContable.moneda)
+        ).all()
+        self.precargar(moneda for _, moneda, _, _ in saldos)
+
+        concepto = f"Diferencias de cambio a {fecha.isoformat()}"
+        apuntes, divisas = [], []
+        negativas = positivas = 0
+        for codigo, moneda, saldo_divisa, saldo_euros in saldos:
+            valor_cierre = a_centimos(
+                (desde_centimos(saldo_divisa) / self._tipo(moneda, fecha)).quantize(_CENTIMO, rounding=ROUND_HALF_UP)
+            )
+            diferencia = valor_cierre - saldo_euros
+            if diferencia == 0:
+                continue
+            if diferencia > 0:
+                apuntes.append((codigo, f"{concepto} ({moneda})", desde_centimos(diferencia), Decimal(0)))
+                positivas += diferencia
+            else:
+                apuntes.append((codigo, f"{concepto} ({moneda})", Decimal(0), desde_centimos(-diferencia)))
+                negativas -= diferencia
+            divisas.append((moneda, Decimal("0.00")))
+        if not apuntes:
+            return None
+
+        if negativas:
+            apuntes.append((cuenta_diferencias_negativas, concepto, desde_centimos(negativas), Decimal(0)))
+            divisas.append(None)
+        if positivas:
+            apuntes.append((cuenta_diferencias_positivas, concepto, Decimal(0), desde_centimos(positivas)))
+            divisas.append(None)
+        return AsientoService(self.db)._registrar_asiento(
+            fecha, concepto, ejercicio_id, apuntes, divisas=divisas
+        )
+
+    def _cargar(self, monedas: set) -> Dict[str, SerieTipos]:
+        cache = self._series
+        with _lock_cache:
+            pendientes = sorted(monedas - cache.keys() - {MONEDA_BASE})
+        if not pendientes:
+            return cache
+        series = {moneda: SerieTipos() for moneda in pendientes}
+        for moneda, fecha, tipo in self.db.execute(
+            select(TipoCambio.moneda, TipoCambio.fecha, TipoCambio.tipo)
+            .where(TipoCambio.moneda.in_(pendientes))
+            .order_by(TipoCambio.moneda, TipoCambio.fecha)
+        ):
+            series[moneda].fechas.append(fecha)
+            series[moneda].tipos.append(tipo)
+        with _lock_cache:
+            cache.update(series)
+        return cache
+
+    def _tipo(self, moneda: str, fecha: date) -> Decimal:
+        if moneda == MONEDA_BASE:
+            return Decimal(1)
+        serie = self._series.get(moneda)
+        if serie is None:
+            serie = self._cargar({moneda})[moneda]
+        tipo = serie.vigente(fecha)
+        if tipo is None:
+            raise TipoCambioNoEncontradoError(moneda, fecha)
+        return tipo
@@ -0,0 +1,95 @@
+from sqlalchemy import select, update, func, text
+from sqlalchemy.orm import Session
+
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.ejercicio import EjercicioFiscal
+from app.services.eventos_service import EJERCICIO_RENUMERADO, publicar_eventos
+from app.utils.perfil_memoria import perfilado
+from app.exceptions import EjercicioCerradoError, EjercicioNoEncontradoError
+
+class EjercicioService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def renumerar_asientos(self, ejercicio_id: int) -> int:
+        """
+        Reasigna el número de los asientos del ejercicio en orden cronológico.
+
+        El libro diario debe numerarse por fecha; los asientos con fecha
+        retroactiva rompen el orden de registro. La renumeración se hace con un
+        único UPDATE basado en ROW_NUMBER() OVER (ORDER BY fecha, id) dentro de
+        una transacción, sin cargar asientos en el ORM.
+
+        Returns:
+            int: Número de asientos cuyo número ha cambiado.
+        """
+        self._bloquear_ejercicio(ejercicio_id)
+        renumerados = self._renumerar(ejercicio_id)
+        self.db.commit()
+        return renumerados
+
+    @perfilado("cierre_ejercicio")
+    def cerrar_ejercicio(self, ejercicio_id: int) -> EjercicioFiscal:
+        """
+        Cierra el ejercicio dejando el libro diario numerado cronológicamente.
+
+        La renumeración y el cambio de estado se confirman en la misma transacción.
+        """
+        ejercicio = self._bloquear_ejercicio(ejercicio_id)
+        if not ejercicio.estado:
+            raise EjercicioCerradoError(f"El ejercicio {ejercicio_id} ya está cerrado")
+        self._renumerar(ejercicio_id)
+        ejercicio.estado = False
+        self.db.commit()
+        self.db.refresh(ejercicio)
+        return ejercicio
+
+    def _bloquear_ejercicio(self, ejercicio_id: int) -> EjercicioFiscal:
+        ejercicio = self.db.execute(
+            select(EjercicioFiscal).where(EjercicioFiscal.id == ejercicio_id).with_for_update()
+        ).scalar_one_or_none()
+        if not ejercicio:
+            raise EjercicioNoEncontradoError(f"No existe el ejercicio fiscal {ejercicio_id}")
+        return ejercicio
+
+    def _renumerar(self, ejercicio_id: int) -> int:
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Bloquea nuevas inserciones en asientos hasta el commit: un registro
+            # concurrente calculará su número (max + 1) sobre la numeración ya
+            # reasignada. En SQLite el UPDATE ya serializa a los escritores.
+            self.db.execute(text("LOCK TABLE asientos IN SHARE ROW EXCLUSIVE MODE"))
+
+        orden = (
+            select(
+                Asiento.id,
+                func.row_number().over(order_by=(Asiento.fecha, Asiento.id)).label("nuevo_numero")
+            )
+            .where(Asiento.ejercicio_id == ejercicio_id)
+            .subquery()
+        )
+        resultado = self.db.execute(
+            update(Asiento)
+            .where(Asiento.id == orden.c.id, Asiento.numero != orden.c.nuevo_numero)
+            .values(numero=orden.c.nuevo_numero)
+            .execution_options(synchronize_session=False)
+        )
+        if resultado.rowcount:
+            # Copia del número en los apuntes (orden del mayor paginado)
+            self.db.execute(
+                update(ApunteContable)
+                .where(ApunteContable.ejercicio_id == ejercicio_id)
+                .values(numero=select(Asiento.numero).where(Asiento.id == ApunteContable.asiento_id).scalar_subquery())
+                .execution_options(synchronize_session=False)
+            )
+        # Los Asiento ya cargados en la sesión tienen el número antiguo
+        self.db.expire_all()
+        if resultado.rowcount:
+            # Los consumidores deben volver a leer los números del ejercicio
+            publicar_eventos(self.db, [{
+                "tipo": EJERCICIO_RENUMERADO,
+                "ejercicio_id": ejercicio_id,
+                "asiento_id": None,
+                "carga": {"ejercicio_id": ejercicio_id, "renumerados": resultado.rowcount},
+            }])
+        return resultado.rowcount
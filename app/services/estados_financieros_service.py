@@ -0,0 +1,330 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.database import identificador_bd
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.cuenta import CuentaContable
+from app.models.ejercicio import EjercicioFiscal
+from app.exceptions import EjercicioNoEncontradoError
+from app.services.archivo_service import DIRECTORIO_ARCHIVO, saldos_archivados
+from app.utils.dinero import centimos_sql, desde_centimos
+from app.utils.perfil_memoria import marcar_etapa, perfilado
+from app.utils.trie_prefijos import TriePrefijos
+
+
+@dataclass(frozen=True)
+class DefinicionLinea:
+    """
+    Línea de un estado financiero oficial (modelo abreviado del PGC 2007).
+
+    Attributes:
+        clave (str): Identificador de la línea.
+        titulo (str): Texto oficial de la línea.
+        prefijos (tuple): Prefijos de código de cuenta que suman en la línea.
+        signo (int): 1 = se presenta el saldo deudor, -1 = el saldo acreedor.
+        suma_de (tuple): Si no está vacío, la línea es un subtotal de otras líneas.
+    """
+    clave: str
+    titulo: str
+    prefijos: Tuple[str, ...] = ()
+    signo: int = 1
+    suma_de: Tuple[str, ...] = ()
+
+
+BALANCE: Tuple[DefinicionLinea, ...] = (
+    # ACTIVO (saldo deudor; amortizaciones y deterioros restan por su saldo acreedor)
+    DefinicionLinea("A.I", "Inmovilizado intangible", ("20", "280", "290")),
+    DefinicionLinea("A.II", "Inmovilizado material", ("21", "23", "281", "291")),
+    DefinicionLinea("A.III", "Inversiones inmobiliarias", ("22", "282", "292")),
+    DefinicionLinea("A.IV", "Inversiones financieras a largo plazo",
+                    ("24", "25", "26", "293", "294", "295", "296", "297", "298")),
+    DefinicionLinea("A.V", "Activos por impuesto diferido", ("474",)),
+    DefinicionLinea("A", "A) ACTIVO NO CORRIENTE", suma_de=("A.I", "A.II", "A.III", "A.IV", "A.V")),
+    DefinicionLinea("B.I", "Existencias", ("3", "407")),
+    DefinicionLinea("B.II", "Deudores comerciales y otras cuentas a cobrar",
+                    ("43", "44", "460", "470", "471", "472", "473", "490", "493", "544", "5580")),
+    DefinicionLinea("B.III", "Inversiones financieras a corto plazo", ("53", "54", "59")),
+    DefinicionLinea("B.IV", "Periodificaciones a corto plazo", ("480", "567")),
+    DefinicionLinea("B.V", "Efectivo y otros activos líquidos equivalentes", ("57",)),
+    DefinicionLinea("B", "B) ACTIVO CORRIENTE", suma_de=("B.I", "B.II", "B.III", "B.IV", "B.V")),
+    DefinicionLinea("TA", "TOTAL ACTIVO (A + B)", suma_de=("A", "B")),
+    # PATRIMONIO NETO Y PASIVO (saldo acreedor)
+    DefinicionLinea("PN.1", "Fondos propios", ("10", "11", "12"), -1),
+    # Grupos 6 y 7 sin regularizar: resultado del ejercicio en curso
+    DefinicionLinea("PN.1.R", "Resultado del ejercicio", ("129", "6", "7"), -1),
+    DefinicionLinea("PN.2", "Ajustes por cambios de valor y subvenciones", ("13",), -1),
+    DefinicionLinea("PN", "A) PATRIMONIO NETO", suma_de=("PN.1", "PN.1.R", "PN.2")),
+    DefinicionLinea("PNC.I", "Provisiones a largo plazo", ("14",), -1),
+    DefinicionLinea("PNC.II", "Deudas a largo plazo", ("15", "16", "17", "18"), -1),
+    DefinicionLinea("PNC.III", "Pasivos por impuesto diferido", ("479",), -1),
+    DefinicionLinea("PNC", "B) PASIVO NO CORRIENTE", suma_de=("PNC.I", "PNC.II", "PNC.III")),
+    DefinicionLinea("PC.I", "Provisiones a corto plazo", ("499", "529"), -1),
+    DefinicionLinea("PC.II", "Deudas a corto plazo", ("50", "51", "52", "55", "56"), -1),
+    DefinicionLinea("PC.III", "Acreedores comerciales y otras cuentas a pagar",
+                    ("40", "41", "438", "465", "466", "475", "476", "477"), -1),
+    DefinicionLinea("PC.IV", "Periodificaciones a corto plazo", ("485", "568"), -1),
+    DefinicionLinea("PC", "C) PASIVO CORRIENTE", suma_de=("PC.I", "PC.II", "PC.III", "PC.IV")),
+    DefinicionLinea("TPN", "TOTAL PATRIMONIO NETO Y PASIVO (A + B + C)", suma_de=("PN", "PNC", "PC")),
+)
+
+# En la cuenta de pérdidas y ganancias los ingresos son positivos y los gastos negativos
+PERDIDAS_GANANCIAS: Tuple[DefinicionLinea, ...] = (
+    DefinicionLinea("1", "Importe neto de la cifra de negocios", ("70",), -1),
+    DefinicionLinea("2", "Variación de existencias de productos terminados y en curso",
+                    ("71", "6930", "7930"), -1),
+    DefinicionLinea("3", "Trabajos realizados por la empresa para su activo", ("73",), -1),
+    DefinicionLinea("4", "Aprovisionamientos",
+                    ("60", "61", "6931", "6932", "6933", "7931", "7932", "7933"), -1),
+    DefinicionLinea("5", "Otros ingresos de explotación", ("74", "75"), -1),
+    DefinicionLinea("6", "Gastos de personal", ("64",), -1),
+    DefinicionLinea("7", "Otros gastos de explotación",
+                    ("62", "631", "634", "636", "639", "65", "694", "695", "794", "7954"), -1),
+    DefinicionLinea("8", "Amortización del inmovilizado", ("68",), -1),
+    DefinicionLinea("9", "Imputación de subvenciones de inmovilizado no financiero y otras", ("746",), -1),
+    DefinicionLinea("10", "Excesos de provisiones", ("7951", "7952", "7955", "7956"), -1),
+    DefinicionLinea("11", "Deterioro y resultado por enajenaciones del inmovilizado",
+                    ("670", "671", "672", "690", "691", "692", "770", "771", "772", "790", "791", "792"), -1),
+    DefinicionLinea("12", "Otros resultados", ("678", "778"), -1),
+    DefinicionLinea("A.1", "A.1) RESULTADO DE EXPLOTACIÓN",
+                    suma_de=("1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12")),
+    DefinicionLinea("13", "Ingresos financieros", ("760", "761", "762", "767", "769"), -1),
+    DefinicionLinea("14", "Gastos financieros", ("660", "661", "662", "664", "665", "669"), -1),
+    DefinicionLinea("15", "Variación de valor razonable en instrumentos financieros", ("663", "763"), -1),
+    DefinicionLinea("16", "Diferencias de cambio", ("668", "768"), -1),
+    DefinicionLinea("17", "Deterioro y resultado por enajenaciones de instrumentos financieros",
+                    ("666", "667", "673", "675", "696", "697", "698", "699",
+                     "766", "773", "775", "796", "797", "798", "799"), -1),
+    DefinicionLinea("A.2", "A.2) RESULTADO FINANCIERO", suma_de=("13", "14", "15", "16", "17")),
+    DefinicionLinea("A.3", "A.3) RESULTADO ANTES DE IMPUESTOS", suma_de=("A.1", "A.2")),
+    DefinicionLinea("18", "Impuestos sobre beneficios", ("630", "633", "638"), -1),
+    DefinicionLinea("A.4", "A.4) RESULTADO DEL EJERCICIO", suma_de=("A.3", "18")),
+)
+
+LINEA_SIN_CLASIFICAR = DefinicionLinea("SC", "Cuentas sin clasificar")
+
+
+@dataclass
+class LineaEstado:
+    """Importe de una línea de un estado financiero, con el del ejercicio anterior."""
+    clave: str
+    titulo: str
+    importe: Decimal
+    importe_anterior: Optional[Decimal] = None
+
+
+@dataclass
+class EstadoFinanciero:
+    nombre: str
+    lineas: List[LineaEstado] = field(default_factory=list)
+
+    def linea(self, clave: str) -> LineaEstado:
+        return next(linea for linea in self.lineas if linea.clave == clave)
+
+
+@dataclass
+class EstadosFinancieros:
+    """Balance de Situación y Cuenta de Pérdidas y Ganancias de un ejercicio."""
+    ejercicio_id: int
+    ejercicio_anterior_id: Optional[int]
+    balance: EstadoFinanciero
+    perdidas_ganancias: EstadoFinanciero
+
+
+def _compilar_trie(definiciones: Sequence[DefinicionLinea]) -> TriePrefijos[DefinicionLinea]:
+    return TriePrefijos(
+        (prefijo, definicion) for definicion in definiciones for prefijo in definicion.prefijos
+    )
+
+
+_TRIE_BALANCE = _compilar_trie(BALANCE)
+_TRIE_PYG = _compilar_trie(PERDIDAS_GANANCIAS)
+
+# Mapeo cuenta_id -> (línea del balance, línea de PyG), por base de datos con la
+# versión del cuadro de cuentas para la que se compiló
+MapeoCuentas = Dict[int, Tuple[Optional[str], Optional[str]]]
+_cache_mapeos: Dict[str, Tuple[Tuple[int, int, int], MapeoCuentas]] = {}
+
+
+def invalidar_cache_mapeo() -> None:
+    """Descarta los mapeos compilados (p. ej. al reutilizar ids tras un rollback)."""
+    _cache_mapeos.clear()
+
+
+def _lineas_cuenta(codigo: str) -> Tuple[str, Optional[str]]:
+    """(línea del balance, línea de PyG) de un código de cuenta por prefijo más largo."""
+    linea_balance = _TRIE_BALANCE.buscar(codigo)
+    linea_pyg = _TRIE_PYG.buscar(codigo)
+    return (
+        linea_balance.clave if linea_balance else LINEA_SIN_CLASIFICAR.clave,
+        linea_pyg.clave if linea_pyg else None
+    )
+
+
+class EstadosFinancierosService:
+    """Generación del Balance de Situación y la Cuenta de Pérdidas y Ganancias."""
+
+    def __init__(self, db: Session, directorio_archivo: Path = DIRECTORIO_ARCHIVO):
+        self.db = db
+        self.directorio_archivo = Path(directorio_archivo)
+
+    def generar(self, ejercicio_id: int) -> EstadosFinancieros:
+        """
+        Calcula los estados financieros de un ejercicio con la columna comparativa.
+
+        Los saldos del ejercicio y del anterior (mismo empresa, inmediatamente
+        previo) salen de una única consulta agrupada por (ejercicio, cuenta).
+        Se asume que cada ejercicio incluye su asiento de apertura.
+        """
+        return self.generar_cartera([ejercicio_id])[ejercicio_id]
+
+    @perfilado("estados_financieros")
+    def generar_cartera(self, ejercicio_ids: Sequence[int]) -> Dict[int, EstadosFinancieros]:
+        """Estados financieros de varios ejercicios (p. ej. todas las empresas) con un mapeo compartido."""
+        mapeo = self._mapeo_cuentas()
+        marcar_etapa("mapeo de cuentas")
+        resultado = {}
+        for ejercicio_id in ejercicio_ids:
+            ejercicio = self.db.get(EjercicioFiscal, ejercicio_id)
+            if not ejercicio:
+                raise EjercicioNoEncontradoError(f"No existe el ejercicio fiscal {ejercicio_id}")
+            anterior = self._ejercicio_anterior(ejercicio)
+            anterior_id = anterior.id if anterior else None
+            saldos = self._saldos_por_cuenta([e for e in (ejercicio, anterior) if e])
+            marcar_etapa(f"saldos del ejercicio {ejercicio_id}")
+            resultado[ejercicio_id] = EstadosFinancieros(
+                ejercicio_id=ejercicio_id,
+                ejercicio_anterior_id=anterior_id,
+                balance=self._construir(
+                    "Balance de Situación", BALANCE, 0, mapeo, saldos, ejercicio_id, anterior_id
+                ),
+                perdidas_ganancias=self._construir(
+                    "Cuenta de Pérdidas y Ganancias", PERDIDAS_GANANCIAS, 1, mapeo, saldos, ejercicio_id, anterior_id
+                )
+            )
+        return resultado
+
+    def _mapeo_cuentas(self) -> MapeoCuentas:
+        """
+        Asigna cada cuenta a su línea de balance y de PyG, cacheado por versión del cuadro.
+
+        La versión es (número de cuentas, id máximo, suma de revisiones) dentro
+        de cada base de datos: cambia con las altas, las bajas y cualquier
+        modificación de una cuenta, también desde otro proceso.
+        """
+        bd = identificador_bd(self.db)
+        version = tuple(self.db.execute(
+            select(
+                func.count(CuentaContable.id),
+                func.coalesce(func.max(CuentaContable.id), 0),
+                func.coalesce(func.sum(CuentaContable.revision), 0),
+            )
+        ).one())
+        version_cache, mapeo = _cache_mapeos.get(bd, (None, None))
+        if version_cache != version:
+            mapeo = {}
+            for cuenta_id, codigo in self.db.execute(select(CuentaContable.id, CuentaContable.codigo)):
+                mapeo[cuenta_id] = _lineas_cuenta(codigo)
+            _cache_mapeos[bd] = (version, mapeo)
+        return mapeo
+
+    def _ejercicio_anterior(self, ejercicio: EjercicioFiscal) -> Optional[EjercicioFiscal]:
+        return self.db.execute(
+            select(EjercicioFiscal)
+            .where(
+                EjercicioFiscal.empresa_id == ejercicio.empresa_id,
+                EjercicioFiscal.fecha_fin < ejercicio.fecha_inicio
+            )
+            .order_by(EjercicioFiscal.fecha_fin.desc())
+            .limit(1)
+        ).scalar()
+
+    def _saldos_por_cuenta(self, ejercicios: List[EjercicioFiscal]) -> Dict[Tuple[int, int], int]:
+        """
+        Saldo deudor en céntimos por (ejercicio, cuenta), en una sola consulta agrupada.
+
+        Los ejercicios archivados toman los saldos finales guardados en su fichero.
+        """
+        saldos: Dict[Tuple[int, int], int] = {}
+        for ejercicio in ejercicios:
+            if ejercicio.archivado:
+                for cuenta_id, (debe, haber) in saldos_archivados(ejercicio.id, self.directorio_archivo).items():
+                    saldos[(ejercicio.id, cuenta_id)] = debe - haber
+        ejercicio_ids = [e.id for e in ejercicios if not e.archivado]
+        if not ejercicio_ids:
+            return saldos
+        filas = self.db.execute(
+            select(
+                Asiento.ejercicio_id,
+                ApunteContable.cuenta_id,
+                func.sum(centimos_sql(ApunteContable.debe)) - func.sum(centimos_sql(ApunteContable.haber))
+            )
+            .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+            .where(Asiento.ejercicio_id.in_(ejercicio_ids))
+            .group_by(Asiento.ejercicio_id, ApunteContable.cuenta_id)
+        )
+        saldos.update(((ejercicio_id, cuenta_id), saldo) for ejercicio_id, cuenta_id, saldo in filas)
+        return saldos
+
+    @staticmethod
+    def _construir(
+        nombre: str,
+        definiciones: Sequence[DefinicionLinea],
+        indice_mapeo: int,
+        mapeo: MapeoCuentas,
+        saldos: Dict[Tuple[int, int], int],
+        ejercicio_id: int,
+        anterior_id: Optional[int]
+    ) -> EstadoFinanciero:
+        # Acumular saldos por línea en céntimos (actual, anterior)
+        acumulados: Dict[str, List[int]] = {}
+        for (saldo_ejercicio, cuenta_id), saldo in saldos.items():
+            clave = mapeo.get(cuenta_id, (LINEA_SIN_CLASIFICAR.clave, None))[indice_mapeo]
+            if clave is None:
+                continue
+            columna = 0 if saldo_ejercicio == ejercicio_id else 1
+            acumulados.setdefault(clave, [0, 0])[columna] += saldo
+
+        definiciones_sc = list(definiciones)
+        if LINEA_SIN_CLASIFICAR.clave in acumulados:
+            definiciones_sc.append(LINEA_SIN_CLASIFICAR)
+
+        importes: Dict[str, List[int]] = {}
+        estado = EstadoFinanciero(nombre)
+        for definicion in definiciones_sc:
+            if definicion.suma_de:
+                actual = sum(importes[clave][0] for clave in definicion.suma_de)
+                anterior = sum(importes[clave][1] for clave in definicion.suma_de)
+            else:
+                actual, anterior = (definicion.signo * s for s in acumulados.get(definicion.clave, (0, 0)))
+            importes[definicion.clave] = [actual, anterior]
+            estado.lineas.append(LineaEstado(
+                definicion.clave,
+                definicion.titulo,
+                desde_centimos(actual),
+                desde_centimos(anterior) if anterior_id else None
+            ))
+        return estado
+
+
+def estados_desde_saldos(
+    saldos: Dict[str, int], nombre_balance: str, nombre_pyg: str
+) -> Tuple[EstadoFinanciero, EstadoFinanciero]:
+    """
+    Balance y PyG de una sola columna a partir de saldos deudores en céntimos por código de cuenta.
+
+    Para saldos que no salen de un ejercicio de la base de datos (p. ej. los
+    consolidados); las cuentas se clasifican con las mismas líneas que generar().
+    """
+    mapeo = {codigo: _lineas_cuenta(codigo) for codigo in saldos}
+    # Sin ejercicio anterior: todas las claves con el "ejercicio" 0
+    por_columna = {(0, codigo): saldo for codigo, saldo in saldos.items()}
+    return (
+        EstadosFinancierosService._construir(nombre_balance, BALANCE, 0, mapeo, por_columna, 0, None),
+        EstadosFinancierosService._construir(nombre_pyg, PERDIDAS_GANANCIAS, 1, mapeo, por_columna, 0, None)
+    )
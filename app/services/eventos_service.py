@@ -0,0 +1,186 @@
+from dataclasses import asdict, dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from sqlalchemy import BigInteger, Integer, Text, select, delete, insert, func, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.evento_contable import EventoContable
+from app.schemas.asiento import ApunteTupla, ApunteDivisa
+
+# Tipos de evento (valores estables para los consumidores)
+ASIENTO_REGISTRADO = "asiento_registrado"
+EJERCICIO_RENUMERADO = "ejercicio_renumerado"
+
+TAMANO_LOTE_EVENTOS = 1000
+
+# Posición de un consumidor en la bandeja: (transacción, secuencia) del último
+# evento recibido. Los eventos se leen en ese orden, que no cambia al confirmarse
+# transacciones posteriores (ver EventosService.leer).
+Cursor = Tuple[int, int]
+INICIO: Cursor = (0, 0)
+_TIPOS_CURSOR = (BigInteger, Integer)
+
+
+@dataclass
+class Evento:
+    """Evento leído de la bandeja de salida."""
+    secuencia: int
+    tipo: str
+    ejercicio_id: int
+    asiento_id: Optional[int]
+    carga: Dict[str, Any]
+    transaccion: int = 0
+
+    @property
+    def cursor(self) -> Cursor:
+        return (self.transaccion, self.secuencia)
+
+    def a_dict(self) -> Dict:
+        return asdict(self)
+
+
+class Sumidero(Protocol):
+    """Destino de una sincronización: guarda eventos y recuerda el último recibido."""
+
+    def ultimo_cursor(self) -> Cursor: ...
+
+    def escribir(self, eventos: Sequence[Evento]) -> None: ...
+
+
+def _importe(valor: Decimal) -> str:
+    return f"{valor:.2f}"
+
+
+def evento_asiento(
+    asiento_id: int,
+    fila: Dict[str, Any],
+    apuntes: Sequence[ApunteTupla],
+    divisas: Optional[Sequence[Optional[ApunteDivisa]]] = None
+) -> Dict[str, Any]:
+    """
+    Fila de EventoContable de un asiento registrado.
+
+    La carga lleva el asiento completo (con los importes como texto con dos
+    decimales) para que el consumidor no tenga que volver a consultarlo.
+
+    Args:
+        fila: Valores de la fila insertada en asientos (ejercicio_id, numero, fecha, ...).
+        apuntes: Tuplas (cuenta_codigo, descripcion, debe, haber) del asiento.
+        divisas: Origen en divisa (moneda, importe) de cada apunte, o None.
+    """
+    divisas = divisas or [None] * len(apuntes)
+    fecha: date = fila["fecha"]
+    return {
+        "tipo": ASIENTO_REGISTRADO,
+        "ejercicio_id": fila["ejercicio_id"],
+        "asiento_id": asiento_id,
+        "carga": {
+            "asiento_id": asiento_id,
+            "ejercicio_id": fila["ejercicio_id"],
+            "numero": fila["numero"],
+            "fecha": fecha.isoformat(),
+            "concepto": fila["concepto"],
+            "tercero_id": fila.get("tercero_id"),
+            "apuntes": [
+                {
+                    "cuenta_codigo": cuenta_codigo,
+                    "descripcion": descripcion,
+                    "debe": _importe(debe),
+                    "haber": _importe(haber),
+                    **({"moneda": divisa[0], "importe_divisa": _importe(divisa[1])} if divisa else {})
+                }
+                for (cuenta_codigo, descripcion, debe, haber), divisa in zip(apuntes, divisas)
+            ],
+        },
+    }
+
+
+def publicar_eventos(db: Session, filas: Sequence[Dict[str, Any]]) -> None:
+    """
+    Inserta eventos en la bandeja de salida dentro de la transacción en curso.
+
+    Sin bloqueos: en PostgreSQL cada evento guarda el id de su transacción y
+    los consumidores solo leen las transacciones ya terminadas (ver
+    EventosService.leer). En SQLite los escritores ya están serializados y
+    los ids se hacen visibles en orden.
+    """
+    if not filas:
+        return
+    sentencia = insert(EventoContable)
+    if db.get_bind().dialect.name == "postgresql":
+        sentencia = sentencia.values(transaccion=func.pg_current_xact_id().cast(Text).cast(BigInteger))
+    db.execute(sentencia, list(filas))
+
+
+class EventosService:
+    """
+    Lectura incremental de la bandeja de salida (change feed).
+
+    Los consumidores (almacén de datos, notificaciones) guardan la secuencia
+    del último evento procesado y piden los posteriores por lotes, en lugar
+    de volver a leer la tabla de asientos completa.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def leer(self, despues_de: Cursor = INICIO, limite: int = TAMANO_LOTE_EVENTOS) -> List[Evento]:
+        """
+        Eventos posteriores al cursor `despues_de`, en orden, como mucho `limite`.
+
+        En PostgreSQL los ids se reparten antes del commit y una transacción
+        lenta podría confirmar un id menor que otro ya leído. Por eso se ordena
+        por (transacción, id) y solo se devuelven eventos de transacciones
+        anteriores a la más antigua aún en curso (xmin de la instantánea): ningún
+        evento que se confirme después puede quedar por detrás del cursor.
+        """
+        clave = tuple_(EventoContable.transaccion, EventoContable.id)
+        consulta = (
+            select(
+                EventoContable.id, EventoContable.tipo, EventoContable.ejercicio_id,
+                EventoContable.asiento_id, EventoContable.carga, EventoContable.transaccion
+            )
+            .where(clave > tuple_(*despues_de, types=_TIPOS_CURSOR))
+            .order_by(EventoContable.transaccion, EventoContable.id)
+            .limit(limite)
+        )
+        if self.db.get_bind().dialect.name == "postgresql":
+            xmin = func.pg_snapshot_xmin(func.pg_current_snapshot()).cast(Text).cast(BigInteger)
+            consulta = consulta.where(EventoContable.transaccion < xmin)
+        return [Evento(*fila) for fila in self.db.execute(consulta)]
+
+    def sincronizar(self, sumidero: Sumidero, limite: int = TAMANO_LOTE_EVENTOS) -> int:
+        """
+        Envía al sumidero los eventos posteriores a su última secuencia.
+
+        Returns:
+            int: Número de eventos enviados.
+        """
+        enviados = 0
+        cursor = sumidero.ultimo_cursor()
+        while True:
+            eventos = self.leer(cursor, limite)
+            if not eventos:
+                return enviados
+            sumidero.escribir(eventos)
+            cursor = eventos[-1].cursor
+            enviados += len(eventos)
+
+    def purgar(self, hasta: Cursor) -> int:
+        """
+        Borra los eventos ya consumidos (hasta el cursor `hasta`, incluido).
+
+        Las secuencias no se reutilizan, así que los cursores de los
+        consumidores siguen siendo válidos tras purgar.
+
+        Returns:
+            int: Número de eventos borrados.
+        """
+        resultado = self.db.execute(
+            delete(EventoContable)
+            .where(tuple_(EventoContable.transaccion, EventoContable.id) <= tuple_(*hasta, types=_TIPOS_CURSOR))
+        )
+        self.db.commit()
+        return resultado.rowcount
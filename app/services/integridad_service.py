@@ -0,0 +1,236 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import create_engine, select, func, or_, exists, case
+from sqlalchemy.orm import Session, aliased
+
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.cuenta import CuentaContable
+from app.models.ejercicio import EjercicioFiscal
+from app.utils.dinero import centimos_sql
+from app.utils.perfil_memoria import perfilado
+
+# Tipos de incidencia (valores estables para la salida legible por máquina)
+ASIENTO_DESCUADRADO = "asiento_descuadrado"
+ASIENTO_SIN_APUNTES = "asiento_sin_apuntes"
+FECHA_FUERA_DE_EJERCICIO = "fecha_fuera_de_ejercicio"
+NUMERO_DUPLICADO = "numero_duplicado"
+HUECO_NUMERACION = "hueco_numeracion"
+IMPORTE_NEGATIVO = "importe_negativo"
+APUNTE_HUERFANO = "apunte_huerfano"
+APUNTE_CUENTA_INEXISTENTE = "apunte_cuenta_inexistente"
+EJERCICIO_FECHAS_INVALIDAS = "ejercicio_fechas_invalidas"
+EJERCICIOS_SOLAPADOS = "ejercicios_solapados"
+
+
+@dataclass
+class IncidenciaIntegridad:
+    """Incumplimiento de una regla de integridad del libro."""
+    tipo: str
+    ejercicio_id: Optional[int]
+    asiento_id: Optional[int]
+    detalle: str
+
+    def a_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class ResultadoIntegridad:
+    """Resultado de la comprobación de integridad."""
+    ejercicios_verificados: int = 0
+    incidencias: List[IncidenciaIntegridad] = field(default_factory=list)
+
+    @property
+    def valido(self) -> bool:
+        return not self.incidencias
+
+    def por_tipo(self) -> Dict[str, int]:
+        """Número de incidencias de cada tipo."""
+        recuento: Dict[str, int] = {}
+        for incidencia in self.incidencias:
+            recuento[incidencia.tipo] = recuento.get(incidencia.tipo, 0) + 1
+        return recuento
+
+
+def _verificar_ejercicio(db: Session, ejercicio_id: int) -> List[IncidenciaIntegridad]:
+    """
+    Comprobaciones de un ejercicio, cada una con una única consulta de conjunto.
+
+    Todas filtran por ejercicio_id, de modo que usan los índices por
+    ejercicio y los ejercicios pueden repartirse entre procesos.
+    """
+    incidencias: List[IncidenciaIntegridad] = []
+
+    # Descuadres e importes negativos en una sola pasada sobre los apuntes:
+    # GROUP BY asiento HAVING debe != haber (en céntimos, exacto) o algún importe < 0
+    diferencia = func.sum(centimos_sql(ApunteContable.debe)) - func.sum(centimos_sql(ApunteContable.haber))
+    negativos = func.sum(case((or_(ApunteContable.debe < 0, ApunteContable.haber < 0), 1), else_=0))
+    for asiento_id, centimos, num_negativos in db.execute(
+        select(ApunteContable.asiento_id, diferencia, negativos)
+        .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+        .where(Asiento.ejercicio_id == ejercicio_id)
+        .group_by(ApunteContable.asiento_id)
+        .having(or_(diferencia != 0, negativos > 0))
+    ):
+        if centimos:
+            incidencias.append(IncidenciaIntegridad(
+                ASIENTO_DESCUADRADO, ejercicio_id, asiento_id, f"Debe - Haber = {centimos} céntimos"
+            ))
+        if num_negativos:
+            # La partida doble se expresa con el lado, no con el signo
+            incidencias.append(IncidenciaIntegridad(
+                IMPORTE_NEGATIVO, ejercicio_id, asiento_id, f"{num_negativos} apuntes con importe negativo"
+            ))
+
+    # Asientos sin apuntes (anti-join)
+    for (asiento_id,) in db.execute(
+        select(Asiento.id).where(
+            Asiento.ejercicio_id == ejercicio_id,
+            ~exists().where(ApunteContable.asiento_id == Asiento.id)
+        )
+    ):
+        incidencias.append(IncidenciaIntegridad(ASIENTO_SIN_APUNTES, ejercicio_id, asiento_id, "El asiento no tiene apuntes"))
+
+    # Fechas fuera del ejercicio
+    for asiento_id, fecha in db.execute(
+        select(Asiento.id, Asiento.fecha)
+        .join(EjercicioFiscal, EjercicioFiscal.id == Asiento.ejercicio_id)
+        .where(
+            Asiento.ejercicio_id == ejercicio_id,
+            or_(Asiento.fecha < EjercicioFiscal.fecha_inicio, Asiento.fecha > EjercicioFiscal.fecha_fin)
+        )
+    ):
+        incidencias.append(IncidenciaIntegridad(
+            FECHA_FUERA_DE_EJERCICIO, ejercicio_id, asiento_id, f"Fecha {fecha.isoformat()} fuera del ejercicio"
+        ))
+
+    # Números duplicados
+    for numero, veces in db.execute(
+        select(Asiento.numero, func.count(Asiento.id))
+        .where(Asiento.ejercicio_id == ejercicio_id)
+        .group_by(Asiento.numero)
+        .having(func.count(Asiento.id) > 1)
+    ):
+        incidencias.append(IncidenciaIntegridad(
+            NUMERO_DUPLICADO, ejercicio_id, None, f"El número {numero} está asignado a {veces} asientos"
+        ))
+
+    # Huecos en la numeración (1, 2, ... sin saltos): LAG sobre el orden de número
+    numeros = (
+        select(
+            Asiento.numero.label("numero"),
+            func.lag(Asiento.numero).over(order_by=Asiento.numero).label("anterior")
+        )
+        .where(Asiento.ejercicio_id == ejercicio_id)
+        .subquery()
+    )
+    for anterior, numero in db.execute(
+        select(numeros.c.anterior, numeros.c.numero)
+        .where(numeros.c.numero - func.coalesce(numeros.c.anterior, 0) > 1)
+        .order_by(numeros.c.numero)
+    ):
+        desde = (anterior or 0) + 1
+        incidencias.append(IncidenciaIntegridad(
+            HUECO_NUMERACION, ejercicio_id, None, f"Faltan los números {desde} a {numero - 1}"
+        ))
+    return incidencias
+
+
+def _verificar_ejercicio_en_proceso(url: str, ejercicio_id: int) -> List[IncidenciaIntegridad]:
+    """Punto de entrada de los procesos trabajadores: cada uno abre su propia conexión."""
+    engine = create_engine(url)
+    try:
+        with Session(engine) as db:
+            return _verificar_ejercicio(db, ejercicio_id)
+    finally:
+        engine.dispose()
+
+
+class IntegridadService:
+    """Comprobación de la integridad de los datos almacenados del libro."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @perfilado("integridad")
+    def verificar(self, ejercicio_ids: Optional[Sequence[int]] = None, workers: int = 1) -> ResultadoIntegridad:
+        """
+        Busca descuadres, asientos sin apuntes, apuntes huérfanos, importes
+        negativos, fechas fuera de ejercicio, numeración duplicada o con huecos
+        y ejercicios con fechas incoherentes.
+
+        Las comprobaciones por ejercicio son consultas de conjunto (GROUP BY ...
+        HAVING, anti-joins, LAG) y con `workers > 1` se reparten por ejercicio
+        entre procesos (requiere una base de datos accesible por URL, no SQLite
+        en memoria). Las comprobaciones globales se hacen una vez.
+        Los ejercicios archivados se omiten: sus asientos ya no están en las tablas.
+
+        Args:
+            ejercicio_ids: Ejercicios a comprobar (por defecto, todos los no archivados).
+            workers: Número de procesos trabajadores.
+
+        Returns:
+            ResultadoIntegridad: Ejercicios verificados e incidencias encontradas.
+        """
+        consulta = select(EjercicioFiscal.id).where(EjercicioFiscal.archivado.is_(False)).order_by(EjercicioFiscal.id)
+        if ejercicio_ids is not None:
+            consulta = consulta.where(EjercicioFiscal.id.in_(ejercicio_ids))
+        ids = list(self.db.execute(consulta).scalars())
+
+        resultado = ResultadoIntegridad(ejercicios_verificados=len(ids))
+        resultado.incidencias.extend(self._verificar_global())
+
+        url = self.db.get_bind().engine.url
+        if workers > 1 and len(ids) > 1 and url.database not in (None, "", ":memory:"):
+            url_str = url.render_as_string(hide_password=False)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parciales = list(pool.map(_verificar_ejercicio_en_proceso, [url_str] * len(ids), ids))
+        else:
+            parciales = [_verificar_ejercicio(self.db, ejercicio_id) for ejercicio_id in ids]
+        for parcial in parciales:
+            resultado.incidencias.extend(parcial)
+        return resultado
+
+    def _verificar_global(self) -> List[IncidenciaIntegridad]:
+        """Comprobaciones que no pertenecen a un ejercicio (huérfanos y ejercicios)."""
+        incidencias: List[IncidenciaIntegridad] = []
+
+        for apunte_id, asiento_id in self.db.execute(
+            select(ApunteContable.id, ApunteContable.asiento_id)
+            .where(~exists().where(Asiento.id == ApunteContable.asiento_id))
+        ):
+            incidencias.append(IncidenciaIntegridad(
+                APUNTE_HUERFANO, None, asiento_id, f"El apunte {apunte_id} apunta a un asiento inexistente"
+            ))
+
+        for apunte_id, asiento_id, cuenta_id in self.db.execute(
+            select(ApunteContable.id, ApunteContable.asiento_id, ApunteContable.cuenta_id)
+            .where(~exists().where(CuentaContable.id == ApunteContable.cuenta_id))
+        ):
+            incidencias.append(IncidenciaIntegridad(
+                APUNTE_CUENTA_INEXISTENTE, None, asiento_id,
+                f"El apunte {apunte_id} usa la cuenta inexistente {cuenta_id}"
+            ))
+
+        for ejercicio_id, inicio, fin in self.db.execute(
+            select(EjercicioFiscal.id, EjercicioFiscal.fecha_inicio, EjercicioFiscal.fecha_fin)
+            .where(EjercicioFiscal.fecha_inicio > EjercicioFiscal.fecha_fin)
+        ):
+            incidencias.append(IncidenciaIntegridad(
+                EJERCICIO_FECHAS_INVALIDAS, ejercicio_id, None,
+                f"Inicio {inicio.isoformat()} posterior al fin {fin.isoformat()}"
+            ))
+
+        otro = aliased(EjercicioFiscal)
+        for ejercicio_id, otro_id in self.db.execute(
+            select(EjercicioFiscal.id, otro.id)
+            .join(otro, (otro.empresa_id == EjercicioFiscal.empresa_id) & (otro.id > EjercicioFiscal.id))
+            .where(EjercicioFiscal.fecha_inicio <= otro.fecha_fin, otro.fecha_inicio <= EjercicioFiscal.fecha_fin)
+        ):
+            incidencias.append(IncidenciaIntegridad(
+                EJERCICIOS_SOLAPADOS, ejercicio_id, None, f"Se solapa con el ejercicio {otro_id}"
+            ))
+        return incidencias
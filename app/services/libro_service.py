@@ -0,0 +1,180 @@
+import heapq
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.cuenta import CuentaContable
+from app.models.ejercicio import EjercicioFiscal
+from app.services.archivo_service import DIRECTORIO_ARCHIVO, ruta_archivo
+from app.utils.columnar import LectorColumnar
+from app.utils.dinero import a_centimos, centimos_sql, desde_centimos
+
+
+@dataclass
+class LineaLibro:
+    """Apunte tal como aparece en el libro diario o en el mayor."""
+    fecha: date
+    numero: int
+    asiento_id: int
+    concepto: str
+    cuenta_codigo: str
+    descripcion: str
+    debe: Decimal
+    haber: Decimal
+    moneda: Optional[str] = None
+    importe_divisa: Optional[Decimal] = None
+
+
+def _linea(fila: tuple) -> LineaLibro:
+    """LineaLibro desde una fila con los importes en céntimos (divisa opcional al final)."""
+    fecha, numero, asiento_id, concepto, codigo, descripcion, debe, haber = fila[:8]
+    moneda, importe_divisa = fila[8:10] if len(fila) > 8 else (None, None)
+    return LineaLibro(
+        fecha, numero, asiento_id, concepto, codigo, descripcion,
+        desde_centimos(debe), desde_centimos(haber),
+        moneda, desde_centimos(importe_divisa) if importe_divisa is not None else None
+    )
+
+
+class LibroService:
+    """
+    Lectura del libro diario y del mayor.
+
+    Une de forma transparente los ejercicios vivos (base de datos) y los
+    archivados (ficheros de ArchivoService) cuando el rango de fechas los abarca.
+    """
+
+    def __init__(self, db: Session, directorio_archivo: Path = DIRECTORIO_ARCHIVO):
+        self.db = db
+        self.directorio_archivo = Path(directorio_archivo)
+
+    def diario(
+        self,
+        desde: date = date.min,
+        hasta: date = date.max,
+        empresa_id: Optional[int] = None,
+        cuenta_codigo: Optional[str] = None
+    ) -> Iterator[LineaLibro]:
+        """
+        Apuntes entre dos fechas ordenados por (fecha, número de asiento).
+
+        Args:
+            desde: Fecha inicial (inclusive).
+            hasta: Fecha final (inclusive).
+            empresa_id: Limita a una empresa.
+            cuenta_codigo: Limita a una cuenta y sus subcuentas (prefijo del código).
+        """
+        consulta = select(EjercicioFiscal).where(
+            EjercicioFiscal.fecha_inicio <= hasta,
+            EjercicioFiscal.fecha_fin >= desde
+        )
+        if empresa_id is not None:
+            consulta = consulta.where(EjercicioFiscal.empresa_id == empresa_id)
+        fuentes = [
+            self._lineas_archivadas(ejercicio.id, desde, hasta, cuenta_codigo) if ejercicio.archivado
+            else self._lineas_vivas(ejercicio.id, desde, hasta, cuenta_codigo)
+            for ejercicio in self.db.execute(consulta.order_by(EjercicioFiscal.fecha_inicio)).scalars()
+        ]
+        return heapq.merge(*fuentes, key=lambda linea: (linea.fecha, linea.numero))
+
+    def mayor(
+        self,
+        cuenta_codigo: str,
+        desde: date = date.min,
+        hasta: date = date.max,
+        empresa_id: Optional[int] = None
+    ) -> Iterator[Tuple[LineaLibro, Decimal]]:
+        """
+        Movimientos de una cuenta (y sus subcuentas) con el saldo acumulado tras cada uno.
+
+        El saldo parte del acumulado de la cuenta antes de `desde`, de modo que
+        un mayor por rango muestra los mismos saldos que el mayor completo.
+        """
+        saldo = self._saldo_anterior(cuenta_codigo, desde, empresa_id)
+        for linea in self.diario(desde, hasta, empresa_id, cuenta_codigo):
+            saldo += a_centimos(linea.debe) - a_centimos(linea.haber)
+            yield linea, desde_centimos(saldo)
+
+    def _saldo_anterior(self, cuenta_codigo: str, desde: date, empresa_id: Optional[int]) -> int:
+        """
+        Saldo (debe - haber) en céntimos de la cuenta y sus subcuentas antes de `desde`.
+
+        Los ejercicios archivados aportan sus saldos finales (o, si `desde` cae
+        dentro del ejercicio, sus apuntes anteriores); los vivos, una suma en SQL.
+        """
+        if desde == date.min:
+            return 0
+        hasta = desde - timedelta(days=1)
+        archivados = select(EjercicioFiscal).where(
+            EjercicioFiscal.archivado.is_(True),
+            EjercicioFiscal.fecha_inicio <= hasta
+        )
+        vivos = (
+            select(func.coalesce(
+                func.sum(centimos_sql(ApunteContable.debe)) - func.sum(centimos_sql(ApunteContable.haber)), 0
+            ))
+            .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+            .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+            .join(EjercicioFiscal, EjercicioFiscal.id == Asiento.ejercicio_id)
+            .where(
+                EjercicioFiscal.archivado.is_(False),
+                Asiento.fecha <= hasta,
+                CuentaContable.codigo.startswith(cuenta_codigo, autoescape=True)
+            )
+        )
+        if empresa_id is not None:
+            archivados = archivados.where(EjercicioFiscal.empresa_id == empresa_id)
+            vivos = vivos.where(EjercicioFiscal.empresa_id == empresa_id)
+
+        saldo = self.db.execute(vivos).scalar_one()
+        for ejercicio in self.db.execute(archivados).scalars():
+            with LectorColumnar(ruta_archivo(ejercicio.id, self.directorio_archivo)) as lector:
+                if ejercicio.fecha_fin <= hasta:
+                    filas = lector.filas("saldos", ["cuenta_codigo", "debe", "haber"])
+                else:
+                    filas = lector.filas("apuntes", ["cuenta_codigo", "debe", "haber"], rango=("fecha", date.min, hasta))
+                saldo += sum(debe - haber for codigo, debe, haber in filas if codigo.startswith(cuenta_codigo))
+        return saldo
+
+    def _lineas_vivas(
+        self, ejercicio_id: int, desde: date, hasta: date, cuenta_codigo: Optional[str]
+    ) -> Iterator[LineaLibro]:
+        consulta = (
+            select(
+                Asiento.fecha, Asiento.numero, Asiento.id, Asiento.concepto,
+                CuentaContable.codigo, ApunteContable.descripcion,
+                centimos_sql(ApunteContable.debe), centimos_sql(ApunteContable.haber),
+                ApunteContable.moneda, centimos_sql(ApunteContable.importe_divisa)
+            )
+            .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+            .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+            .where(Asiento.ejercicio_id == ejercicio_id, Asiento.fecha.between(desde, hasta))
+            .order_by(Asiento.fecha, Asiento.numero, ApunteContable.id)
+        )
+        if cuenta_codigo is not None:
+            consulta = consulta.where(CuentaContable.codigo.startswith(cuenta_codigo, autoescape=True))
+        for fila in self.db.execute(consulta.execution_options(yield_per=10_000)):
+            yield _linea(fila)
+
+    def _lineas_archivadas(
+        self, ejercicio_id: int, desde: date, hasta: date, cuenta_codigo: Optional[str]
+    ) -> Iterator[LineaLibro]:
+        with LectorColumnar(ruta_archivo(ejercicio_id, self.directorio_archivo)) as lector:
+            conceptos = dict(lector.filas("asientos", ["id", "concepto"], rango=("fecha", desde, hasta)))
+            columnas = ["fecha", "numero", "asiento_id", "cuenta_codigo", "descripcion", "debe", "haber"]
+            # Los archivos anteriores a las divisas no tienen estas columnas
+            con_divisas = "moneda" in lector.columnas("apuntes")
+            if con_divisas:
+                columnas += ["moneda", "importe_divisa"]
+            for fila in lector.filas("apuntes", columnas, rango=("fecha", desde, hasta)):
+                fecha, numero, asiento_id, codigo = fila[:4]
+                if cuenta_codigo is not None and not codigo.startswith(cuenta_codigo):
+                    continue
+                yield _linea((fecha, numero, asiento_id, conceptos[asiento_id], *fila[3:]))
@@ -0,0 +1,213 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, List, Optional, Sequence
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.cuenta import CuentaContable
+from app.models.tercero import Tercero
+from app.services.libro_service import LineaLibro
+from app.utils.dinero import centimos_sql, desde_centimos
+from app.exceptions import CuentaNoEncontradaError, CursorInvalidoError
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 1000
+
+_ADELANTE = "+"
+_ATRAS = "-"
+
+
+@dataclass
+class Pagina:
+    """
+    Página de un listado paginado por clave.
+
+    Los cursores son opacos: se pasan tal cual a la siguiente llamada para
+    obtener la página siguiente o la anterior (None si no la hay).
+    """
+    elementos: List[Any] = field(default_factory=list)
+    siguiente: Optional[str] = None
+    anterior: Optional[str] = None
+
+
+def _codificar_cursor(listado: str, direccion: str, clave: Sequence[Any]) -> str:
+    valores = [valor.isoformat() if isinstance(valor, date) else valor for valor in clave]
+    crudo = json.dumps([listado, direccion, valores], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor: str, listado: str, columnas: Sequence[Any]) -> tuple:
+    """Devuelve (dirección, clave) del cursor, con los valores en el tipo de cada columna."""
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        nombre, direccion, valores = json.loads(crudo)
+        if nombre != listado or direccion not in (_ADELANTE, _ATRAS) or len(valores) != len(columnas):
+            raise ValueError(cursor)
+        clave = tuple(
+            date.fromisoformat(valor) if columna.type.python_type is date else columna.type.python_type(valor)
+            for columna, valor in zip(columnas, valores)
+        )
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise CursorInvalidoError(f"Cursor de paginación no válido para el listado '{listado}'") from e
+    return direccion, clave
+
+
+class PaginacionService:
+    """
+    Listados paginados por clave (keyset) del diario, del mayor y de terceros.
+
+    Cada página se pide con la clave de orden del último elemento visto
+    (`(fecha, numero, id) > (...)`) en lugar de con OFFSET, y cada listado
+    tiene un índice compuesto con ese mismo orden: la base de datos busca en
+    el índice y lee solo `limite` filas, de modo que la página N cuesta lo
+    mismo que la primera. El orden incluye siempre el id como desempate, así
+    que es total y estable aunque se inserten filas entre dos peticiones.
+
+    Solo recorre ejercicios vivos; los archivados se leen con LibroService.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def asientos(
+        self, ejercicio_id: int, cursor: Optional[str] = None, limite: int = LIMITE_POR_DEFECTO
+    ) -> Pagina:
+        """
+        Asientos de un ejercicio ordenados por (fecha, número).
+
+        Usa el índice ix_asientos_ejercicio_fecha_numero_id.
+
+        Returns:
+            Pagina: Objetos Asiento (sin cargar sus apuntes) y cursores.
+        """
+        return self._paginar(
+            "asientos",
+            select(Asiento).where(Asiento.ejercicio_id == ejercicio_id),
+            [Asiento.fecha, Asiento.numero, Asiento.id],
+            cursor,
+            limite,
+            lambda fila: fila[0]
+        )
+
+    def apuntes_cuenta(
+        self,
+        ejercicio_id: int,
+        cuenta_codigo: str,
+        cursor: Optional[str] = None,
+        limite: int = LIMITE_POR_DEFECTO
+    ) -> Pagina:
+        """
+        Apuntes de una cuenta y sus subcuentas en un ejercicio, en el orden del mayor.
+
+        El orden es (fecha, número de asiento, id de apunte), copiados en cada
+        apunte: la página se lee de ix_apuntes_contables_cuenta_ejercicio_fecha_numero_id
+        desde el cursor, sin cruzar con asientos más que para el concepto de
+        las filas devueltas. Con una sola cuenta la página N cuesta lo mismo
+        que la primera; con varias subcuentas cada una aporta su rango del
+        índice desde el cursor y la base de datos ordena la unión.
+
+        Raises:
+            CuentaNoEncontradaError: Si ninguna cuenta empieza por el código.
+
+        Returns:
+            Pagina: Elementos LineaLibro y cursores.
+        """
+        cuenta_ids = list(self.db.execute(
+            select(CuentaContable.id).where(CuentaContable.codigo.startswith(cuenta_codigo, autoescape=True))
+        ).scalars())
+        if not cuenta_ids:
+            raise CuentaNoEncontradaError(cuenta_codigo)
+
+        consulta = (
+            select(
+                ApunteContable.fecha, ApunteContable.numero, ApunteContable.asiento_id, Asiento.concepto,
+                CuentaContable.codigo, ApunteContable.descripcion,
+                centimos_sql(ApunteContable.debe), centimos_sql(ApunteContable.haber),
+                ApunteContable.moneda, centimos_sql(ApunteContable.importe_divisa)
+            )
+            .select_from(ApunteContable)
+            .join(Asiento, Asiento.id == ApunteContable.asiento_id)
+            .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+            .where(ApunteContable.ejercicio_id == ejercicio_id, ApunteContable.cuenta_id.in_(cuenta_ids))
+        )
+        return self._paginar(
+            "apuntes_cuenta",
+            consulta,
+            [ApunteContable.fecha, ApunteContable.numero, ApunteContable.id],
+            cursor,
+            limite,
+            lambda fila: LineaLibro(
+                *fila[:6], desde_centimos(fila[6]), desde_centimos(fila[7]),
+                fila[8], desde_centimos(fila[9]) if fila[9] is not None else None
+            )
+        )
+
+    def terceros(self, cursor: Optional[str] = None, limite: int = LIMITE_POR_DEFECTO) -> Pagina:
+        """
+        Terceros ordenados por nombre.
+
+        Usa el índice ix_terceros_nombre_id.
+
+        Returns:
+            Pagina: Objetos Tercero y cursores.
+        """
+        return self._paginar("terceros", select(Tercero), [Tercero.nombre, Tercero.id], cursor, limite, lambda fila: fila[0])
+
+    def _paginar(
+        self,
+        listado: str,
+        consulta: Select,
+        columnas: Sequence[Any],
+        cursor: Optional[str],
+        limite: int,
+        elemento: Callable[[Sequence[Any]], Any]
+    ) -> Pagina:
+        """
+        Ejecuta una consulta paginada por la clave `columnas` (orden ascendente).
+
+        Se pide una fila más del límite para saber si hay otra página en la
+        dirección de avance. Hacia atrás se recorre el índice en orden
+        descendente y la página se invierte antes de devolverla.
+        """
+        if not 1 <= limite <= LIMITE_MAXIMO:
+            raise ValueError(f"El límite debe estar entre 1 y {LIMITE_MAXIMO}")
+
+        direccion, clave = _ADELANTE, None
+        if cursor is not None:
+            direccion, clave = _decodificar_cursor(cursor, listado, columnas)
+
+        consulta = consulta.add_columns(*columnas)
+        if direccion == _ADELANTE:
+            if clave is not None:
+                consulta = consulta.where(tuple_(*columnas) > tuple_(*clave))
+            consulta = consulta.order_by(*columnas)
+        else:
+            consulta = consulta.where(tuple_(*columnas) < tuple_(*clave)).order_by(*[c.desc() for c in columnas])
+
+        filas = self.db.execute(consulta.limit(limite + 1)).all()
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+        if direccion == _ATRAS:
+            filas.reverse()
+
+        # Hacia delante hay página anterior si se llegó con un cursor; hacia
+        # atrás la siguiente existe siempre (es la página de la que se viene)
+        if direccion == _ADELANTE:
+            hay_siguiente, hay_anterior = hay_mas, clave is not None
+        else:
+            hay_siguiente, hay_anterior = True, hay_mas
+
+        pagina = Pagina(elementos=[elemento(fila) for fila in filas])
+        if filas:
+            n = len(columnas)
+            if hay_siguiente:
+                pagina.siguiente = _codificar_cursor(listado, _ADELANTE, filas[-1][-n:])
+            if hay_anterior:
+                pagina.anterior = _codificar_cursor(listado, _ATRAS, filas[0][-n:])
+        return pagina
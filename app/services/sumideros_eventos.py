@@ -0,0 +1,108 @@
+"""
+Sumideros locales de la bandeja de salida, para pruebas y sincronizaciones sencillas.
+
+Ambos guardan junto con los eventos el cursor del último recibido, de modo
+que una sincronización interrumpida continúa donde lo dejó sin duplicar.
+"""
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Sequence
+
+from app.services.eventos_service import Cursor, Evento, INICIO
+
+_BLOQUE_LECTURA = 64 * 1024
+
+
+class SumideroFichero:
+    """
+    Eventos en un fichero JSON Lines (una línea por evento, en orden de lectura).
+
+    El cursor es el de la última línea completa. Una línea cortada
+    por una interrupción a mitad de escritura se descarta al abrir el fichero.
+    """
+
+    def __init__(self, ruta: Path):
+        self.ruta = Path(ruta)
+        self.ruta.touch()
+        self._ultimo = self._recuperar()
+
+    def ultimo_cursor(self) -> Cursor:
+        return self._ultimo
+
+    def escribir(self, eventos: Sequence[Evento]) -> None:
+        if not eventos:
+            return
+        lineas = "".join(json.dumps(evento.a_dict(), ensure_ascii=False) + "\n" for evento in eventos)
+        with open(self.ruta, "a", encoding="utf-8") as fichero:
+            fichero.write(lineas)
+            fichero.flush()
+            os.fsync(fichero.fileno())
+        self._ultimo = eventos[-1].cursor
+
+    def _recuperar(self) -> Cursor:
+        """Trunca una línea final incompleta y devuelve el cursor de la última línea."""
+        with open(self.ruta, "rb+") as fichero:
+            fin = fichero.seek(0, os.SEEK_END)
+            # Retroceder por bloques hasta tener la última línea completa (y el salto anterior)
+            cola = b""
+            posicion = fin
+            while posicion > 0 and cola.count(b"\n") < 2:
+                leer = min(_BLOQUE_LECTURA, posicion)
+                posicion -= leer
+                fichero.seek(posicion)
+                cola = fichero.read(leer) + cola
+            if cola and not cola.endswith(b"\n"):
+                cortada = len(cola) - cola.rfind(b"\n") - 1
+                fichero.truncate(fin - cortada)
+                cola = cola[:len(cola) - cortada]
+        lineas = cola.splitlines()
+        if not lineas:
+            return INICIO
+        ultimo = json.loads(lineas[-1])
+        return (ultimo["transaccion"], ultimo["secuencia"])
+
+
+class SumideroSQLite:
+    """
+    Eventos en una base de datos SQLite local (tabla `eventos`).
+
+    Cada lote se inserta en una transacción; el cursor es el mayor
+    (transaccion, secuencia) guardado, así que eventos y cursor avanzan juntos.
+    """
+
+    def __init__(self, ruta: Path):
+        self._conexion = sqlite3.connect(str(ruta))
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS eventos ("
+            "secuencia INTEGER PRIMARY KEY, tipo TEXT NOT NULL, ejercicio_id INTEGER NOT NULL, "
+            "asiento_id INTEGER, carga TEXT NOT NULL, transaccion INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conexion.commit()
+
+    def ultimo_cursor(self) -> Cursor:
+        fila = self._conexion.execute(
+            "SELECT transaccion, secuencia FROM eventos ORDER BY transaccion DESC, secuencia DESC LIMIT 1"
+        ).fetchone()
+        return tuple(fila) if fila else INICIO
+
+    def escribir(self, eventos: Sequence[Evento]) -> None:
+        with self._conexion:
+            self._conexion.executemany(
+                "INSERT OR IGNORE INTO eventos (secuencia, tipo, ejercicio_id, asiento_id, carga, transaccion) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (e.secuencia, e.tipo, e.ejercicio_id, e.asiento_id, json.dumps(e.carga, ensure_ascii=False), e.transaccion)
+                    for e in eventos
+                ]
+            )
+
+    def cerrar(self) -> None:
+        self._conexion.close()
+
+    def __enter__(self) -> "SumideroSQLite":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.cerrar()
@@ -0,0 +1,213 @@
+"""
+Formato columnar compacto para el archivo en frío de ejercicios cerrados (.pgca).
+
+Estructura del fichero:
+
+    MAGIC | bloques de columna (zlib) ... | pie JSON | longitud del pie (8 bytes LE) | MAGIC
+
+Cada tabla se escribe en grupos de filas; cada grupo guarda una columna por
+bloque comprimido y, para columnas enteras y de fecha, su mínimo y máximo.
+El lector proyecta columnas y descarta grupos por rango sin descomprimir
+el resto del fichero, que se lee mediante mmap.
+"""
+import json
+import mmap
+import os
+import sys
+import zlib
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+MAGIC = b"PGCA0001"
+TIPOS = ("entero", "fecha", "texto")
+
+_NULO_ENTERO = -(2**63)
+_NULO_FECHA = 0  # date.toordinal() empieza en 1
+_NULO_TEXTO = 0xFFFFFFFF
+
+
+def _a_little_endian(datos: array) -> bytes:
+    if sys.byteorder == "big":
+        datos.byteswap()
+    return datos.tobytes()
+
+
+def _desde_little_endian(tipo: str, crudo: bytes) -> array:
+    datos = array(tipo)
+    datos.frombytes(crudo)
+    if sys.byteorder == "big":
+        datos.byteswap()
+    return datos
+
+
+def _codificar(tipo: str, valores: Sequence[Any]) -> bytes:
+    if tipo == "entero":
+        return _a_little_endian(array("q", (_NULO_ENTERO if v is None else v for v in valores)))
+    if tipo == "fecha":
+        return _a_little_endian(array("i", (_NULO_FECHA if v is None else v.toordinal() for v in valores)))
+    codificados = [None if v is None else v.encode("utf-8") for v in valores]
+    longitudes = array("I", (_NULO_TEXTO if v is None else len(v) for v in codificados))
+    return _a_little_endian(longitudes) + b"".join(v for v in codificados if v is not None)
+
+
+def _decodificar(tipo: str, crudo: bytes, filas: int) -> List[Any]:
+    if tipo == "entero":
+        return [None if v == _NULO_ENTERO else v for v in _desde_little_endian("q", crudo)]
+    if tipo == "fecha":
+        return [None if v == _NULO_FECHA else date.fromordinal(v) for v in _desde_little_endian("i", crudo)]
+    longitudes = _desde_little_endian("I", crudo[:4 * filas])
+    texto = memoryview(crudo)[4 * filas:]
+    valores: List[Optional[str]] = []
+    posicion = 0
+    for longitud in longitudes:
+        if longitud == _NULO_TEXTO:
+            valores.append(None)
+        else:
+            valores.append(str(texto[posicion:posicion + longitud], "utf-8"))
+            posicion += longitud
+    return valores
+
+
+class EscritorColumnar:
+    """
+    Escribe un fichero .pgca por grupos de filas.
+
+    Uso:
+        with EscritorColumnar(ruta, metadatos) as escritor:
+            escritor.definir_tabla("apuntes", {"id": "entero", "fecha": "fecha", ...})
+            for lote in lotes:
+                escritor.escribir("apuntes", lote)  # lista de tuplas en el orden de columnas
+    """
+
+    def __init__(self, ruta: Path, metadatos: Optional[Dict[str, Any]] = None):
+        self._fichero = open(ruta, "wb")
+        self._fichero.write(MAGIC)
+        self._pie: Dict[str, Any] = {"metadatos": metadatos or {}, "tablas": {}}
+
+    def definir_tabla(self, nombre: str, columnas: Dict[str, str]) -> None:
+        for tipo in columnas.values():
+            if tipo not in TIPOS:
+                raise ValueError(f"Tipo de columna no soportado: {tipo}")
+        self._pie["tablas"][nombre] = {"columnas": columnas, "filas": 0, "grupos": []}
+
+    def escribir(self, tabla: str, filas: Sequence[tuple]) -> None:
+        """Escribe un grupo de filas (tuplas con los valores en el orden de las columnas)."""
+        if not filas:
+            return
+        definicion = self._pie["tablas"][tabla]
+        grupo: Dict[str, Any] = {"filas": len(filas), "columnas": {}}
+        for indice, (nombre, tipo) in enumerate(definicion["columnas"].items()):
+            valores = [fila[indice] for fila in filas]
+            bloque = zlib.compress(_codificar(tipo, valores), 6)
+            meta: Dict[str, Any] = {"offset": self._fichero.tell(), "longitud": len(bloque)}
+            self._fichero.write(bloque)
+            presentes = [v for v in valores if v is not None]
+            if tipo in ("entero", "fecha") and presentes:
+                minimo, maximo = min(presentes), max(presentes)
+                if tipo == "fecha":
+                    minimo, maximo = minimo.toordinal(), maximo.toordinal()
+                meta["min"], meta["max"] = minimo, maximo
+            grupo["columnas"][nombre] = meta
+        definicion["grupos"].append(grupo)
+        definicion["filas"] += len(filas)
+
+    def cerrar(self) -> None:
+        pie = json.dumps(self._pie, ensure_ascii=False).encode("utf-8")
+        self._fichero.write(pie)
+        self._fichero.write(len(pie).to_bytes(8, "little"))
+        self._fichero.write(MAGIC)
+        self._fichero.flush()
+        os.fsync(self._fichero.fileno())
+        self._fichero.close()
+
+    def __enter__(self) -> "EscritorColumnar":
+        return self
+
+    def __exit__(self, tipo_excepcion, *_) -> None:
+        if tipo_excepcion is None:
+            self.cerrar()
+        else:
+            self._fichero.close()
+
+
+class LectorColumnar:
+    """Lee un fichero .pgca mediante mmap, descomprimiendo solo las columnas y grupos pedidos."""
+
+    def __init__(self, ruta: Path):
+        self._fichero = open(ruta, "rb")
+        self._mapa = mmap.mmap(self._fichero.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mapa[:len(MAGIC)] != MAGIC or self._mapa[-len(MAGIC):] != MAGIC:
+            self.cerrar()
+            raise ValueError(f"{ruta} no es un fichero de archivo válido")
+        fin_pie = len(self._mapa) - len(MAGIC) - 8
+        longitud_pie = int.from_bytes(self._mapa[fin_pie:fin_pie + 8], "little")
+        self._pie = json.loads(self._mapa[fin_pie - longitud_pie:fin_pie].decode("utf-8"))
+
+    @property
+    def metadatos(self) -> Dict[str, Any]:
+        return self._pie["metadatos"]
+
+    def num_filas(self, tabla: str) -> int:
+        return self._pie["tablas"][tabla]["filas"]
+
+    def columnas(self, tabla: str) -> List[str]:
+        """Columnas de una tabla, en el orden definido al escribirla."""
+        return list(self._pie["tablas"][tabla]["columnas"])
+
+    def filas(
+        self,
+        tabla: str,
+        columnas: Optional[Sequence[str]] = None,
+        rango: Optional[Tuple[str, Any, Any]] = None
+    ) -> Iterator[tuple]:
+        """
+        Itera las filas de una tabla en el orden en que se escribieron.
+
+        Args:
+            tabla: Nombre de la tabla.
+            columnas: Columnas a devolver (por defecto, todas en el orden definido).
+            rango: (columna, mínimo, máximo) inclusivo sobre una columna entera o
+                de fecha. Los grupos fuera de rango se descartan por sus estadísticas.
+        """
+        definicion = self._pie["tablas"][tabla]
+        tipos = definicion["columnas"]
+        columnas = list(columnas or tipos)
+        if rango:
+            columna_rango, minimo, maximo = rango
+            minimo_ord = minimo.toordinal() if isinstance(minimo, date) else minimo
+            maximo_ord = maximo.toordinal() if isinstance(maximo, date) else maximo
+            leidas = columnas if columna_rango in columnas else columnas + [columna_rango]
+        else:
+            leidas = columnas
+
+        for grupo in definicion["grupos"]:
+            if rango:
+                meta = grupo["columnas"][columna_rango]
+                if "min" in meta and (meta["max"] < minimo_ord or meta["min"] > maximo_ord):
+                    continue
+            datos = [self._leer(grupo, nombre, tipos[nombre]) for nombre in leidas]
+            if rango:
+                indice = leidas.index(columna_rango)
+                for fila in zip(*datos):
+                    valor = fila[indice]
+                    if valor is not None and minimo <= valor <= maximo:
+                        yield fila[:len(columnas)]
+            else:
+                yield from zip(*datos)
+
+    def _leer(self, grupo: Dict[str, Any], columna: str, tipo: str) -> List[Any]:
+        meta = grupo["columnas"][columna]
+        crudo = zlib.decompress(self._mapa[meta["offset"]:meta["offset"] + meta["longitud"]])
+        return _decodificar(tipo, crudo, grupo["filas"])
+
+    def cerrar(self) -> None:
+        self._mapa.close()
+        self._fichero.close()
+
+    def __enter__(self) -> "LectorColumnar":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.cerrar()
@@ -0,0 +1,82 @@
+"""
+Aritmética monetaria en céntimos enteros (punto fijo) para bucles de agregación.
+
+Los importes se manejan como `Decimal` en la API y como `Numeric(12, 2)` en la
+base de datos. Para sumas masivas (cuadres, saldos, informes) se convierten a
+céntimos `int`, que se suman mucho más rápido que `Decimal` y son exactos.
+La conversión es exacta en ambos sentidos: nunca se redondea en silencio.
+"""
+from decimal import Decimal
+from typing import Iterable, Union
+
+from sqlalchemy import BigInteger, cast, func
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.exceptions import ImporteFueraDeRangoError
+
+# Máximo representable en una columna Numeric(12, 2): 9.999.999.999,99
+CENTIMOS_MAX_COLUMNA = 10**12 - 1
+# Límite de los acumulados (int64 con signo), coherente con BIGINT en la base de datos.
+CENTIMOS_MAX_ACUMULADO = 2**63 - 1
+
+_CENTIMO = Decimal("0.01")
+
+
+def a_centimos(importe: Union[Decimal, int]) -> int:
+    """
+    Convierte un importe de columna Numeric(12, 2) a céntimos enteros.
+
+    Args:
+        importe: Importe en euros con como máximo dos decimales.
+
+    Returns:
+        int: Importe en céntimos.
+
+    Raises:
+        ValueError: Si el importe tiene más de dos decimales significativos.
+        ImporteFueraDeRangoError: Si no cabe en Numeric(12, 2).
+    """
+    if isinstance(importe, int):
+        centimos = importe * 100
+    else:
+        escalado = importe.scaleb(2)
+        centimos = int(escalado)
+        if centimos != escalado:
+            raise ValueError(f"El importe {importe} tiene más de dos decimales")
+    if -CENTIMOS_MAX_COLUMNA <= centimos <= CENTIMOS_MAX_COLUMNA:
+        return centimos
+    raise ImporteFueraDeRangoError(importe)
+
+
+def desde_centimos(centimos: int) -> Decimal:
+    """
+    Convierte céntimos enteros a Decimal con dos decimales (frontera de la API).
+
+    Raises:
+        ImporteFueraDeRangoError: Si el valor excede el rango int64.
+    """
+    comprobar_acumulado(centimos)
+    return Decimal(centimos).scaleb(-2).quantize(_CENTIMO)
+
+
+def comprobar_acumulado(centimos: int) -> int:
+    """Verifica que un acumulado en céntimos cabe en un int64 y lo devuelve."""
+    if -CENTIMOS_MAX_ACUMULADO - 1 <= centimos <= CENTIMOS_MAX_ACUMULADO:
+        return centimos
+    raise ImporteFueraDeRangoError(Decimal(centimos).scaleb(-2))
+
+
+def sumar_centimos(importes: Iterable[Union[Decimal, int]]) -> int:
+    """Suma importes Decimal convirtiéndolos exactamente a céntimos."""
+    return comprobar_acumulado(sum(map(a_centimos, importes)))
+
+
+def centimos_sql(columna: ColumnElement) -> ColumnElement:
+    """
+    Expresión SQL que devuelve una columna Numeric(12, 2) ya en céntimos enteros.
+
+    Evita materializar un Decimal por fila al leer: el driver entrega un int.
+    En SQLite (donde Numeric se guarda como REAL) el ROUND corrige la
+    representación binaria; para importes de Numeric(12, 2) el resultado es exacto.
+    """
+    return cast(func.round(columna * 100), BigInteger)
@@ -0,0 +1,237 @@
+"""
+Perfilado opcional de memoria de los procesos largos (informes, importaciones, cierres).
+
+Desactivado por defecto. Se activa con la variable de entorno
+CONTABILIDAD_PERFIL_MEMORIA=1 o con activar_perfil_memoria(). Las entradas
+decoradas con @perfilado y las marcas de etapa comprueban un único booleano
+y no hacen nada más mientras está desactivado.
+
+Activado, cada entrada perfilada:
+  - toma una instantánea de tracemalloc al empezar y en cada etapa,
+  - cuenta las instancias vivas del ORM por clase mapeada, las colecciones
+    de relaciones cargadas (Asiento.apuntes, CuentaContable.children...) y
+    los Decimal vivos (importes),
+  - anota el tamaño del identity map de la sesión,
+y al terminar registra (logger "app.utils.perfil_memoria", nivel INFO) un
+resumen con las diferencias entre etapas, apto para adjuntar a una incidencia.
+"""
+import functools
+import gc
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.collections import InstrumentedList
+
+from app.database import Base
+
+logger = logging.getLogger(__name__)
+
+VARIABLE_ENTORNO = "CONTABILIDAD_PERFIL_MEMORIA"
+# Líneas de código con más memoria asignada que se muestran por etapa
+LINEAS_DIFERENCIA = 10
+# Marcos de pila guardados por asignación (1 basta para agrupar por línea)
+MARCOS_TRACEMALLOC = 1
+
+_activo = False
+_iniciado_por_nosotros = False
+_local = threading.local()
+# Contenedores en los que se buscan los Decimal vivos
+_CONTENEDORES = (dict, tuple, list)
+_FILTROS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+@dataclass
+class EtapaMemoria:
+    """Estado de la memoria en una frontera de etapa."""
+    nombre: str
+    segundos: float
+    memoria_actual: int
+    memoria_pico: int
+    instancias_orm: Dict[str, int]
+    colecciones: Tuple[int, int]  # (colecciones de relaciones cargadas, elementos en ellas)
+    decimales: int
+    identity_map: Optional[int]
+    diferencia: List[str] = field(default_factory=list)
+
+
+@dataclass
+class InformeMemoria:
+    """Etapas de una ejecución perfilada, de la inicial a la final."""
+    nombre: str
+    etapas: List[EtapaMemoria] = field(default_factory=list)
+
+    def resumen(self) -> str:
+        """Texto con la variación de cada etapa respecto a la anterior."""
+        lineas = [f"Perfil de memoria: {self.nombre}"]
+        for anterior, etapa in zip(self.etapas, self.etapas[1:]):
+            lineas.append(
+                f"[{etapa.nombre}] {etapa.segundos - anterior.segundos:.3f} s | "
+                f"memoria {_kib(etapa.memoria_actual)} ({_kib(etapa.memoria_actual - anterior.memoria_actual, True)}), "
+                f"pico {_kib(etapa.memoria_pico)}"
+            )
+            cambios = {
+                clase: etapa.instancias_orm.get(clase, 0) - anterior.instancias_orm.get(clase, 0)
+                for clase in sorted(etapa.instancias_orm.keys() | anterior.instancias_orm.keys())
+            }
+            instancias = ", ".join(
+                f"{clase}={etapa.instancias_orm.get(clase, 0)} ({cambio:+d})"
+                for clase, cambio in cambios.items() if etapa.instancias_orm.get(clase, 0) or cambio
+            )
+            lineas.append(f"  instancias ORM: {instancias or 'ninguna'}")
+            lineas.append(
+                f"  colecciones cargadas: {etapa.colecciones[0]} con {etapa.colecciones[1]} elementos"
+                f" | Decimal: {etapa.decimales} ({etapa.decimales - anterior.decimales:+d})"
+                + (f" | identity map: {etapa.identity_map}" if etapa.identity_map is not None else "")
+            )
+            lineas.extend(f"  {linea}" for linea in etapa.diferencia)
+        return "\n".join(lineas)
+
+
+def _kib(octetos: int, signo: bool = False) -> str:
+    return f"{octetos / 1024:{'+' if signo else ''}.1f} KiB"
+
+
+def activar_perfil_memoria(activo: bool = True) -> None:
+    """Activa o desactiva el perfilado (inicia o detiene tracemalloc si hace falta)."""
+    global _activo, _iniciado_por_nosotros
+    if activo and not tracemalloc.is_tracing():
+        tracemalloc.start(MARCOS_TRACEMALLOC)
+        _iniciado_por_nosotros = True
+    elif not activo and _iniciado_por_nosotros:
+        tracemalloc.stop()
+        _iniciado_por_nosotros = False
+    _activo = activo
+
+
+def perfil_memoria_activo() -> bool:
+    return _activo
+
+
+class _Perfil:
+    def __init__(self, nombre: str, db: Optional[Session]):
+        self.informe = InformeMemoria(nombre)
+        self.db = db
+        self.inicio = time.perf_counter()
+        self.instantanea: Optional[tracemalloc.Snapshot] = None
+
+    def marcar(self, nombre: str) -> None:
+        instantanea = tracemalloc.take_snapshot().filter_traces(_FILTROS)
+        diferencia = []
+        if self.instantanea is not None:
+            diferencia = [
+                str(estadistica)
+                for estadistica in instantanea.compare_to(self.instantanea, "lineno")[:LINEAS_DIFERENCIA]
+                if estadistica.size_diff
+            ]
+        self.instantanea = instantanea
+        actual, pico = tracemalloc.get_traced_memory()
+        instancias, colecciones, decimales = _contar_objetos()
+        self.informe.etapas.append(EtapaMemoria(
+            nombre=nombre,
+            segundos=time.perf_counter() - self.inicio,
+            memoria_actual=actual,
+            memoria_pico=pico,
+            instancias_orm=instancias,
+            colecciones=colecciones,
+            decimales=decimales,
+            identity_map=len(self.db.identity_map) if self.db is not None else None,
+            diferencia=diferencia
+        ))
+
+
+def _contar_objetos() -> Tuple[Dict[str, int], Tuple[int, int], int]:
+    """
+    Instancias por clase mapeada, colecciones de relaciones y Decimal vivos (recorre el gc).
+
+    El gc no sigue los Decimal (no contienen referencias): se cuentan, sin
+    repetir, los referenciados desde diccionarios (el __dict__ de las
+    instancias), tuplas (filas de resultados) y listas.
+    """
+    clases = {mapper.class_: mapper.class_.__name__ for mapper in Base.registry.mappers}
+    instancias: Dict[str, int] = {}
+    num_colecciones = elementos = 0
+    contenedores = []
+    for objeto in gc.get_objects():
+        tipo = type(objeto)
+        if tipo in clases:
+            nombre = clases[tipo]
+            instancias[nombre] = instancias.get(nombre, 0) + 1
+        elif tipo is InstrumentedList:
+            num_colecciones += 1
+            elementos += len(objeto)
+        if tipo in _CONTENEDORES:
+            contenedores.append(objeto)
+    decimales = {id(valor) for valor in gc.get_referents(*contenedores) if type(valor) is Decimal}
+    return instancias, (num_colecciones, elementos), len(decimales)
+
+
+@contextmanager
+def perfil(nombre: str, db: Optional[Session] = None) -> Iterator[Optional[InformeMemoria]]:
+    """
+    Perfila un bloque: instantánea al entrar y al salir, y resumen en el log.
+
+    Desactivado, no hace nada y devuelve None. Dentro de otro perfil del mismo
+    hilo, el bloque se anota como dos etapas del perfil exterior.
+    """
+    if not _activo:
+        yield None
+        return
+    exterior: Optional[_Perfil] = getattr(_local, "perfil", None)
+    if exterior is not None:
+        exterior.marcar(f"{nombre}: inicio")
+        try:
+            yield exterior.informe
+        finally:
+            exterior.marcar(f"{nombre}: fin")
+        return
+
+    actual = _local.perfil = _Perfil(nombre, db)
+    actual.marcar("inicio")
+    try:
+        yield actual.informe
+    finally:
+        actual.marcar("fin")
+        _local.perfil = None
+        logger.info(actual.informe.resumen())
+
+
+def marcar_etapa(nombre: str) -> None:
+    """Frontera de etapa dentro de una entrada perfilada (no hace nada si no hay perfil activo)."""
+    if _activo:
+        actual: Optional[_Perfil] = getattr(_local, "perfil", None)
+        if actual is not None:
+            actual.marcar(nombre)
+
+
+def perfilado(nombre: str) -> Callable:
+    """
+    Decorador para los puntos de entrada de los servicios.
+
+    El perfil usa la sesión `self.db` del servicio para el tamaño del identity map.
+    """
+    def decorador(funcion: Callable) -> Callable:
+        @functools.wraps(funcion)
+        def envoltura(self, *args, **kwargs):
+            if not _activo:
+                return funcion(self, *args, **kwargs)
+            with perfil(nombre, getattr(self, "db", None)):
+                return funcion(self, *args, **kwargs)
+        return envoltura
+    return decorador
+
+
+if os.environ.get(VARIABLE_ENTORNO, "") not in ("", "0"):
+    activar_perfil_memoria()
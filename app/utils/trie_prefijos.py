@@ -0,0 +1,38 @@
+from typing import Dict, Generic, Iterable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TriePrefijos(Generic[T]):
+    """
+    Trie de prefijos de códigos de cuenta con búsqueda por prefijo más largo.
+
+    Permite asignar cada cuenta del PGC a una línea de un estado financiero:
+    con "54" -> Inversiones financieras y "544" -> Deudores, la cuenta
+    "5440001" resuelve a Deudores y "5410" a Inversiones financieras.
+    """
+
+    __slots__ = ("_raiz",)
+
+    def __init__(self, entradas: Iterable[Tuple[str, T]] = ()):
+        self._raiz: Dict = {}
+        for prefijo, valor in entradas:
+            self.insertar(prefijo, valor)
+
+    def insertar(self, prefijo: str, valor: T) -> None:
+        nodo = self._raiz
+        for caracter in prefijo:
+            nodo = nodo.setdefault(caracter, {})
+        # La clave None marca el final de un prefijo (no colisiona con caracteres)
+        nodo[None] = valor
+
+    def buscar(self, codigo: str) -> Optional[T]:
+        """Devuelve el valor del prefijo más largo de `codigo`, o None si no hay ninguno."""
+        nodo = self._raiz
+        encontrado = nodo.get(None)
+        for caracter in codigo:
+            nodo = nodo.get(caracter)
+            if nodo is None:
+                break
+            encontrado = nodo.get(None, encontrado)
+        return encontrado
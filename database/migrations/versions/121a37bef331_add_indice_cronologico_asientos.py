@@ -0,0 +1,27 @@
+"""Add índice cronológico de asientos por ejercicio
+
+Revision ID: 121a37bef331
+Revises: e8437d0be8c9
+Create Date: 2026-10-19 10:03:17.228940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '121a37bef331'
+down_revision: Union[str, Sequence[str], None] = 'e8437d0be8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_asientos_ejercicio_fecha_id', 'asientos', ['ejercicio_id', 'fecha', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_asientos_ejercicio_fecha_id', table_name='asientos')
@@ -0,0 +1,52 @@
+"""Add activos fijos (registro de inmovilizado)
+
+Revision ID: 3a9f4c2b7d10
+Revises: e6b73d1c15c8
+Create Date: 2026-10-19 15:02:11.540917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9f4c2b7d10'
+down_revision: Union[str, Sequence[str], None] = 'e6b73d1c15c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('activos_fijos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('empresa_id', sa.Integer(), nullable=False),
+    sa.Column('codigo', sa.String(length=20), nullable=False),
+    sa.Column('descripcion', sa.String(length=200), nullable=False),
+    sa.Column('cuenta_amortizacion_id', sa.Integer(), nullable=False),
+    sa.Column('cuenta_gasto_id', sa.Integer(), nullable=False),
+    sa.Column('fecha_alta', sa.Date(), nullable=False),
+    sa.Column('fecha_baja', sa.Date(), nullable=True),
+    sa.Column('valor_adquisicion', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('valor_residual', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('vida_util_meses', sa.Integer(), nullable=False),
+    sa.Column('metodo', sa.String(length=20), nullable=False),
+    sa.Column('amortizacion_acumulada', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['cuenta_amortizacion_id'], ['cuentas_contables.id'], ),
+    sa.ForeignKeyConstraint(['cuenta_gasto_id'], ['cuentas_contables.id'], ),
+    sa.ForeignKeyConstraint(['empresa_id'], ['empresas.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('activos_fijos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_activos_fijos_codigo'), ['codigo'], unique=True)
+        batch_op.create_index(batch_op.f('ix_activos_fijos_empresa_id'), ['empresa_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('activos_fijos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_activos_fijos_empresa_id'))
+        batch_op.drop_index(batch_op.f('ix_activos_fijos_codigo'))
+    op.drop_table('activos_fijos')
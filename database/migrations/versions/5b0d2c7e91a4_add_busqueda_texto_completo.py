@@ -0,0 +1,56 @@
+"""Add índice de texto completo de apuntes (FTS5 / tsvector)
+
+Revision ID: 5b0d2c7e91a4
+Revises: 121a37bef331
+Create Date: 2026-10-19 11:20:05.671342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.busqueda import DDL_SQLITE, DDL_POSTGRESQL, TRIGGERS_SQLITE
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0d2c7e91a4'
+down_revision: Union[str, Sequence[str], None] = '121a37bef331'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialecto = op.get_bind().dialect.name
+    if dialecto == 'sqlite':
+        for sentencia in DDL_SQLITE:
+            op.execute(sentencia)
+        # Indexar los apuntes existentes
+        op.execute(
+            "INSERT INTO busqueda_apuntes (rowid, concepto, descripcion) "
+            "SELECT ap.id, a.concepto, ap.descripcion "
+            "FROM apuntes_contables ap JOIN asientos a ON a.id = ap.asiento_id"
+        )
+    elif dialecto == 'postgresql':
+        for sentencia in DDL_POSTGRESQL:
+            op.execute(sentencia)
+        op.execute(
+            "INSERT INTO busqueda_apuntes (apunte_id, documento) "
+            "SELECT ap.id, setweight(to_tsvector('spanish', a.concepto), 'A') "
+            "|| setweight(to_tsvector('spanish', ap.descripcion), 'B') "
+            "FROM apuntes_contables ap JOIN asientos a ON a.id = ap.asiento_id"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialecto = op.get_bind().dialect.name
+    if dialecto == 'sqlite':
+        for trigger in TRIGGERS_SQLITE:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    elif dialecto == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS tr_busqueda_apuntes ON apuntes_contables")
+        op.execute("DROP TRIGGER IF EXISTS tr_busqueda_asientos ON asientos")
+        op.execute("DROP FUNCTION IF EXISTS busqueda_apuntes_sync()")
+        op.execute("DROP FUNCTION IF EXISTS busqueda_asientos_sync()")
+    op.execute("DROP TABLE IF EXISTS busqueda_apuntes")
@@ -0,0 +1,30 @@
+"""Add marca de ejercicio archivado
+
+Revision ID: 608ac550c061
+Revises: 5b0d2c7e91a4
+Create Date: 2026-10-19 12:41:52.904118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '608ac550c061'
+down_revision: Union[str, Sequence[str], None] = '5b0d2c7e91a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('ejercicios_fiscales', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('archivado', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('ejercicios_fiscales', schema=None) as batch_op:
+        batch_op.drop_column('archivado')
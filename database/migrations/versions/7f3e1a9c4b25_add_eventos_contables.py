@@ -0,0 +1,37 @@
+"""Add bandeja de salida de eventos contables
+
+Revision ID: 7f3e1a9c4b25
+Revises: d2b7e4a91f60
+Create Date: 2026-10-19 17:58:02.615940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3e1a9c4b25'
+down_revision: Union[str, Sequence[str], None] = 'd2b7e4a91f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('eventos_contables',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=40), nullable=False),
+    sa.Column('ejercicio_id', sa.Integer(), nullable=False),
+    sa.Column('asiento_id', sa.Integer(), nullable=True),
+    sa.Column('carga', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['ejercicio_id'], ['ejercicios_fiscales.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('eventos_contables')
@@ -0,0 +1,44 @@
+"""Add divisas en apuntes y tabla de tipos de cambio
+
+Revision ID: 9c41e2d7a5b3
+Revises: 3a9f4c2b7d10
+Create Date: 2026-10-19 16:41:27.093355
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.busqueda import sin_triggers_busqueda
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41e2d7a5b3'
+down_revision: Union[str, Sequence[str], None] = '3a9f4c2b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tipos_cambio',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('moneda', sa.String(length=3), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('tipo', sa.Numeric(precision=12, scale=6), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('moneda', 'fecha')
+    )
+    with sin_triggers_busqueda(op.get_bind()), op.batch_alter_table('apuntes_contables', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('moneda', sa.String(length=3), nullable=True))
+        batch_op.add_column(sa.Column('importe_divisa', sa.Numeric(precision=12, scale=2), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Sin batch: recrear apuntes_contables en SQLite invalidaría los triggers
+    # del índice de búsqueda (DROP COLUMN nativo desde SQLite 3.35).
+    op.drop_column('apuntes_contables', 'importe_divisa')
+    op.drop_column('apuntes_contables', 'moneda')
+    op.drop_table('tipos_cambio')
@@ -0,0 +1,34 @@
+"""Sellar en la cadena de hashes los asientos anteriores a ella
+
+Revision ID: a4d81f6c3e52
+Revises: 7f3e1a9c4b25
+Create Date: 2026-10-19 20:41:37.208815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.orm import Session
+
+from app.services.cadena_hash_service import CadenaHashService
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d81f6c3e52'
+down_revision: Union[str, Sequence[str], None] = '7f3e1a9c4b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Los asientos registrados antes de e8437d0be8c9 no tienen posición en la
+    # cadena: se añaden al final de la de su ejercicio para que verificar() los cubra
+    with Session(bind=op.get_bind()) as db:
+        CadenaHashService(db).sellar_pendientes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Los sellos añadidos no se distinguen de los demás: se conservan
+    pass
@@ -0,0 +1,28 @@
+"""Add revision a tipos de cambio
+
+Revision ID: b62e9d0f3a17
+Revises: a4d81f6c3e52
+Create Date: 2026-10-19 22:14:05.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b62e9d0f3a17'
+down_revision: Union[str, Sequence[str], None] = 'a4d81f6c3e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tipos_cambio', sa.Column('revision', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tipos_cambio', 'revision')
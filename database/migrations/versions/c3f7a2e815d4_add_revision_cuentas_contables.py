@@ -0,0 +1,28 @@
+"""Add revision a cuentas contables
+
+Revision ID: c3f7a2e815d4
+Revises: b62e9d0f3a17
+Create Date: 2026-10-19 22:31:48.602117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f7a2e815d4'
+down_revision: Union[str, Sequence[str], None] = 'b62e9d0f3a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cuentas_contables', sa.Column('revision', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('cuentas_contables', 'revision')
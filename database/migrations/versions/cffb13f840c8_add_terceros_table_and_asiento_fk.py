@@ -42,9 +42,13 @@ def upgrade() -> None:
 def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_constraint(None, 'asientos', type_='foreignkey')
-    op.drop_index(op.f('ix_asientos_tercero_id'), table_name='asientos')
-    op.drop_column('asientos', 'tercero_id')
-    op.drop_index(op.f('ix_terceros_nif'), table_name='terceros')
+    with op.batch_alter_table('asientos', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_asientos_tercero_id_terceros'), type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_asientos_tercero_id'))
+        batch_op.drop_column('tercero_id')
+
+    with op.batch_alter_table('terceros', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_terceros_nif'))
+
     op.drop_table('terceros')
     # ### end Alembic commands ###
@@ -0,0 +1,31 @@
+"""Add índices compuestos para la paginación por clave
+
+Revision ID: d2b7e4a91f60
+Revises: 9c41e2d7a5b3
+Create Date: 2026-10-19 15:12:08.437215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b7e4a91f60'
+down_revision: Union[str, Sequence[str], None] = '9c41e2d7a5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_asientos_ejercicio_fecha_numero_id', 'asientos', ['ejercicio_id', 'fecha', 'numero', 'id'], unique=False)
+    op.create_index('ix_apuntes_contables_cuenta_asiento_id', 'apuntes_contables', ['cuenta_id', 'asiento_id', 'id'], unique=False)
+    op.create_index('ix_terceros_nombre_id', 'terceros', ['nombre', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_terceros_nombre_id', table_name='terceros')
+    op.drop_index('ix_apuntes_contables_cuenta_asiento_id', table_name='apuntes_contables')
+    op.drop_index('ix_asientos_ejercicio_fecha_numero_id', table_name='asientos')
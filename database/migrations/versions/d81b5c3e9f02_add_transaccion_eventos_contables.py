@@ -0,0 +1,31 @@
+"""Add transaccion a la bandeja de salida de eventos
+
+Revision ID: d81b5c3e9f02
+Revises: c3f7a2e815d4
+Create Date: 2026-10-19 22:58:13.914275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81b5c3e9f02'
+down_revision: Union[str, Sequence[str], None] = 'c3f7a2e815d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Los eventos existentes quedan en la transacción 0, por delante de los nuevos
+    op.add_column('eventos_contables', sa.Column('transaccion', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_index('ix_eventos_contables_transaccion_id', 'eventos_contables', ['transaccion', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_eventos_contables_transaccion_id', table_name='eventos_contables')
+    op.drop_column('eventos_contables', 'transaccion')
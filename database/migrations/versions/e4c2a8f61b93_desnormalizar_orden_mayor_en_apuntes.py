@@ -0,0 +1,54 @@
+"""Desnormalizar ejercicio, fecha y número del asiento en los apuntes
+
+Revision ID: e4c2a8f61b93
+Revises: d81b5c3e9f02
+Create Date: 2026-10-19 23:36:52.470318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.busqueda import sin_triggers_busqueda
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c2a8f61b93'
+down_revision: Union[str, Sequence[str], None] = 'd81b5c3e9f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('apuntes_contables', sa.Column('ejercicio_id', sa.Integer(), nullable=True))
+    op.add_column('apuntes_contables', sa.Column('fecha', sa.Date(), nullable=True))
+    op.add_column('apuntes_contables', sa.Column('numero', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE apuntes_contables SET "
+        "ejercicio_id = (SELECT a.ejercicio_id FROM asientos a WHERE a.id = apuntes_contables.asiento_id), "
+        "fecha = (SELECT a.fecha FROM asientos a WHERE a.id = apuntes_contables.asiento_id), "
+        "numero = (SELECT a.numero FROM asientos a WHERE a.id = apuntes_contables.asiento_id)"
+    )
+    with sin_triggers_busqueda(op.get_bind()), op.batch_alter_table('apuntes_contables', schema=None) as batch_op:
+        batch_op.alter_column('ejercicio_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('fecha', existing_type=sa.Date(), nullable=False)
+        batch_op.alter_column('numero', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_index('ix_apuntes_contables_cuenta_asiento_id')
+        batch_op.create_index(
+            'ix_apuntes_contables_cuenta_ejercicio_fecha_numero_id',
+            ['cuenta_id', 'ejercicio_id', 'fecha', 'numero', 'id'],
+            unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Sin batch: recrear apuntes_contables en SQLite invalidaría los triggers
+    # del índice de búsqueda (DROP COLUMN nativo desde SQLite 3.35).
+    op.drop_index('ix_apuntes_contables_cuenta_ejercicio_fecha_numero_id', table_name='apuntes_contables')
+    op.create_index('ix_apuntes_contables_cuenta_asiento_id', 'apuntes_contables', ['cuenta_id', 'asiento_id', 'id'], unique=False)
+    op.drop_column('apuntes_contables', 'numero')
+    op.drop_column('apuntes_contables', 'fecha')
+    op.drop_column('apuntes_contables', 'ejercicio_id')
@@ -0,0 +1,34 @@
+"""Add clave de idempotencia en asientos
+
+Revision ID: e6b73d1c15c8
+Revises: 608ac550c061
+Create Date: 2026-10-19 13:30:44.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.busqueda import sin_triggers_busqueda
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b73d1c15c8'
+down_revision: Union[str, Sequence[str], None] = '608ac550c061'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with sin_triggers_busqueda(op.get_bind()), op.batch_alter_table('asientos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('clave_idempotencia', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_asientos_clave_idempotencia'), ['clave_idempotencia'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with sin_triggers_busqueda(op.get_bind()), op.batch_alter_table('asientos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_asientos_clave_idempotencia'))
+        batch_op.drop_column('clave_idempotencia')
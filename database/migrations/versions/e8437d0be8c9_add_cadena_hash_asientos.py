@@ -0,0 +1,47 @@
+"""Add cadena de hashes de asientos y puntos de control
+
+Revision ID: e8437d0be8c9
+Revises: cffb13f840c8
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8437d0be8c9'
+down_revision: Union[str, Sequence[str], None] = 'cffb13f840c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('asientos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('posicion_cadena', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('hash_cadena', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_asientos_ejercicio_id_posicion_cadena', ['ejercicio_id', 'posicion_cadena'])
+
+    op.create_table('puntos_control_cadena',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('ejercicio_id', sa.Integer(), nullable=False),
+    sa.Column('posicion', sa.Integer(), nullable=False),
+    sa.Column('asiento_id', sa.Integer(), nullable=False),
+    sa.Column('hash_cadena', sa.String(length=64), nullable=False),
+    sa.ForeignKeyConstraint(['asiento_id'], ['asientos.id'], ),
+    sa.ForeignKeyConstraint(['ejercicio_id'], ['ejercicios_fiscales.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('ejercicio_id', 'posicion')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('puntos_control_cadena')
+    with op.batch_alter_table('asientos', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_asientos_ejercicio_id_posicion_cadena', type_='unique')
+        batch_op.drop_column('hash_cadena')
+        batch_op.drop_column('posicion_cadena')
@@ -0,0 +1,147 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+from sqlalchemy import select, func, update
+
+from app.models.activo_fijo import ActivoFijo
+from app.models.asiento import Asiento
+from app.models.cuenta import CuentaContable
+from app.services.amortizacion_service import (
+    AmortizacionService,
+    amortizacion_acumulada_centimos,
+    METODO_LINEAL,
+    METODO_DIGITOS
+)
+from app.services.cadena_hash_service import CadenaHashService
+from app.exceptions import EjercicioNoEncontradoError
+
+@pytest.fixture
+def cuentas_amortizacion(db_session):
+    cuentas = [
+        CuentaContable(codigo="6811", descripcion="Amortización del inmovilizado material"),
+        CuentaContable(codigo="2811", descripcion="A.A. construcciones"),
+        CuentaContable(codigo="2816", descripcion="A.A. mobiliario"),
+    ]
+    db_session.add_all(cuentas)
+    db_session.commit()
+    return {c.codigo: c for c in cuentas}
+
+def _activo(empresa_id, cuentas, codigo, valor, vida, metodo=METODO_LINEAL, alta=date(2024, 1, 10), amortizacion="2816"):
+    return ActivoFijo(
+        empresa_id=empresa_id,
+        codigo=codigo,
+        descripcion=f"Activo {codigo}",
+        cuenta_gasto_id=cuentas["6811"].id,
+        cuenta_amortizacion_id=cuentas[amortizacion].id,
+        fecha_alta=alta,
+        valor_adquisicion=Decimal(valor),
+        valor_residual=Decimal("0"),
+        vida_util_meses=vida,
+        metodo=metodo,
+        amortizacion_acumulada=Decimal("0")
+    )
+
+@pytest.mark.parametrize("metodo", [METODO_LINEAL, METODO_DIGITOS])
+def test_acumulado_termina_en_la_base(metodo):
+    base, vida = 100_001, 7
+    acumulados = [amortizacion_acumulada_centimos(base, vida, k, metodo) for k in range(vida + 2)]
+    assert acumulados[0] == 0
+    assert acumulados[vida] == acumulados[vida + 1] == base
+    assert all(a <= b for a, b in zip(acumulados, acumulados[1:]))
+
+def test_cuadro_suma_de_digitos_decreciente(db_session, empresa_test, cuentas_amortizacion):
+    activo = _activo(empresa_test.id, cuentas_amortizacion, "AF1", "600.00", 3, METODO_DIGITOS, alta=date(2024, 11, 5))
+    cuadro = AmortizacionService(db_session).cuadro_amortizacion(activo)
+    assert cuadro == [
+        (date(2024, 11, 30), Decimal("300.00")),
+        (date(2024, 12, 31), Decimal("200.00")),
+        (date(2025, 1, 31), Decimal("100.00")),
+    ]
+
+def test_contabilizar_periodo_agregado(db_session, ejercicio_test, empresa_test, cuentas_amortizacion):
+    db_session.add_all([
+        _activo(empresa_test.id, cuentas_amortizacion, "AF1", "1200.00", 12),
+        _activo(empresa_test.id, cuentas_amortizacion, "AF2", "100.00", 3, amortizacion="2811"),
+        _activo(empresa_test.id, cuentas_amortizacion, "AF3", "500.00", 10, alta=date(2024, 3, 1)),  # aún no
+    ])
+    db_session.commit()
+    service = AmortizacionService(db_session)
+
+    resultado = service.contabilizar_periodo(empresa_test.id, 2024, 1)
+
+    assert resultado.total == Decimal("133.33")
+    assert len(resultado.asientos) == 1
+    asiento = db_session.get(Asiento, resultado.asientos[0].id)
+    assert asiento.fecha == date(2024, 1, 31)
+    importes = {(a.cuenta.codigo, a.debe, a.haber) for a in asiento.apuntes}
+    assert importes == {
+        ("6811", Decimal("133.33"), Decimal("0")),
+        ("2811", Decimal("0"), Decimal("33.33")),
+        ("2816", Decimal("0"), Decimal("100.00")),
+    }
+
+    # Repetir el periodo no vuelve a amortizar
+    assert service.contabilizar_periodo(empresa_test.id, 2024, 1).cuotas == []
+
+def _saldo_cuenta(db_session, codigo):
+    from app.models.apunte import ApunteContable
+    return db_session.execute(
+        select(func.coalesce(func.sum(ApunteContable.haber - ApunteContable.debe), 0))
+        .join(CuentaContable, CuentaContable.id == ApunteContable.cuenta_id)
+        .where(CuentaContable.codigo == codigo)
+    ).scalar()
+
+@pytest.mark.parametrize("por_activo", [False, True])
+def test_repetir_periodo_solo_actualiza_lo_contabilizado(db_session, ejercicio_test, empresa_test, cuentas_amortizacion, por_activo):
+    db_session.add(_activo(empresa_test.id, cuentas_amortizacion, "AF1", "300.00", 3))
+    db_session.commit()
+    service = AmortizacionService(db_session)
+    service.contabilizar_periodo(empresa_test.id, 2024, 1, por_activo=por_activo)
+
+    # Activo dado de alta después: la diferencia se registra con otra clave
+    nuevo = _activo(empresa_test.id, cuentas_amortizacion, "AF2", "150.00", 3)
+    db_session.add(nuevo)
+    db_session.commit()
+    resultado = service.contabilizar_periodo(empresa_test.id, 2024, 1, por_activo=por_activo)
+    assert resultado.total == Decimal("50.00") and len(resultado.asientos) == 1
+
+    # Reintento de unas cuotas ya registradas (acumulado no visto): ni asiento ni UPDATE
+    db_session.execute(update(ActivoFijo).where(ActivoFijo.id == nuevo.id).values(amortizacion_acumulada=0))
+    db_session.commit()
+    resultado = service.contabilizar_periodo(empresa_test.id, 2024, 1, por_activo=por_activo)
+    assert resultado.cuotas == [] and resultado.asientos == []
+    db_session.refresh(nuevo)
+    assert nuevo.amortizacion_acumulada == Decimal("0.00")
+    assert _saldo_cuenta(db_session, "2816") == Decimal("150.00")
+
+def test_mes_sin_contabilizar_se_recupera(db_session, ejercicio_test, empresa_test, cuentas_amortizacion):
+    activo = _activo(empresa_test.id, cuentas_amortizacion, "AF1", "100.00", 3)
+    db_session.add(activo)
+    db_session.commit()
+    service = AmortizacionService(db_session)
+
+    resultado = service.contabilizar_periodo(empresa_test.id, 2024, 2)
+    assert resultado.total == Decimal("66.67")
+
+    resultado = service.contabilizar_periodo(empresa_test.id, 2024, 6)
+    assert resultado.total == Decimal("33.33")
+    db_session.refresh(activo)
+    assert activo.amortizacion_acumulada == Decimal("100.00")
+
+def test_un_asiento_por_activo_mantiene_numeracion_y_cadena(db_session, ejercicio_test, empresa_test, cuentas_amortizacion):
+    db_session.add_all([
+        _activo(empresa_test.id, cuentas_amortizacion, f"AF{i}", "120.00", 12) for i in range(5)
+    ])
+    db_session.commit()
+
+    resultado = AmortizacionService(db_session).contabilizar_periodo(empresa_test.id, 2024, 1, por_activo=True)
+
+    assert [a.numero for a in resultado.asientos] == [1, 2, 3, 4, 5]
+    assert db_session.execute(select(func.count(Asiento.id))).scalar() == 5
+    verificacion = CadenaHashService(db_session).verificar(ejercicio_test.id)
+    assert verificacion.valido
+    assert verificacion.asientos_verificados == 5
+
+def test_periodo_sin_ejercicio(db_session, ejercicio_test, empresa_test, cuentas_amortizacion):
+    with pytest.raises(EjercicioNoEncontradoError):
+        AmortizacionService(db_session).contabilizar_periodo(empresa_test.id, 2030, 1)
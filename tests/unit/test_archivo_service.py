@@ -0,0 +1,151 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+from sqlalchemy import select, func
+
+from app.exceptions import EjercicioAbiertoError, EjercicioArchivadoError
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.ejercicio import EjercicioFiscal
+from app.services.archivo_service import ArchivoService
+from app.services.asiento_service import AsientoService
+from app.services.divisa_service import DivisaService
+from app.services.ejercicio_service import EjercicioService
+from app.services.estados_financieros_service import EstadosFinancierosService, invalidar_cache_mapeo
+from app.services.libro_service import LibroService
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+from app.utils.columnar import EscritorColumnar, LectorColumnar
+
+def _asiento(ejercicio_id: int, fecha: date, importe: str, concepto: str = "Cobro") -> AsientoCreate:
+    return AsientoCreate(
+        fecha=fecha,
+        concepto=concepto,
+        ejercicio_id=ejercicio_id,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="572", descripcion="Banco", debe=Decimal(importe), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal(importe)),
+        ]
+    )
+
+@pytest.fixture
+def dos_ejercicios(db_session, ejercicio_test, cuentas_test):
+    """Ejercicio 2024 cerrado con dos asientos y 2025 abierto con uno."""
+    siguiente = EjercicioFiscal(
+        empresa_id=ejercicio_test.empresa_id,
+        fecha_inicio=date(2025, 1, 1),
+        fecha_fin=date(2025, 12, 31),
+        estado=True
+    )
+    db_session.add(siguiente)
+    db_session.commit()
+    service = AsientoService(db_session)
+    service.crear_asiento(_asiento(ejercicio_test.id, date(2024, 11, 5), "100.00", "Cobro noviembre"))
+    service.crear_asiento(_asiento(ejercicio_test.id, date(2024, 3, 1), "20.50", "Cobro marzo"))
+    service.crear_asiento(_asiento(siguiente.id, date(2025, 2, 1), "7.25", "Cobro febrero"))
+    EjercicioService(db_session).cerrar_ejercicio(ejercicio_test.id)
+    return ejercicio_test, siguiente
+
+def test_columnar_ida_y_vuelta(tmp_path):
+    """Tipos, nulos, proyección de columnas y poda de grupos por rango."""
+    ruta = tmp_path / "prueba.pgca"
+    with EscritorColumnar(ruta, {"version": 1}) as escritor:
+        escritor.definir_tabla("t", {"n": "entero", "f": "fecha", "s": "texto"})
+        escritor.escribir("t", [(1, date(2024, 1, 1), "año"), (None, date(2024, 1, 2), None)])
+        escritor.escribir("t", [(3, date(2024, 6, 1), "")])
+
+    with LectorColumnar(ruta) as lector:
+        assert lector.metadatos == {"version": 1}
+        assert lector.num_filas("t") == 3
+        assert list(lector.filas("t")) == [
+            (1, date(2024, 1, 1), "año"), (None, date(2024, 1, 2), None), (3, date(2024, 6, 1), "")
+        ]
+        assert list(lector.filas("t", ["s"], rango=("f", date(2024, 5, 1), date(2024, 12, 31)))) == [("",)]
+
+def test_archivar_ejercicio_abierto_falla(db_session, ejercicio_test, tmp_path):
+    with pytest.raises(EjercicioAbiertoError):
+        ArchivoService(db_session, tmp_path).archivar_ejercicio(ejercicio_test.id)
+
+def test_archivar_elimina_filas_vivas(db_session, dos_ejercicios, tmp_path):
+    cerrado, abierto = dos_ejercicios
+
+    ruta = ArchivoService(db_session, tmp_path).archivar_ejercicio(cerrado.id)
+
+    assert ruta.exists()
+    assert cerrado.archivado is True
+    asientos_vivos = db_session.execute(
+        select(Asiento.ejercicio_id, func.count()).group_by(Asiento.ejercicio_id)
+    ).all()
+    assert asientos_vivos == [(abierto.id, 1)]
+    assert db_session.execute(select(func.count(ApunteContable.id))).scalar() == 2
+    with pytest.raises(EjercicioArchivadoError):
+        ArchivoService(db_session, tmp_path).archivar_ejercicio(cerrado.id)
+
+def test_diario_y_mayor_unen_archivo_y_datos_vivos(db_session, dos_ejercicios, tmp_path):
+    cerrado, _ = dos_ejercicios
+    libro = LibroService(db_session, tmp_path)
+    antes = list(libro.diario())
+
+    ArchivoService(db_session, tmp_path).archivar_ejercicio(cerrado.id)
+
+    despues = list(libro.diario())
+    assert despues == antes
+    # Orden cronológico y numeración tras el cierre
+    assert [(l.fecha, l.numero, l.concepto) for l in despues[::2]] == [
+        (date(2024, 3, 1), 1, "Cobro marzo"),
+        (date(2024, 11, 5), 2, "Cobro noviembre"),
+        (date(2025, 2, 1), 1, "Cobro febrero"),
+    ]
+    # Rango que solo toca el archivo
+    assert len(list(libro.diario(date(2024, 10, 1), date(2024, 12, 31)))) == 2
+
+    mayor = list(libro.mayor("572"))
+    assert [saldo for _, saldo in mayor] == [Decimal("20.50"), Decimal("120.50"), Decimal("127.75")]
+
+def test_mayor_por_rango_parte_del_saldo_anterior(db_session, dos_ejercicios, tmp_path):
+    cerrado, _ = dos_ejercicios
+    libro = LibroService(db_session, tmp_path)
+    rangos = [(date(2024, 6, 1), date.max), (date(2025, 1, 1), date.max), (date(2024, 1, 1), date(2024, 12, 31))]
+
+    def saldos():
+        return [[saldo for _, saldo in libro.mayor("572", desde, hasta)] for desde, hasta in rangos]
+
+    esperados = [[Decimal("120.50"), Decimal("127.75")], [Decimal("127.75")], [Decimal("20.50"), Decimal("120.50")]]
+    assert saldos() == esperados
+    # Archivado: saldos finales del fichero o, dentro del ejercicio, sus apuntes
+    ArchivoService(db_session, tmp_path).archivar_ejercicio(cerrado.id)
+    assert saldos() == esperados
+
+def test_estados_comparativos_con_ejercicio_archivado(db_session, dos_ejercicios, tmp_path):
+    invalidar_cache_mapeo()
+    cerrado, abierto = dos_ejercicios
+    ArchivoService(db_session, tmp_path).archivar_ejercicio(cerrado.id)
+
+    estados = EstadosFinancierosService(db_session, tmp_path).generar(abierto.id)
+
+    efectivo = estados.balance.linea("B.V")
+    assert (efectivo.importe, efectivo.importe_anterior) == (Decimal("7.25"), Decimal("120.50"))
+
+def test_archivo_conserva_divisas_y_clave(db_session, ejercicio_test, cuentas_test, tmp_path):
+    DivisaService(db_session).registrar_tipo("USD", date(2024, 1, 1), Decimal("1.25"))
+    AsientoService(db_session).crear_asiento(AsientoCreate(
+        fecha=date(2024, 5, 2),
+        concepto="Factura proveedor USD",
+        ejercicio_id=ejercicio_test.id,
+        clave_idempotencia="fra-usd-1",
+        apuntes=[
+            ApunteCreate(cuenta_codigo="600", descripcion="Compra", moneda="USD", importe_divisa=Decimal("80")),
+            ApunteCreate(cuenta_codigo="400", descripcion="Proveedor", moneda="USD", importe_divisa=Decimal("-80")),
+        ]
+    ))
+    EjercicioService(db_session).cerrar_ejercicio(ejercicio_test.id)
+    libro = LibroService(db_session, tmp_path)
+    antes = list(libro.diario())
+
+    ruta = ArchivoService(db_session, tmp_path).archivar_ejercicio(ejercicio_test.id)
+
+    assert list(libro.diario()) == antes
+    assert {(l.cuenta_codigo, l.moneda, l.importe_divisa) for l in antes} == {
+        ("600", "USD", Decimal("80.00")), ("400", "USD", Decimal("-80.00"))
+    }
+    with LectorColumnar(ruta) as lector:
+        assert [c for c, in lector.filas("asientos", ["clave_idempotencia"])] == ["fra-usd-1"]
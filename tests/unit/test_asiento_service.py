@@ -131,3 +131,60 @@ def test_crear_asiento_factura_iva_21(db_session, ejercicio_test, cuentas_test,
     total_debe = sum(a.debe for a in asiento.apuntes)
     total_haber = sum(a.haber for a in asiento.apuntes)
     assert total_debe == total_haber == Decimal("121.00")
+
+
+def _cobro(ejercicio_id, importe, clave=None, cuenta="572"):
+    return AsientoCreate(
+        fecha=date(2024, 3, 1),
+        concepto="Cobro cliente",
+        ejercicio_id=ejercicio_id,
+        clave_idempotencia=clave,
+        apuntes=[
+            ApunteCreate(cuenta_codigo=cuenta, descripcion="Banco", debe=Decimal(importe), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal(importe)),
+        ]
+    )
+
+def test_registrar_asiento_ligero_equivale_a_crear(db_session, ejercicio_test, cuentas_test):
+    """El camino Core numera, encadena y guarda los apuntes igual que el ORM."""
+    from app.services.cadena_hash_service import CadenaHashService
+
+    service = AsientoService(db_session)
+    primero = service.crear_asiento(_cobro(ejercicio_test.id, "50.00"))
+    registrado = service.registrar_asiento(_cobro(ejercicio_test.id, "75.25"))
+
+    assert registrado.numero == primero.numero + 1
+    assert registrado.ejercicio_id == ejercicio_test.id
+    asiento = service.cargar_asiento(registrado)
+    assert [(a.cuenta.codigo, a.debe, a.haber) for a in asiento.apuntes] == [
+        ("572", Decimal("75.25"), Decimal("0.00")),
+        ("430", Decimal("0.00"), Decimal("75.25")),
+    ]
+    assert CadenaHashService(db_session).verificar(ejercicio_test.id).valido
+
+def test_registrar_asiento_ligero_errores_e_idempotencia(db_session, ejercicio_test, cuentas_test):
+    service = AsientoService(db_session)
+
+    with pytest.raises(AsientoDescuadradoError):
+        service.registrar_asiento(AsientoCreate(
+            fecha=date(2024, 3, 1), concepto="Descuadre", ejercicio_id=ejercicio_test.id,
+            apuntes=[
+                ApunteCreate(cuenta_codigo="572", descripcion="Banco", debe=Decimal("1.00"), haber=Decimal("0")),
+                ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal("0.99")),
+            ]
+        ))
+    with pytest.raises(CuentaNoEncontradaError):
+        service.registrar_asiento(_cobro(ejercicio_test.id, "1.00", cuenta="9999"))
+
+    original = service.registrar_asiento(_cobro(ejercicio_test.id, "10.00", clave="remesa-1"))
+    reintento = service.registrar_asiento(_cobro(ejercicio_test.id, "10.00", clave="remesa-1"))
+    assert reintento == original
+    assert original.numero == 1
+
+def test_importe_nulo_sin_orm_es_value_error(db_session, ejercicio_test, cuentas_test):
+    # Mismo error que @validates de ApunteContable, antes de validar el cuadre
+    with pytest.raises(ValueError, match="'debe' no puede ser nulo"):
+        AsientoService(db_session)._insertar_asiento_core(date(2024, 3, 1), "Cobro", ejercicio_test.id, [
+            ("572", "Banco", None, Decimal("0")),
+            ("430", "Cliente", Decimal("0"), Decimal("10.00")),
+        ])
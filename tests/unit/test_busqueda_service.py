@@ -0,0 +1,68 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+from sqlalchemy import update
+
+from app.models.asiento import Asiento
+from app.services.asiento_service import AsientoService
+from app.services.busqueda_service import BusquedaService, _consulta_tsquery
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+
+def _asiento(ejercicio_id: int, concepto: str, descripcion: str, cuenta: str, importe: str) -> AsientoCreate:
+    return AsientoCreate(
+        fecha=date(2024, 6, 1),
+        concepto=concepto,
+        ejercicio_id=ejercicio_id,
+        apuntes=[
+            ApunteCreate(cuenta_codigo=cuenta, descripcion=descripcion, debe=Decimal(importe), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="572", descripcion="Pago banco", debe=Decimal("0"), haber=Decimal(importe)),
+        ]
+    )
+
+@pytest.fixture
+def diario(db_session, ejercicio_test, cuentas_test):
+    service = AsientoService(db_session)
+    return [
+        service.crear_asiento(_asiento(ejercicio_test.id, "Facturación de electricidad", "Iberdrola junio", "600", "120.00")),
+        service.crear_asiento(_asiento(ejercicio_test.id, "Compra material oficina", "Papel y tóner", "600", "45.50")),
+        service.crear_asiento(_asiento(ejercicio_test.id, "Cobro factura cliente", "Transferencia recibida", "430", "300.00")),
+    ]
+
+def test_busca_por_concepto_y_descripcion(db_session, diario):
+    """Se encuentran palabras del concepto del asiento y de la descripción del apunte, sin acentos."""
+    busqueda = BusquedaService(db_session)
+
+    por_concepto = busqueda.buscar("facturacion")
+    assert {r.asiento_id for r in por_concepto} == {diario[0].id}
+
+    por_descripcion = busqueda.buscar("toner")
+    assert [r.descripcion for r in por_descripcion] == ["Papel y tóner"]
+
+def test_busqueda_por_prefijo_y_filtros(db_session, ejercicio_test, diario):
+    busqueda = BusquedaService(db_session)
+
+    # "fact" encuentra "Facturación" y "factura"
+    assert {r.asiento_id for r in busqueda.buscar("fact")} == {diario[0].id, diario[2].id}
+
+    filtrados = busqueda.buscar("fact", ejercicio_id=ejercicio_test.id, cuenta_codigo="43")
+    assert [(r.asiento_id, r.cuenta_codigo) for r in filtrados] == [(diario[2].id, "430")]
+
+    por_importe = busqueda.buscar("fact", importe_min=Decimal("100"), importe_max=Decimal("200"))
+    assert {r.asiento_id for r in por_importe} == {diario[0].id}
+
+def test_indice_sincronizado_con_cambios_de_concepto(db_session, diario):
+    db_session.execute(update(Asiento).where(Asiento.id == diario[1].id).values(concepto="Suministros varios"))
+
+    busqueda = BusquedaService(db_session)
+    assert busqueda.buscar("material") == []
+    assert {r.asiento_id for r in busqueda.buscar("suministros")} == {diario[1].id}
+
+def test_texto_con_operadores_no_rompe_la_consulta(db_session, diario):
+    assert BusquedaService(db_session).buscar('"cobro" AND -') == []
+    assert BusquedaService(db_session).buscar("   ") == []
+
+def test_consulta_tsquery_por_prefijo_y_sin_operadores():
+    # PostgreSQL: mismo criterio que FTS5 (todas las palabras, por prefijo)
+    assert _consulta_tsquery("factu  oficina") == "factu:* & oficina:*"
+    assert _consulta_tsquery("Compañía (A&B) !pago: 2024") == "Compañía:* & A:* & B:* & pago:* & 2024:*"
+    assert _consulta_tsquery("& | !") == ""
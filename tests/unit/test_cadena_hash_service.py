@@ -0,0 +1,172 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+from sqlalchemy import create_engine, select, update, delete
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.exceptions import ConflictoCadenaError
+from app.models.apunte import ApunteContable
+from app.models.asiento import Asiento
+from app.models.cadena_hash import PuntoControlCadena
+from app.models.cuenta import CuentaContable
+from app.models.empresa import Empresa
+from app.models.ejercicio import EjercicioFiscal
+from app.services import cadena_hash_service
+from app.services.asiento_service import AsientoService
+from app.services.cadena_hash_service import CadenaHashService
+from app.schemas.asiento import AsientoCreate, ApunteCreate, FacturaCreate
+
+def _asiento(ejercicio_id: int, dia: int, importe: str = "100.00") -> AsientoCreate:
+    return AsientoCreate(
+        fecha=date(2024, 3, dia),
+        concepto=f"Cobro {dia}",
+        ejercicio_id=ejercicio_id,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="572", descripcion="Cobro", debe=Decimal(importe), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal(importe)),
+        ]
+    )
+
+@pytest.fixture
+def intervalo_corto(monkeypatch):
+    monkeypatch.setattr(cadena_hash_service, "INTERVALO_PUNTO_CONTROL", 3)
+
+@pytest.fixture
+def asientos_encadenados(db_session, ejercicio_test, cuentas_test, intervalo_corto):
+    service = AsientoService(db_session)
+    return [service.crear_asiento(_asiento(ejercicio_test.id, dia)) for dia in range(1, 11)]
+
+def test_asientos_se_encadenan_al_registrar(db_session, ejercicio_test, asientos_encadenados):
+    """Cada asiento se escribe con su posición y un hash distinto; hay un punto de control cada N."""
+    assert [a.posicion_cadena for a in asientos_encadenados] == list(range(1, 11))
+    assert len({a.hash_cadena for a in asientos_encadenados}) == 10
+
+    puntos = db_session.execute(
+        select(PuntoControlCadena.posicion).order_by(PuntoControlCadena.posicion)
+    ).scalars().all()
+    assert puntos == [3, 6, 9]
+
+    resultado = CadenaHashService(db_session).verificar(ejercicio_test.id)
+    assert resultado.valido
+    assert resultado.asientos_verificados == 10
+
+def test_detecta_importe_alterado(db_session, ejercicio_test, asientos_encadenados):
+    """Una edición directa en SQL de un apunte se localiza en la posición afectada."""
+    alterado = asientos_encadenados[4]
+    db_session.execute(
+        update(ApunteContable)
+        .where(ApunteContable.asiento_id == alterado.id, ApunteContable.debe > 0)
+        .values(debe=Decimal("999.99"))
+    )
+
+    resultado = CadenaHashService(db_session).verificar(ejercicio_test.id)
+
+    assert not resultado.valido
+    assert [i.posicion for i in resultado.incidencias] == [5]
+
+def test_detecta_asiento_borrado(db_session, ejercicio_test, asientos_encadenados):
+    borrado = asientos_encadenados[7]
+    db_session.delete(borrado)
+    db_session.flush()
+
+    resultado = CadenaHashService(db_session).verificar(ejercicio_test.id)
+
+    assert not resultado.valido
+    assert resultado.incidencias[0].posicion == 8
+
+def test_verificacion_por_rango_arranca_en_punto_de_control(db_session, ejercicio_test, asientos_encadenados):
+    """Verificar desde la posición 8 solo recalcula desde el punto de control 6."""
+    resultado = CadenaHashService(db_session).verificar(ejercicio_test.id, desde=8)
+
+    assert resultado.valido
+    assert resultado.asientos_verificados == 4
+
+def test_factura_vincula_tercero_en_el_hash(db_session, ejercicio_test, cuentas_test, tercero_test):
+    service = AsientoService(db_session)
+    asiento = service.crear_asiento_factura(FacturaCreate(
+        fecha=date(2024, 2, 1),
+        concepto="Factura 1",
+        ejercicio_id=ejercicio_test.id,
+        tercero_id=tercero_test.id,
+        base_imponible=Decimal("100.00"),
+        tipo_iva=21,
+        cuenta_ingreso_gasto="700",
+        cuenta_tercero="430",
+        es_gasto=False
+    ))
+    db_session.execute(update(Asiento).where(Asiento.id == asiento.id).values(tercero_id=None))
+
+    resultado = CadenaHashService(db_session).verificar(ejercicio_test.id)
+
+    assert [i.asiento_id for i in resultado.incidencias] == [asiento.id]
+
+def _bd_fichero(ruta):
+    """Base de datos en fichero con un ejercicio 2024 y las cuentas 572 y 430 (sesiones con commit real)."""
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        empresa = Empresa(cif="B00000001", nombre="Paralelo S.L.")
+        db.add(empresa)
+        db.add_all([CuentaContable(codigo="572", descripcion="Bancos"), CuentaContable(codigo="430", descripcion="Clientes")])
+        db.flush()
+        ejercicio = EjercicioFiscal(empresa_id=empresa.id, fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 12, 31))
+        db.add(ejercicio)
+        db.commit()
+        return engine, ejercicio.id
+
+def test_verificacion_en_paralelo(tmp_path, intervalo_corto):
+    """Con una base de datos en fichero los tramos se reparten entre procesos."""
+    engine, ejercicio_id = _bd_fichero(tmp_path / "cadena.db")
+    with Session(engine) as db:
+        service = AsientoService(db)
+        for dia in range(1, 11):
+            service.crear_asiento(_asiento(ejercicio_id, dia))
+
+        resultado = CadenaHashService(db).verificar(ejercicio_id, workers=2)
+
+    engine.dispose()
+    assert resultado.valido
+    assert resultado.asientos_verificados == 10
+
+def test_sellar_asientos_anteriores_a_la_cadena(db_session, ejercicio_test, asientos_encadenados):
+    """Asientos sin posición (previos a la migración) se añaden a la cadena y se verifican."""
+    db_session.execute(delete(PuntoControlCadena))
+    db_session.execute(update(Asiento).values(posicion_cadena=None, hash_cadena=None))
+    db_session.commit()
+
+    assert CadenaHashService(db_session).sellar_pendientes() == 10
+    AsientoService(db_session).crear_asiento(_asiento(ejercicio_test.id, 11))
+
+    resultado = CadenaHashService(db_session).verificar(ejercicio_test.id)
+    assert resultado.valido
+    assert resultado.asientos_verificados == 11
+    puntos = db_session.execute(select(PuntoControlCadena.posicion)).scalars().all()
+    assert sorted(puntos) == [3, 6, 9]
+
+def test_posicion_ocupada_por_registro_concurrente(tmp_path, monkeypatch):
+    """Un último eslabón desfasado se reintenta; si persiste, error de dominio en lugar de IntegrityError."""
+    engine, ejercicio_id = _bd_fichero(tmp_path / "concurrente.db")
+    db = Session(engine)
+    service = AsientoService(db)
+    service.crear_asiento(_asiento(ejercicio_id, 1))
+    original = CadenaHashService.ultimo_eslabon
+    lecturas = []
+
+    def desfasado_una_vez(self, ejercicio_id):
+        lecturas.append(ejercicio_id)
+        return (0, cadena_hash_service.HASH_GENESIS) if len(lecturas) == 1 else original(self, ejercicio_id)
+
+    monkeypatch.setattr(CadenaHashService, "ultimo_eslabon", desfasado_una_vez)
+    assert service.crear_asiento(_asiento(ejercicio_id, 2)).posicion_cadena == 2
+    assert service.registrar_asiento(_asiento(ejercicio_id, 3)).numero == 3
+
+    monkeypatch.setattr(CadenaHashService, "ultimo_eslabon", lambda self, ejercicio_id: (0, "0" * 64))
+    with pytest.raises(ConflictoCadenaError):
+        service.crear_asiento(_asiento(ejercicio_id, 4))
+    with pytest.raises(ConflictoCadenaError):
+        service.registrar_asiento(_asiento(ejercicio_id, 4))
+    monkeypatch.undo()
+    assert CadenaHashService(db).verificar(ejercicio_id).valido
+    db.close()
+    engine.dispose()
@@ -0,0 +1,111 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.exceptions import AsientoDescuadradoError, ConflictoCadenaError, CuentaNoEncontradaError
+from app.models.asiento import Asiento
+from app.services import cadena_hash_service
+from app.services.asiento_service import AsientoService
+from app.services.cadena_hash_service import CadenaHashService
+from app.services.cola_asientos import ColaAsientos
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+
+def _asiento(ejercicio_id: int, debe: str, haber: str, cuenta: str = "430") -> AsientoCreate:
+    return AsientoCreate(
+        fecha=date(2024, 4, 1),
+        concepto="Cobro",
+        ejercicio_id=ejercicio_id,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="572", descripcion="Banco", debe=Decimal(debe), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo=cuenta, descripcion="Cliente", debe=Decimal("0"), haber=Decimal(haber)),
+        ]
+    )
+
+@pytest.fixture
+def session_factory(db_session):
+    # Sesiones del hilo escritor sobre la misma conexión (y transacción) del test
+    return sessionmaker(bind=db_session.connection())
+
+def test_cola_registra_en_lotes_con_numeracion_correlativa(db_session, session_factory, ejercicio_test, cuentas_test):
+    with ColaAsientos(session_factory, max_lote=8, max_espera_ms=20) as cola:
+        with ThreadPoolExecutor(max_workers=4) as clientes:
+            futuros = list(clientes.map(lambda _: cola.enviar(_asiento(ejercicio_test.id, "10.00", "10.00")), range(20)))
+        registrados = [f.result(timeout=5) for f in futuros]
+
+    assert sorted(r.numero for r in registrados) == list(range(1, 21))
+    assert db_session.execute(select(func.count(Asiento.id))).scalar() == 20
+    assert CadenaHashService(db_session).verificar(ejercicio_test.id).valido
+
+def test_errores_por_asiento_no_afectan_al_lote(db_session, session_factory, ejercicio_test, cuentas_test):
+    with ColaAsientos(session_factory, max_lote=10, max_espera_ms=50) as cola:
+        correcto_1 = cola.enviar(_asiento(ejercicio_test.id, "5.00", "5.00"))
+        descuadrado = cola.enviar(_asiento(ejercicio_test.id, "5.00", "4.00"))
+        sin_cuenta = cola.enviar(_asiento(ejercicio_test.id, "5.00", "5.00", cuenta="9999"))
+        correcto_2 = cola.enviar(_asiento(ejercicio_test.id, "7.00", "7.00"))
+
+    assert (correcto_1.result().numero, correcto_2.result().numero) == (1, 2)
+    with pytest.raises(AsientoDescuadradoError):
+        descuadrado.result()
+    with pytest.raises(CuentaNoEncontradaError):
+        sin_cuenta.result()
+    assert db_session.execute(select(func.count(Asiento.id))).scalar() == 2
+
+def test_posicion_ocupada_se_reintenta_en_el_savepoint(db_session, session_factory, ejercicio_test, cuentas_test, monkeypatch):
+    AsientoService(db_session).crear_asiento(_asiento(ejercicio_test.id, "1.00", "1.00"))
+    original = CadenaHashService.ultimo_eslabon
+    lecturas = []
+
+    def desfasado_una_vez(self, ejercicio_id):
+        lecturas.append(ejercicio_id)
+        return (0, cadena_hash_service.HASH_GENESIS) if len(lecturas) == 1 else original(self, ejercicio_id)
+
+    monkeypatch.setattr(CadenaHashService, "ultimo_eslabon", desfasado_una_vez)
+    with ColaAsientos(session_factory) as cola:
+        reintentado = cola.enviar(_asiento(ejercicio_test.id, "2.00", "2.00"))
+    assert reintentado.result(timeout=5).numero == 2
+
+    monkeypatch.setattr(CadenaHashService, "ultimo_eslabon", lambda self, ejercicio_id: (0, "0" * 64))
+    with ColaAsientos(session_factory) as cola:
+        ocupado = cola.enviar(_asiento(ejercicio_test.id, "3.00", "3.00"))
+    with pytest.raises(ConflictoCadenaError):
+        ocupado.result(timeout=5)
+    monkeypatch.undo()
+    assert CadenaHashService(db_session).verificar(ejercicio_test.id).valido
+
+def test_enviar_tras_cerrar_falla(session_factory, ejercicio_test):
+    cola = ColaAsientos(session_factory)
+    cola.cerrar()
+    with pytest.raises(RuntimeError):
+        cola.enviar(_asiento(ejercicio_test.id, "1.00", "1.00"))
+
+def test_error_de_sesion_falla_el_lote_y_la_cola_sigue(db_session, session_factory, ejercicio_test, cuentas_test, monkeypatch):
+    from app.services.divisa_service import DivisaService
+    original = DivisaService.precargar
+    fallos = []
+    def precargar_falla_una_vez(self, monedas):
+        if not fallos:
+            fallos.append(True)
+            raise RuntimeError("conexión perdida")
+        return original(self, monedas)
+    monkeypatch.setattr(DivisaService, "precargar", precargar_falla_una_vez)
+
+    with ColaAsientos(session_factory, max_lote=10, max_espera_ms=50) as cola:
+        primer_lote = [cola.enviar(_asiento(ejercicio_test.id, "3.00", "3.00")) for _ in range(2)]
+        for futuro in primer_lote:
+            with pytest.raises(RuntimeError, match="conexión perdida"):
+                futuro.result(timeout=5)
+        siguiente = cola.enviar(_asiento(ejercicio_test.id, "3.00", "3.00"))
+        assert siguiente.result(timeout=5).numero == 1
+
+def test_escritor_caido_cierra_la_cola(ejercicio_test):
+    def sin_sesion():
+        raise RuntimeError("base de datos no disponible")
+
+    cola = ColaAsientos(sin_sesion)
+    cola._escritor.join(timeout=5)
+    with pytest.raises(RuntimeError, match="cerrada"):
+        cola.enviar(_asiento(ejercicio_test.id, "1.00", "1.00"))
+    cola.cerrar()
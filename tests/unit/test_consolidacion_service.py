@@ -0,0 +1,120 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+
+from app.models.empresa import Empresa
+from app.models.ejercicio import EjercicioFiscal
+from app.models.tercero import Tercero
+from app.schemas.asiento import FacturaCreate
+from app.services.asiento_service import AsientoService
+from app.services.consolidacion_service import ConsolidacionService, invalidar_cache_consolidacion
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    # Todos los tests comparten engine y reutilizan ids tras el rollback: ni la
+    # base de datos ni la versión distinguen sus datos
+    invalidar_cache_consolidacion()
+    yield
+    invalidar_cache_consolidacion()
+
+@pytest.fixture
+def grupo(db_session, empresa_test, ejercicio_test, cuentas_test, tercero_test):
+    """Empresa A (empresa_test) vende a su filial B; A vende también a un cliente externo."""
+    filial = Empresa(cif="B87654321", nombre="Filial S.L.")
+    db_session.add(filial)
+    db_session.flush()
+    ejercicio_filial = EjercicioFiscal(
+        empresa_id=filial.id, fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 12, 31), estado=True
+    )
+    cliente_filial = Tercero(nif=filial.cif, nombre=filial.nombre, cuenta_contable_id=cuentas_test["430"].id)
+    proveedor_matriz = Tercero(nif=empresa_test.cif, nombre=empresa_test.nombre, cuenta_contable_id=cuentas_test["400"].id)
+    db_session.add_all([ejercicio_filial, cliente_filial, proveedor_matriz])
+    db_session.commit()
+
+    service = AsientoService(db_session)
+    service.crear_asiento_factura(_factura(ejercicio_test.id, cliente_filial.id, "100.00", es_gasto=False))
+    service.crear_asiento_factura(_factura(ejercicio_filial.id, proveedor_matriz.id, "100.00", es_gasto=True))
+    service.crear_asiento_factura(_factura(ejercicio_test.id, tercero_test.id, "50.00", es_gasto=False))
+    return empresa_test, filial, ejercicio_filial, proveedor_matriz
+
+def _factura(ejercicio_id: int, tercero_id: int, base: str, es_gasto: bool, fecha: date = date(2024, 3, 1)) -> FacturaCreate:
+    return FacturaCreate(
+        fecha=fecha,
+        concepto="Factura",
+        ejercicio_id=ejercicio_id,
+        tercero_id=tercero_id,
+        base_imponible=Decimal(base),
+        tipo_iva=21,
+        cuenta_ingreso_gasto="600" if es_gasto else "700",
+        cuenta_tercero="400" if es_gasto else "430",
+        es_gasto=es_gasto
+    )
+
+def test_elimina_saldos_intragrupo(db_session, grupo):
+    matriz, filial, _, _ = grupo
+
+    balance = ConsolidacionService(db_session).balance_consolidado([matriz.id, filial.id], date(2024, 12, 31))
+
+    assert balance.agregado["430"] == Decimal("181.50")
+    assert balance.eliminaciones == {
+        "400": Decimal("-121.00"),
+        "430": Decimal("121.00"),
+        "600": Decimal("100.00"),
+        "700": Decimal("-100.00"),
+    }
+    assert balance.descuadre_intragrupo == Decimal("0.00")
+    # Los saldos con Hacienda (472/477) no se eliminan
+    assert balance.consolidado == {
+        "430": Decimal("60.50"),
+        "472": Decimal("21.00"),
+        "477": Decimal("-31.50"),
+        "700": Decimal("-50.00"),
+    }
+
+def test_recalcula_solo_la_empresa_con_asientos_nuevos(db_session, grupo):
+    matriz, filial, ejercicio_filial, proveedor_matriz = grupo
+    service = ConsolidacionService(db_session)
+
+    assert service.balance_consolidado([matriz.id, filial.id], date(2024, 12, 31)).recalculadas == [matriz.id, filial.id]
+    assert service.balance_consolidado([matriz.id, filial.id], date(2024, 12, 31)).recalculadas == []
+
+    AsientoService(db_session).crear_asiento_factura(
+        _factura(ejercicio_filial.id, proveedor_matriz.id, "10.00", es_gasto=True, fecha=date(2024, 4, 1))
+    )
+    balance = service.balance_consolidado([matriz.id, filial.id], date(2024, 12, 31))
+    assert balance.recalculadas == [filial.id]
+    # La compra no tiene venta recíproca en la matriz: la eliminación descuadra
+    assert balance.descuadre_intragrupo == Decimal("-2.10")
+
+def test_mapeo_al_cuadro_comun(db_session, grupo):
+    matriz, filial, _, _ = grupo
+    filial.configuracion = {"mapeo_consolidacion": {"6": "6000"}}
+    db_session.commit()
+
+    balance = ConsolidacionService(db_session).balance_consolidado([matriz.id, filial.id], date(2024, 12, 31))
+
+    assert "600" not in balance.agregado
+    assert balance.eliminaciones["6000"] == Decimal("100.00")
+
+def test_estados_consolidados(db_session, grupo):
+    matriz, filial, _, _ = grupo
+
+    balance, pyg = ConsolidacionService(db_session).estados_consolidados([matriz.id, filial.id], date(2024, 12, 31))
+
+    assert pyg.linea("1").importe == Decimal("50.00")
+    assert pyg.linea("4").importe == Decimal("0.00")
+    assert balance.linea("TA").importe == Decimal("81.50")
+
+def test_cobro_intragrupo_no_elimina_tesoreria(db_session, grupo, ejercicio_test):
+    """Solo se eliminan las cuentas recíprocas (4xx, 6xx, 7xx); la tesorería se mantiene."""
+    matriz, filial, _, _ = grupo
+    cliente_filial = db_session.query(Tercero).filter(Tercero.nif == filial.cif).one()
+    AsientoService(db_session)._registrar_asiento(date(2024, 4, 1), "Cobro filial", ejercicio_test.id, [
+        ("572", "Cobro", Decimal("121.00"), Decimal("0")),
+        ("430", "Cobro", Decimal("0"), Decimal("121.00")),
+    ], tercero_id=cliente_filial.id)
+
+    balance = ConsolidacionService(db_session).balance_consolidado([matriz.id, filial.id], date(2024, 12, 31))
+
+    assert "572" not in balance.eliminaciones
+    assert balance.consolidado["572"] == Decimal("121.00")
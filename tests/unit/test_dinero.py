@@ -0,0 +1,78 @@
+import random
+import pytest
+from decimal import Decimal
+from datetime import date
+from sqlalchemy import select, func
+
+from app.exceptions import ImporteFueraDeRangoError
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.utils.dinero import (
+    CENTIMOS_MAX_COLUMNA,
+    a_centimos,
+    centimos_sql,
+    desde_centimos,
+    sumar_centimos
+)
+
+def _importes_aleatorios(rng: random.Random, n: int) -> list:
+    """Importes válidos de Numeric(12,2), incluyendo extremos del rango."""
+    extremos = [Decimal("0.00"), Decimal("0.01"), Decimal("9999999999.99")]
+    return extremos + [
+        Decimal(rng.randint(0, CENTIMOS_MAX_COLUMNA)).scaleb(-2) for _ in range(n)
+    ]
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_ida_y_vuelta_exacta(semilla):
+    """Propiedad: desde_centimos(a_centimos(x)) == x para todo importe de Numeric(12,2)."""
+    rng = random.Random(semilla)
+    for importe in _importes_aleatorios(rng, 500):
+        assert desde_centimos(a_centimos(importe)) == importe
+        assert desde_centimos(a_centimos(-importe)) == -importe
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_suma_equivalente_a_decimal(semilla):
+    """Propiedad: la suma en céntimos coincide con la suma Decimal."""
+    rng = random.Random(semilla)
+    importes = _importes_aleatorios(rng, 1000)
+    assert desde_centimos(sumar_centimos(importes)) == sum(importes)
+
+def test_a_centimos_rechaza_mas_de_dos_decimales():
+    with pytest.raises(ValueError):
+        a_centimos(Decimal("1.005"))
+    # Ceros a la derecha no son decimales significativos
+    assert a_centimos(Decimal("1.500")) == 150
+
+def test_guardas_de_rango():
+    with pytest.raises(ImporteFueraDeRangoError):
+        a_centimos(Decimal("10000000000.00"))
+    with pytest.raises(ImporteFueraDeRangoError):
+        desde_centimos(2**63)
+
+def test_centimos_sql_equivale_a_decimal(db_session, ejercicio_test, cuentas_test):
+    """Propiedad: la agregación SQL en céntimos coincide con sumar los Decimal leídos."""
+    rng = random.Random(42)
+    asiento = Asiento(ejercicio_id=ejercicio_test.id, numero=1, fecha=date(2024, 1, 1), concepto="Prueba")
+    db_session.add(asiento)
+    db_session.flush()
+    importes = _importes_aleatorios(rng, 300)
+    db_session.add_all(
+        ApunteContable(
+            asiento_id=asiento.id,
+            ejercicio_id=asiento.ejercicio_id,
+            fecha=asiento.fecha,
+            numero=asiento.numero,
+            cuenta_id=cuentas_test["572"].id,
+            descripcion="x",
+            debe=importe,
+            haber=Decimal("0")
+        )
+        for importe in importes
+    )
+    db_session.flush()
+
+    total_sql = db_session.execute(
+        select(func.sum(centimos_sql(ApunteContable.debe)))
+    ).scalar()
+
+    assert desde_centimos(total_sql) == sum(importes)
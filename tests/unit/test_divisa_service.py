@@ -0,0 +1,133 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+from sqlalchemy import event, update
+
+from app.models.cuenta import CuentaContable
+from app.models.tipo_cambio import TipoCambio
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+from app.services.asiento_service import AsientoService
+from app.services.cadena_hash_service import CadenaHashService
+from app.services.divisa_service import DivisaService, invalidar_cache_tipos
+from app.exceptions import TipoCambioNoEncontradoError
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    # Todos los tests comparten engine y reutilizan ids tras el rollback: ni la
+    # base de datos ni la versión de la tabla distinguen sus datos
+    invalidar_cache_tipos()
+    yield
+    invalidar_cache_tipos()
+
+@pytest.fixture
+def tipos_usd(db_session):
+    service = DivisaService(db_session)
+    service.registrar_tipo("USD", date(2024, 1, 1), Decimal("1.10"))
+    service.registrar_tipo("USD", date(2024, 6, 1), Decimal("1.25"))
+    service.registrar_tipo("USD", date(2024, 12, 31), Decimal("1.00"))
+    return service
+
+@pytest.fixture
+def cuentas_diferencias(db_session):
+    db_session.add_all([
+        CuentaContable(codigo="668", descripcion="Diferencias negativas de cambio"),
+        CuentaContable(codigo="768", descripcion="Diferencias positivas de cambio"),
+    ])
+    db_session.commit()
+
+def _compra_usd(ejercicio_id: int, fecha: date, usd: str) -> AsientoCreate:
+    return AsientoCreate(
+        fecha=fecha,
+        concepto="Factura proveedor USD",
+        ejercicio_id=ejercicio_id,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="600", descripcion="Compra", moneda="USD", importe_divisa=Decimal(usd)),
+            ApunteCreate(cuenta_codigo="400", descripcion="Proveedor", moneda="USD", importe_divisa=-Decimal(usd)),
+        ]
+    )
+
+def test_tipo_vigente_por_fecha(tipos_usd):
+    assert tipos_usd.tipo_cambio("USD", date(2024, 5, 31)) == Decimal("1.10")
+    assert tipos_usd.tipo_cambio("USD", date(2024, 6, 1)) == Decimal("1.25")
+    assert tipos_usd.tipo_cambio("EUR", date(2024, 6, 1)) == Decimal(1)
+    with pytest.raises(TipoCambioNoEncontradoError):
+        tipos_usd.tipo_cambio("USD", date(2023, 12, 31))
+    with pytest.raises(TipoCambioNoEncontradoError):
+        tipos_usd.tipo_cambio("GBP", date(2024, 6, 1))
+
+def test_correccion_externa_invalida_la_cache(db_session, tipos_usd):
+    assert tipos_usd.tipo_cambio("USD", date(2024, 6, 1)) == Decimal("1.25")
+    # Corrección hecha por otro proceso: no pasa por registrar_tipo ni cambia
+    # el número de filas ni el id máximo, solo la revisión
+    db_session.execute(
+        update(TipoCambio)
+        .where(TipoCambio.moneda == "USD", TipoCambio.fecha == date(2024, 6, 1))
+        .values(tipo=Decimal("1.30"))
+    )
+    tipos_usd.precargar(["USD"])
+    assert tipos_usd.tipo_cambio("USD", date(2024, 6, 1)) == Decimal("1.30")
+
+def test_moneda_requiere_importe_divisa():
+    with pytest.raises(ValueError):
+        ApunteCreate(cuenta_codigo="400", descripcion="Proveedor", moneda="USD")
+
+def test_crear_asiento_en_divisa(db_session, ejercicio_test, cuentas_test, tipos_usd):
+    asiento = AsientoService(db_session).crear_asiento(_compra_usd(ejercicio_test.id, date(2024, 3, 1), "1100.00"))
+
+    importes = {(a.cuenta.codigo, a.debe, a.haber, a.moneda, a.importe_divisa) for a in asiento.apuntes}
+    assert importes == {
+        ("600", Decimal("1000.00"), Decimal("0"), "USD", Decimal("1100.00")),
+        ("400", Decimal("0"), Decimal("1000.00"), "USD", Decimal("-1100.00")),
+    }
+    assert CadenaHashService(db_session).verificar(ejercicio_test.id).valido
+
+def test_redondeo_se_ajusta_en_el_mayor_apunte(db_session, ejercicio_test, cuentas_test):
+    service = DivisaService(db_session)
+    service.registrar_tipo("GBP", date(2024, 1, 1), Decimal("3"))
+    datos = AsientoCreate(
+        fecha=date(2024, 2, 1),
+        concepto="Compra GBP",
+        ejercicio_id=ejercicio_test.id,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="600", descripcion="Compra", moneda="GBP", importe_divisa=Decimal("100")),
+            ApunteCreate(cuenta_codigo="472", descripcion="IVA", moneda="GBP", importe_divisa=Decimal("100")),
+            ApunteCreate(cuenta_codigo="400", descripcion="Proveedor", moneda="GBP", importe_divisa=Decimal("-200")),
+        ]
+    )
+    convertido = service.convertir_asientos([datos])[0]
+    assert [(a.debe, a.haber) for a in convertido.apuntes] == [
+        (Decimal("33.33"), Decimal("0")),
+        (Decimal("33.33"), Decimal("0")),
+        (Decimal("0"), Decimal("66.66")),
+    ]
+
+def test_conversion_en_lote_sin_consulta_por_apunte(db_session, ejercicio_test, tipos_usd):
+    lote = [_compra_usd(ejercicio_test.id, date(2024, 1 + i % 12, 1), "10.00") for i in range(50)]
+    consultas = []
+    engine = db_session.get_bind().engine
+    contar = lambda *args: consultas.append(args[2])
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        convertidos = DivisaService(db_session).convertir_asientos(lote)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+
+    assert len(consultas) <= 2  # versión de la tabla + carga de la serie USD
+    assert convertidos[0].apuntes[0].debe == Decimal("9.09")
+    assert convertidos[5].apuntes[0].debe == Decimal("8.00")
+
+def test_revalorizacion_de_saldos_en_divisa(db_session, ejercicio_test, cuentas_test, cuentas_diferencias, tipos_usd):
+    AsientoService(db_session).crear_asiento(_compra_usd(ejercicio_test.id, date(2024, 3, 1), "1100.00"))
+
+    asiento = tipos_usd.revalorizar(ejercicio_test.id, date(2024, 12, 31))
+
+    # Proveedor de 1.100 USD: 1.000 EUR al tipo 1,10 y 1.100 EUR al cierre (tipo 1,00).
+    # El gasto (600) no es partida monetaria y queda al tipo histórico.
+    importes = {(a.cuenta.codigo, a.debe, a.haber) for a in asiento.apuntes}
+    assert importes == {
+        ("400", Decimal("0"), Decimal("100.00")),
+        ("668", Decimal("100.00"), Decimal("0")),
+    }
+    # Una segunda revalorización a la misma fecha no encuentra diferencias
+    assert tipos_usd.revalorizar(ejercicio_test.id, date(2024, 12, 31)) is None
+    assert CadenaHashService(db_session).verificar(ejercicio_test.id).valido
@@ -0,0 +1,49 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+
+from app.exceptions import EjercicioCerradoError
+from app.services.asiento_service import AsientoService
+from app.services.ejercicio_service import EjercicioService
+from app.services.cadena_hash_service import CadenaHashService
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+
+def _asiento(ejercicio_id: int, fecha: date) -> AsientoCreate:
+    return AsientoCreate(
+        fecha=fecha,
+        concepto=f"Asiento {fecha}",
+        ejercicio_id=ejercicio_id,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="572", descripcion="Cobro", debe=Decimal("10.00"), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal("10.00")),
+        ]
+    )
+
+def test_renumerar_asientos_por_fecha(db_session, ejercicio_test, cuentas_test):
+    """
+    Los asientos retroactivos se renumeran en orden cronológico (fecha, id).
+    Caso: se registran 15/03, 01/02, 15/03 y 10/01 -> quedan 3, 2, 4, 1.
+    """
+    service = AsientoService(db_session)
+    fechas = [date(2024, 3, 15), date(2024, 2, 1), date(2024, 3, 15), date(2024, 1, 10)]
+    asientos = [service.crear_asiento(_asiento(ejercicio_test.id, f)) for f in fechas]
+    assert [a.numero for a in asientos] == [1, 2, 3, 4]
+
+    renumerados = EjercicioService(db_session).renumerar_asientos(ejercicio_test.id)
+
+    assert renumerados == 3
+    assert [a.numero for a in asientos] == [3, 2, 4, 1]
+    # La cadena de hashes no depende del número de asiento
+    assert CadenaHashService(db_session).verificar(ejercicio_test.id).valido
+
+def test_cerrar_ejercicio(db_session, ejercicio_test, cuentas_test):
+    service = AsientoService(db_session)
+    service.crear_asiento(_asiento(ejercicio_test.id, date(2024, 5, 1)))
+    antiguo = service.crear_asiento(_asiento(ejercicio_test.id, date(2024, 4, 1)))
+
+    ejercicio = EjercicioService(db_session).cerrar_ejercicio(ejercicio_test.id)
+
+    assert ejercicio.estado is False
+    assert antiguo.numero == 1
+    with pytest.raises(EjercicioCerradoError):
+        EjercicioService(db_session).cerrar_ejercicio(ejercicio_test.id)
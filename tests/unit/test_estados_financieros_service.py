@@ -0,0 +1,119 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.cuenta import CuentaContable
+from app.models.ejercicio import EjercicioFiscal
+from app.services.asiento_service import AsientoService
+from app.services.estados_financieros_service import EstadosFinancierosService, invalidar_cache_mapeo
+from app.schemas.asiento import AsientoCreate, ApunteCreate, FacturaCreate
+from app.utils.trie_prefijos import TriePrefijos
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    # Todos los tests comparten engine y reutilizan ids tras el rollback: ni la
+    # base de datos ni la versión del cuadro distinguen sus datos
+    invalidar_cache_mapeo()
+
+def _factura(ejercicio_id: int, tercero_id: int, base: str, es_gasto: bool) -> FacturaCreate:
+    return FacturaCreate(
+        fecha=date(2024, 3, 1),
+        concepto="Factura",
+        ejercicio_id=ejercicio_id,
+        tercero_id=tercero_id,
+        base_imponible=Decimal(base),
+        tipo_iva=21,
+        cuenta_ingreso_gasto="600" if es_gasto else "700",
+        cuenta_tercero="400" if es_gasto else "430",
+        es_gasto=es_gasto
+    )
+
+def _constitucion(ejercicio_id: int, fecha: date, importe: str) -> AsientoCreate:
+    return AsientoCreate(
+        fecha=fecha,
+        concepto="Constitución",
+        ejercicio_id=ejercicio_id,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="572", descripcion="Aportación", debe=Decimal(importe), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="100", descripcion="Capital", debe=Decimal("0"), haber=Decimal(importe)),
+        ]
+    )
+
+def test_trie_prefijo_mas_largo():
+    trie = TriePrefijos([("54", "inversiones"), ("544", "deudores"), ("5", "grupo")])
+    assert trie.buscar("5440001") == "deudores"
+    assert trie.buscar("5410") == "inversiones"
+    assert trie.buscar("57") == "grupo"
+    assert trie.buscar("6") is None
+
+def test_balance_y_pyg(db_session, ejercicio_test, cuentas_test, tercero_test):
+    """
+    Caso: constitución 3000, venta 100 + IVA 21 y compra 50 + IVA 10,50.
+    Resultado 50; el balance cuadra en 3131,50.
+    """
+    service = AsientoService(db_session)
+    service.crear_asiento(_constitucion(ejercicio_test.id, date(2024, 1, 1), "3000.00"))
+    service.crear_asiento_factura(_factura(ejercicio_test.id, tercero_test.id, "100.00", es_gasto=False))
+    service.crear_asiento_factura(_factura(ejercicio_test.id, tercero_test.id, "50.00", es_gasto=True))
+
+    estados = EstadosFinancierosService(db_session).generar(ejercicio_test.id)
+
+    pyg = estados.perdidas_ganancias
+    assert pyg.linea("1").importe == Decimal("100.00")
+    assert pyg.linea("4").importe == Decimal("-50.00")
+    assert pyg.linea("A.4").importe == Decimal("50.00")
+
+    balance = estados.balance
+    assert balance.linea("B.V").importe == Decimal("3000.00")
+    assert balance.linea("B.II").importe == Decimal("131.50")
+    assert balance.linea("PN.1.R").importe == Decimal("50.00")
+    assert balance.linea("PC.III").importe == Decimal("81.50")
+    assert balance.linea("TA").importe == balance.linea("TPN").importe == Decimal("3131.50")
+    assert estados.ejercicio_anterior_id is None
+    assert balance.linea("TA").importe_anterior is None
+
+def test_columna_comparativa(db_session, ejercicio_test, cuentas_test):
+    siguiente = EjercicioFiscal(
+        empresa_id=ejercicio_test.empresa_id,
+        fecha_inicio=date(2025, 1, 1),
+        fecha_fin=date(2025, 12, 31),
+        estado=True
+    )
+    db_session.add(siguiente)
+    db_session.commit()
+    service = AsientoService(db_session)
+    service.crear_asiento(_constitucion(ejercicio_test.id, date(2024, 1, 1), "3000.00"))
+    service.crear_asiento(_constitucion(siguiente.id, date(2025, 1, 1), "4500.00"))
+
+    estados = EstadosFinancierosService(db_session).generar(siguiente.id)
+
+    assert estados.ejercicio_anterior_id == ejercicio_test.id
+    efectivo = estados.balance.linea("B.V")
+    assert (efectivo.importe, efectivo.importe_anterior) == (Decimal("4500.00"), Decimal("3000.00"))
+
+def test_recodificar_cuenta_invalida_el_mapeo(db_session, cuentas_test):
+    service = EstadosFinancierosService(db_session)
+    assert service._mapeo_cuentas()[cuentas_test["600"].id] == ("PN.1.R", "4")
+    # Mismo recuento e id máximo: solo cambia la revisión de la cuenta
+    db_session.execute(
+        update(CuentaContable).where(CuentaContable.codigo == "600").values(codigo="705")
+    )
+    assert service._mapeo_cuentas()[cuentas_test["600"].id] == ("PN.1.R", "1")
+
+def test_cache_de_mapeo_por_base_de_datos():
+    """Dos bases de datos con la misma versión del cuadro (recuento, id máximo) no comparten mapeo."""
+    engines = [create_engine("sqlite:///:memory:") for _ in range(2)]
+    mapeos = []
+    for engine, codigo in zip(engines, ("572", "700")):
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add(CuentaContable(codigo=codigo, descripcion=codigo))
+            db.commit()
+            mapeos.append(EstadosFinancierosService(db)._mapeo_cuentas())
+    for engine in engines:
+        engine.dispose()
+    assert mapeos[0] != mapeos[1]
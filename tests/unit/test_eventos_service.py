@@ -0,0 +1,106 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+
+from app.models.evento_contable import EventoContable
+from app.schemas.asiento import AsientoCreate, ApunteCreate, FacturaCreate
+from app.services.asiento_service import AsientoService
+from app.services.ejercicio_service import EjercicioService
+from app.services.eventos_service import EventosService, ASIENTO_REGISTRADO, EJERCICIO_RENUMERADO
+from app.services.sumideros_eventos import SumideroFichero, SumideroSQLite
+from app.exceptions import AsientoDescuadradoError
+
+def _cobro(ejercicio_id: int, fecha: date, importe: str = "10.00", haber: str = None) -> AsientoCreate:
+    return AsientoCreate(
+        fecha=fecha,
+        concepto="Cobro",
+        ejercicio_id=ejercicio_id,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="572", descripcion="Banco", debe=Decimal(importe), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal(haber or importe)),
+        ]
+    )
+
+def test_eventos_en_la_transaccion_del_registro(db_session, ejercicio_test, cuentas_test, tercero_test):
+    service = AsientoService(db_session)
+    asiento = service.crear_asiento(_cobro(ejercicio_test.id, date(2024, 6, 2)))
+    with pytest.raises(AsientoDescuadradoError):
+        service.crear_asiento(_cobro(ejercicio_test.id, date(2024, 6, 2), "10.00", haber="9.00"))
+    factura = service.crear_asiento_factura(FacturaCreate(
+        fecha=date(2024, 6, 3), concepto="Factura 1", ejercicio_id=ejercicio_test.id, tercero_id=tercero_test.id,
+        base_imponible=Decimal("100"), tipo_iva=21, cuenta_ingreso_gasto="700", cuenta_tercero="430", es_gasto=False
+    ))
+    registrado = service.registrar_asiento(_cobro(ejercicio_test.id, date(2024, 6, 1)))
+    # Fecha retroactiva: la renumeración también se publica
+    EjercicioService(db_session).renumerar_asientos(ejercicio_test.id)
+
+    eventos = EventosService(db_session).leer()
+
+    assert [(e.tipo, e.asiento_id) for e in eventos] == [
+        (ASIENTO_REGISTRADO, asiento.id),
+        (ASIENTO_REGISTRADO, factura.id),
+        (ASIENTO_REGISTRADO, registrado.id),
+        (EJERCICIO_RENUMERADO, None),
+    ]
+    assert [e.secuencia for e in eventos] == sorted(e.secuencia for e in eventos)
+    carga = eventos[1].carga
+    # Número en el momento del registro (la renumeración se publica aparte)
+    assert carga["numero"] == 2 and carga["tercero_id"] == tercero_test.id
+    assert [(a["cuenta_codigo"], a["debe"], a["haber"]) for a in carga["apuntes"]] == [
+        ("430", "121.00", "0.00"), ("700", "0.00", "100.00"), ("477", "0.00", "21.00")
+    ]
+    assert eventos[3].carga == {"ejercicio_id": ejercicio_test.id, "renumerados": 3}
+    assert EventosService(db_session).leer(eventos[1].cursor, limite=1)[0].asiento_id == registrado.id
+
+def test_lectura_en_orden_de_transaccion(db_session, ejercicio_test):
+    # En PostgreSQL una transacción lenta puede confirmar un id menor que otro
+    # ya leído: el cursor (transacción, id) la deja por delante de lo leído
+    db_session.add_all([
+        EventoContable(tipo=ASIENTO_REGISTRADO, ejercicio_id=ejercicio_test.id, asiento_id=1, carga={}, transaccion=101),
+        EventoContable(tipo=ASIENTO_REGISTRADO, ejercicio_id=ejercicio_test.id, asiento_id=2, carga={}, transaccion=100),
+    ])
+    db_session.commit()
+    service = EventosService(db_session)
+
+    eventos = service.leer()
+
+    assert [(e.asiento_id, e.transaccion) for e in eventos] == [(2, 100), (1, 101)]
+    assert service.leer(eventos[0].cursor)[0].asiento_id == 1
+    assert service.leer(eventos[1].cursor) == []
+
+@pytest.mark.parametrize("tipo_sumidero", ["fichero", "sqlite"])
+def test_sincronizacion_incremental(db_session, ejercicio_test, cuentas_test, tmp_path, tipo_sumidero):
+    def abrir():
+        if tipo_sumidero == "fichero":
+            return SumideroFichero(tmp_path / "eventos.jsonl")
+        return SumideroSQLite(tmp_path / "eventos.db")
+
+    asientos = AsientoService(db_session)
+    eventos = EventosService(db_session)
+    for dia in (1, 2, 3):
+        asientos.crear_asiento(_cobro(ejercicio_test.id, date(2024, 7, dia)))
+
+    assert eventos.sincronizar(abrir(), limite=2) == 3
+    ultima = abrir().ultimo_cursor()
+    assert eventos.purgar(ultima) == 3
+
+    # Tras purgar, las secuencias siguen creciendo y el destino continúa donde lo dejó
+    nuevo = asientos.crear_asiento(_cobro(ejercicio_test.id, date(2024, 7, 4)))
+    sumidero = abrir()
+    assert eventos.sincronizar(sumidero) == 1
+    assert eventos.sincronizar(sumidero) == 0
+    assert sumidero.ultimo_cursor() > ultima
+    assert eventos.leer(ultima)[0].asiento_id == nuevo.id
+
+def test_sumidero_fichero_descarta_linea_cortada(db_session, ejercicio_test, cuentas_test, tmp_path):
+    AsientoService(db_session).crear_asiento(_cobro(ejercicio_test.id, date(2024, 8, 1)))
+    ruta = tmp_path / "eventos.jsonl"
+    EventosService(db_session).sincronizar(SumideroFichero(ruta))
+    completo = ruta.read_text(encoding="utf-8")
+    with open(ruta, "a", encoding="utf-8") as fichero:
+        fichero.write('{"secuencia": 99, "tipo": "asiento_reg')
+
+    sumidero = SumideroFichero(ruta)
+
+    assert ruta.read_text(encoding="utf-8") == completo
+    assert sumidero.ultimo_cursor() == EventosService(db_session).leer()[-1].cursor
@@ -0,0 +1,104 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+from sqlalchemy import select, func
+
+from app.exceptions import ClaveIdempotenciaReutilizadaError
+from app.models.asiento import Asiento
+from app.services.asiento_service import AsientoService
+from app.schemas.asiento import AsientoCreate, ApunteCreate, FacturaCreate, clave_idempotencia_de
+
+def _asiento(ejercicio_id: int, importe: str, clave: str = None) -> AsientoCreate:
+    return AsientoCreate(
+        fecha=date(2024, 7, 1),
+        concepto="Cobro",
+        ejercicio_id=ejercicio_id,
+        clave_idempotencia=clave,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="572", descripcion="Banco", debe=Decimal(importe), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal(importe)),
+        ]
+    )
+
+def _factura(ejercicio_id: int, tercero_id: int, base: str = "100.00") -> FacturaCreate:
+    return FacturaCreate(
+        fecha=date(2024, 2, 1),
+        concepto="Factura Venta Nº 7",
+        ejercicio_id=ejercicio_id,
+        tercero_id=tercero_id,
+        base_imponible=Decimal(base),
+        tipo_iva=21,
+        cuenta_ingreso_gasto="700",
+        cuenta_tercero="430",
+        es_gasto=False
+    )
+
+def _num_asientos(db_session) -> int:
+    return db_session.execute(select(func.count(Asiento.id))).scalar()
+
+def test_reintento_con_clave_devuelve_el_original(db_session, ejercicio_test, cuentas_test):
+    service = AsientoService(db_session)
+
+    original = service.crear_asiento(_asiento(ejercicio_test.id, "10.00", clave="pedido-123"))
+    reintento = service.crear_asiento(_asiento(ejercicio_test.id, "10.00", clave="pedido-123"))
+    otro = service.crear_asiento(_asiento(ejercicio_test.id, "10.00"))
+
+    assert reintento.id == original.id
+    assert otro.id != original.id
+    assert _num_asientos(db_session) == 2
+
+def test_factura_reintentada_con_clave_no_se_duplica(db_session, ejercicio_test, cuentas_test, tercero_test):
+    service = AsientoService(db_session)
+    factura = _factura(ejercicio_test.id, tercero_test.id).model_copy(update={"clave_idempotencia": "fv-7"})
+
+    original = service.crear_asiento_factura(factura)
+    reintento = service.crear_asiento_factura(factura)
+
+    assert reintento.id == original.id
+    assert original.clave_idempotencia == "fv-7"
+    assert _num_asientos(db_session) == 1
+
+def test_facturas_identicas_sin_clave_son_dos_asientos(db_session, ejercicio_test, cuentas_test, tercero_test):
+    """Sin clave no se deduplica por contenido: dos facturas reales pueden coincidir."""
+    service = AsientoService(db_session)
+
+    primera = service.crear_asiento_factura(_factura(ejercicio_test.id, tercero_test.id))
+    segunda = service.crear_asiento_factura(_factura(ejercicio_test.id, tercero_test.id))
+
+    assert segunda.id != primera.id
+    assert primera.clave_idempotencia is None
+    assert _num_asientos(db_session) == 2
+
+def test_clave_reutilizada_con_otro_contenido_falla(db_session, ejercicio_test, cuentas_test, tercero_test):
+    service = AsientoService(db_session)
+    service.crear_asiento(_asiento(ejercicio_test.id, "10.00", clave="pedido-123"))
+
+    with pytest.raises(ClaveIdempotenciaReutilizadaError):
+        service.crear_asiento(_asiento(ejercicio_test.id, "11.00", clave="pedido-123"))
+    with pytest.raises(ClaveIdempotenciaReutilizadaError):
+        service.registrar_asiento(_asiento(ejercicio_test.id, "11.00", clave="pedido-123"))
+    factura = _factura(ejercicio_test.id, tercero_test.id).model_copy(update={"clave_idempotencia": "pedido-123"})
+    with pytest.raises(ClaveIdempotenciaReutilizadaError):
+        service.crear_asiento_factura(factura)
+    assert _num_asientos(db_session) == 1
+
+def test_clave_de_payload_normaliza_importes(ejercicio_test, tercero_test):
+    a = _factura(ejercicio_test.id, tercero_test.id, base="100.0")
+    b = _factura(ejercicio_test.id, tercero_test.id, base="100.00")
+    assert clave_idempotencia_de(a) == clave_idempotencia_de(b)
+
+def test_filtrar_duplicados_de_lote(db_session, ejercicio_test, cuentas_test):
+    service = AsientoService(db_session)
+    service.crear_asiento(_asiento(ejercicio_test.id, "1.00", clave="ya-registrado"))
+
+    lote = [
+        _asiento(ejercicio_test.id, "1.00", clave="ya-registrado"),
+        _asiento(ejercicio_test.id, "2.00"),
+        _asiento(ejercicio_test.id, "2.00"),  # repetido dentro del lote
+        _asiento(ejercicio_test.id, "3.00", clave="nuevo"),
+    ]
+    nuevos, duplicados = service.filtrar_duplicados(lote)
+
+    assert [a.apuntes[0].debe for a in nuevos] == [Decimal("2.00"), Decimal("3.00")]
+    assert len(duplicados) == 2
+    assert all(a.clave_idempotencia for a in nuevos)
@@ -0,0 +1,80 @@
+from decimal import Decimal
+from datetime import date
+from sqlalchemy import update, insert
+
+from app.models.asiento import Asiento
+from app.models.apunte import ApunteContable
+from app.models.ejercicio import EjercicioFiscal
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+from app.services.asiento_service import AsientoService
+from app.services.integridad_service import (
+    IntegridadService,
+    ASIENTO_DESCUADRADO,
+    ASIENTO_SIN_APUNTES,
+    APUNTE_HUERFANO,
+    FECHA_FUERA_DE_EJERCICIO,
+    NUMERO_DUPLICADO,
+    HUECO_NUMERACION,
+    IMPORTE_NEGATIVO,
+    EJERCICIOS_SOLAPADOS
+)
+
+def _crear(db_session, ejercicio_id: int, n: int):
+    service = AsientoService(db_session)
+    return [
+        service.crear_asiento(AsientoCreate(
+            fecha=date(2024, 5, 1),
+            concepto=f"Cobro {i}",
+            ejercicio_id=ejercicio_id,
+            apuntes=[
+                ApunteCreate(cuenta_codigo="572", descripcion="Banco", debe=Decimal("10.00"), haber=Decimal("0")),
+                ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal("10.00")),
+            ]
+        ))
+        for i in range(n)
+    ]
+
+def test_libro_correcto(db_session, ejercicio_test, cuentas_test):
+    _crear(db_session, ejercicio_test.id, 3)
+    resultado = IntegridadService(db_session).verificar()
+    assert resultado.valido
+    assert resultado.ejercicios_verificados == 1
+
+def test_detecta_incidencias(db_session, empresa_test, ejercicio_test, cuentas_test):
+    a1, a2, a3, a4, a5 = _crear(db_session, ejercicio_test.id, 5)
+    apunte = a1.apuntes[0]
+
+    # Alteraciones hechas por SQL directo, saltándose el servicio
+    db_session.execute(update(ApunteContable).where(ApunteContable.id == apunte.id).values(debe=Decimal("11.00")))
+    db_session.execute(update(ApunteContable).where(ApunteContable.asiento_id == a2.id).values(debe=0, haber=0))
+    db_session.execute(update(ApunteContable).where(ApunteContable.id == a5.apuntes[0].id).values(debe=Decimal("-10.00")))
+    db_session.execute(update(ApunteContable).where(ApunteContable.id == a5.apuntes[1].id).values(haber=Decimal("-10.00")))
+    db_session.execute(ApunteContable.__table__.delete().where(ApunteContable.asiento_id == a3.id))
+    db_session.execute(update(Asiento).where(Asiento.id == a4.id).values(fecha=date(2025, 1, 2), numero=2))
+    db_session.execute(update(Asiento).where(Asiento.id == a5.id).values(numero=9))
+    db_session.execute(insert(ApunteContable).values(
+        asiento_id=999999, ejercicio_id=ejercicio_test.id, fecha=date(2024, 1, 1), numero=1,
+        cuenta_id=cuentas_test["572"].id, descripcion="Huérfano", debe=1, haber=0
+    ))
+    db_session.add(EjercicioFiscal(
+        empresa_id=empresa_test.id, fecha_inicio=date(2024, 12, 1), fecha_fin=date(2025, 11, 30), estado=True
+    ))
+    db_session.commit()
+
+    resultado = IntegridadService(db_session).verificar()
+
+    incidencias = {(i.tipo, i.asiento_id) for i in resultado.incidencias}
+    assert (ASIENTO_DESCUADRADO, a1.id) in incidencias
+    assert (ASIENTO_SIN_APUNTES, a3.id) in incidencias
+    assert (FECHA_FUERA_DE_EJERCICIO, a4.id) in incidencias
+    assert (IMPORTE_NEGATIVO, a5.id) in incidencias
+    assert (APUNTE_HUERFANO, 999999) in incidencias
+    # a2 quedó con importes a cero pero cuadrado: no es incidencia
+    assert all(i.asiento_id != a2.id for i in resultado.incidencias)
+
+    detalles = {i.tipo: i.detalle for i in resultado.incidencias if i.asiento_id is None}
+    assert detalles[NUMERO_DUPLICADO] == "El número 2 está asignado a 2 asientos"
+    assert detalles[HUECO_NUMERACION] == "Faltan los números 4 a 8"
+    assert EJERCICIOS_SOLAPADOS in detalles
+    assert resultado.por_tipo()[ASIENTO_DESCUADRADO] == 1
+    assert not resultado.valido
@@ -0,0 +1,32 @@
+import sqlite3
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+RAIZ = Path(__file__).resolve().parents[2]
+
+def _config(ruta_bd: Path) -> Config:
+    # Sin alembic.ini: fileConfig reconfiguraría (y silenciaría) los loggers de la aplicación
+    config = Config()
+    config.set_main_option("script_location", str(RAIZ / "database" / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{ruta_bd}")
+    return config
+
+def _triggers(ruta_bd: Path) -> set:
+    with sqlite3.connect(ruta_bd) as conexion:
+        return {nombre for nombre, in conexion.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+def test_migraciones_suben_y_bajan_en_sqlite(tmp_path):
+    """La cadena completa se aplica y se deshace aunque existan los triggers de búsqueda."""
+    ruta_bd = tmp_path / "migraciones.db"
+    config = _config(ruta_bd)
+
+    command.upgrade(config, "head")
+    assert {"tr_busqueda_apuntes_ai", "tr_busqueda_asientos_au"} <= _triggers(ruta_bd)
+
+    command.downgrade(config, "base")
+    assert _triggers(ruta_bd) == set()
+
+    command.upgrade(config, "head")
+    assert {"tr_busqueda_apuntes_ai", "tr_busqueda_asientos_au"} <= _triggers(ruta_bd)
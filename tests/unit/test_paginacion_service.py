@@ -0,0 +1,92 @@
+import pytest
+from decimal import Decimal
+from datetime import date
+
+from app.models.tercero import Tercero
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+from app.services.asiento_service import AsientoService
+from app.services.ejercicio_service import EjercicioService
+from app.services.paginacion_service import PaginacionService
+from app.exceptions import CursorInvalidoError
+
+def _crear(db_session, ejercicio_id: int, fechas):
+    """Un asiento por fecha, con dos apuntes a Bancos y uno a Clientes."""
+    service = AsientoService(db_session)
+    for i, fecha in enumerate(fechas):
+        service.registrar_asiento(AsientoCreate(
+            fecha=fecha,
+            concepto=f"Cobro {i}",
+            ejercicio_id=ejercicio_id,
+            apuntes=[
+                ApunteCreate(cuenta_codigo="572", descripcion="Banco 1", debe=Decimal("6.00"), haber=Decimal("0")),
+                ApunteCreate(cuenta_codigo="572", descripcion="Banco 2", debe=Decimal("4.00"), haber=Decimal("0")),
+                ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal("10.00")),
+            ]
+        ))
+
+def _recorrer(listar):
+    """Recorre un listado hacia delante y devuelve (elementos, páginas)."""
+    elementos, paginas, cursor = [], [], None
+    while True:
+        pagina = listar(cursor)
+        paginas.append(pagina)
+        elementos.extend(pagina.elementos)
+        if pagina.siguiente is None:
+            return elementos, paginas
+        cursor = pagina.siguiente
+
+def test_asientos_en_orden_del_diario(db_session, ejercicio_test, cuentas_test):
+    # Registrados fuera de orden cronológico: el número no sigue a la fecha
+    fechas = [date(2024, 3, d) for d in (5, 1, 3, 1, 2, 5, 4)]
+    _crear(db_session, ejercicio_test.id, fechas)
+    service = PaginacionService(db_session)
+
+    asientos, paginas = _recorrer(lambda c: service.asientos(ejercicio_test.id, c, limite=3))
+
+    assert [len(p.elementos) for p in paginas] == [3, 3, 1]
+    assert [(a.fecha, a.numero) for a in asientos] == sorted((a.fecha, a.numero) for a in asientos)
+    assert len({a.id for a in asientos}) == len(fechas)
+    assert paginas[0].anterior is None
+
+    # Volver atrás desde la última página reproduce la página anterior
+    atras = service.asientos(ejercicio_test.id, paginas[-1].anterior, limite=3)
+    assert [a.id for a in atras.elementos] == [a.id for a in paginas[1].elementos]
+    assert atras.siguiente is not None and atras.anterior is not None
+
+def test_apuntes_cuenta_con_varios_apuntes_por_asiento(db_session, ejercicio_test, cuentas_test):
+    _crear(db_session, ejercicio_test.id, [date(2024, 4, 2), date(2024, 4, 1), date(2024, 4, 3)])
+    service = PaginacionService(db_session)
+
+    # Páginas de un elemento: el cursor debe separar apuntes del mismo asiento
+    lineas, _ = _recorrer(lambda c: service.apuntes_cuenta(ejercicio_test.id, "57", c, limite=1))
+
+    assert [(l.fecha.day, l.descripcion) for l in lineas] == [
+        (1, "Banco 1"), (1, "Banco 2"), (2, "Banco 1"), (2, "Banco 2"), (3, "Banco 1"), (3, "Banco 2")
+    ]
+    assert {l.cuenta_codigo for l in lineas} == {"572"}
+    assert sum(l.debe for l in lineas) == Decimal("30.00")
+
+def test_apuntes_cuenta_siguen_la_renumeracion(db_session, ejercicio_test, cuentas_test):
+    # El número copiado en los apuntes se actualiza al renumerar el ejercicio
+    _crear(db_session, ejercicio_test.id, [date(2024, 5, 3), date(2024, 5, 1), date(2024, 5, 2)])
+    EjercicioService(db_session).renumerar_asientos(ejercicio_test.id)
+
+    pagina = PaginacionService(db_session).apuntes_cuenta(ejercicio_test.id, "430")
+
+    assert [(l.fecha.day, l.numero) for l in pagina.elementos] == [(1, 1), (2, 2), (3, 3)]
+
+def test_terceros_y_cursores_invalidos(db_session, ejercicio_test, cuentas_test):
+    db_session.add_all([Tercero(nif=f"B{i:08d}", nombre=nombre) for i, nombre in enumerate(["Beta", "Alfa", "Beta", "Gamma"])])
+    db_session.commit()
+    service = PaginacionService(db_session)
+
+    terceros, _ = _recorrer(lambda c: service.terceros(c, limite=2))
+    assert [t.nombre for t in terceros] == ["Alfa", "Beta", "Beta", "Gamma"]
+
+    cursor_terceros = service.terceros(limite=1).siguiente
+    with pytest.raises(CursorInvalidoError):
+        service.asientos(ejercicio_test.id, cursor_terceros)
+    with pytest.raises(CursorInvalidoError):
+        service.terceros("no-es-un-cursor")
+    with pytest.raises(ValueError):
+        service.terceros(limite=0)
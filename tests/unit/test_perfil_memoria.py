@@ -0,0 +1,79 @@
+import logging
+import pytest
+from decimal import Decimal
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models.asiento import Asiento
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+from app.services.asiento_service import AsientoService
+from app.services.estados_financieros_service import EstadosFinancierosService
+from app.utils import perfil_memoria
+from app.utils.perfil_memoria import activar_perfil_memoria, perfil, marcar_etapa
+
+@pytest.fixture
+def perfil_activo():
+    activar_perfil_memoria()
+    yield
+    activar_perfil_memoria(False)
+
+def _crear(db_session, ejercicio_id: int, n: int):
+    service = AsientoService(db_session)
+    for i in range(n):
+        service.crear_asiento(AsientoCreate(
+            fecha=date(2024, 9, 1),
+            concepto=f"Venta {i}",
+            ejercicio_id=ejercicio_id,
+            apuntes=[
+                ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("5.00"), haber=Decimal("0")),
+                ApunteCreate(cuenta_codigo="700", descripcion="Venta", debe=Decimal("0"), haber=Decimal("5.00")),
+            ]
+        ))
+
+def test_desactivado_no_hace_nada(db_session, ejercicio_test, cuentas_test, monkeypatch):
+    def no_llamar(*_):
+        raise AssertionError("El perfil desactivado no debe tomar instantáneas")
+    monkeypatch.setattr(perfil_memoria._Perfil, "marcar", no_llamar)
+
+    with perfil("prueba", db_session) as informe:
+        marcar_etapa("etapa")
+    estados = EstadosFinancierosService(db_session).generar(ejercicio_test.id)
+
+    assert informe is None
+    assert estados.ejercicio_id == ejercicio_test.id
+
+def test_etapas_instancias_orm_e_identity_map(db_session, ejercicio_test, cuentas_test, perfil_activo):
+    _crear(db_session, ejercicio_test.id, 3)
+    ids = db_session.execute(select(Asiento.id)).scalars().all()
+    db_session.expunge_all()
+
+    with perfil("lectura del diario", db_session) as informe:
+        asientos = [db_session.get(Asiento, asiento_id) for asiento_id in ids]
+        marcar_etapa("asientos")
+        apuntes = [apunte for asiento in asientos for apunte in asiento.apuntes]
+        marcar_etapa("apuntes")
+
+    assert [etapa.nombre for etapa in informe.etapas] == ["inicio", "asientos", "apuntes", "fin"]
+    inicio, leidos, con_apuntes, _ = informe.etapas
+    assert leidos.instancias_orm["Asiento"] - inicio.instancias_orm.get("Asiento", 0) == 3
+    assert con_apuntes.instancias_orm["ApunteContable"] - leidos.instancias_orm.get("ApunteContable", 0) == len(apuntes)
+    assert con_apuntes.colecciones[0] >= 3 and con_apuntes.identity_map == leidos.identity_map + len(apuntes)
+    assert "[apuntes]" in informe.resumen() and "ApunteContable=" in informe.resumen()
+    # Cada apunte lleva dos importes Decimal (debe, haber) cargados desde la base de datos
+    assert con_apuntes.decimales - leidos.decimales >= 2 * len(apuntes)
+    assert "Decimal: " in informe.resumen()
+
+def test_entradas_perfiladas_se_anidan_y_registran_resumen(db_session, ejercicio_test, cuentas_test, perfil_activo, caplog):
+    _crear(db_session, ejercicio_test.id, 2)
+
+    with caplog.at_level(logging.INFO, logger=perfil_memoria.__name__):
+        with perfil("cierre anual", db_session) as informe:
+            EstadosFinancierosService(db_session).generar(ejercicio_test.id)
+
+    # La entrada decorada se anota dentro del perfil exterior, con sus etapas
+    nombres = [etapa.nombre for etapa in informe.etapas]
+    assert nombres[0] == "inicio" and nombres[-1] == "fin"
+    assert "estados_financieros: inicio" in nombres and "mapeo de cuentas" in nombres
+    assert len(caplog.records) == 1
+    assert caplog.records[0].getMessage().startswith("Perfil de memoria: cierre anual")
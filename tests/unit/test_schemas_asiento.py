@@ -0,0 +1,60 @@
+import json
+import pytest
+from decimal import Decimal
+from datetime import date
+from pydantic import ValidationError
+
+from app.schemas.asiento import AsientoCreate, FacturaCreate, validar_asientos, validar_asientos_json
+from app.services.asiento_service import AsientoService
+
+def _asiento_dict(importe: str = "50.00") -> dict:
+    return {
+        "fecha": "2024-03-01",
+        "concepto": "Cobro cliente",
+        "ejercicio_id": 1,
+        "apuntes": [
+            {"cuenta_codigo": "572", "descripcion": "Cobro", "debe": importe, "haber": "0"},
+            {"cuenta_codigo": "430", "descripcion": "Cliente", "debe": "0", "haber": importe},
+        ],
+    }
+
+def test_validar_asientos_en_bloque():
+    """La validación en bloque produce los mismos modelos que la validación individual."""
+    payload = [_asiento_dict(), _asiento_dict("12.34")]
+
+    asientos = validar_asientos(payload)
+
+    assert asientos == [AsientoCreate(**d) for d in payload]
+    assert asientos[1].apuntes[0].debe == Decimal("12.34")
+    assert asientos[0].fecha == date(2024, 3, 1)
+
+def test_validar_asientos_json():
+    payload = [_asiento_dict()]
+    assert validar_asientos_json(json.dumps(payload)) == validar_asientos(payload)
+
+def test_validar_asientos_rechaza_importe_invalido():
+    """Un importe negativo o con más de dos decimales se rechaza indicando el índice del asiento."""
+    payload = [_asiento_dict(), _asiento_dict("1.005")]
+
+    with pytest.raises(ValidationError) as excinfo:
+        validar_asientos(payload)
+
+    assert excinfo.value.errors()[0]["loc"][0] == 1
+
+def test_factura_concepto_largo_sigue_validando(db_session, ejercicio_test, cuentas_test, tercero_test):
+    """La ruta interna sin modelos mantiene el límite de longitud de la descripción."""
+    service = AsientoService(db_session)
+    datos_factura = FacturaCreate(
+        fecha=date(2024, 2, 1),
+        concepto="x" * 255,
+        ejercicio_id=ejercicio_test.id,
+        tercero_id=tercero_test.id,
+        base_imponible=Decimal("100.00"),
+        tipo_iva=21,
+        cuenta_ingreso_gasto="700",
+        cuenta_tercero="430",
+        es_gasto=False
+    )
+
+    with pytest.raises(ValidationError):
+        service.crear_asiento_factura(datos_factura)
@@ -0,0 +1,29 @@
+import sys
+import os
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import SessionLocal
+from app.services.archivo_service import ArchivoService, DIRECTORIO_ARCHIVO
+
+def archivar_ejercicio(ejercicio_id: int, directorio: str):
+    """Mueve un ejercicio cerrado al archivo en frío y lo elimina de las tablas vivas."""
+    db = SessionLocal()
+    try:
+        ruta = ArchivoService(db, directorio).archivar_ejercicio(ejercicio_id)
+        print(f"Ejercicio {ejercicio_id} archivado en {ruta} ({os.path.getsize(ruta)} bytes)")
+    except Exception as e:
+        print(f"Error archivando el ejercicio {ejercicio_id}: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archiva un ejercicio fiscal cerrado.")
+    parser.add_argument("ejercicio_id", type=int)
+    parser.add_argument("--directorio", default=str(DIRECTORIO_ARCHIVO))
+    args = parser.parse_args()
+    archivar_ejercicio(args.ejercicio_id, args.directorio)
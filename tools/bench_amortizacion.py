@@ -0,0 +1,75 @@
+import sys
+import os
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import Base
+from app.models import ActivoFijo, CuentaContable, Empresa, EjercicioFiscal
+from app.services.amortizacion_service import AmortizacionService, METODO_LINEAL, METODO_DIGITOS
+
+N_ACTIVOS = 20_000
+
+
+def _preparar(ruta: str) -> sessionmaker:
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    with SessionLocal() as db:
+        db.add(Empresa(cif="B00000000", nombre="Benchmark S.L."))
+        cuentas = [
+            CuentaContable(codigo="6811", descripcion="Amortización del inmovilizado material"),
+            CuentaContable(codigo="2811", descripcion="Amortización acumulada del inmovilizado material"),
+        ]
+        db.add_all(cuentas)
+        db.flush()
+        db.add(EjercicioFiscal(empresa_id=1, fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 12, 31)))
+        db.execute(insert(ActivoFijo), [
+            {
+                "empresa_id": 1,
+                "codigo": f"AF{i:06d}",
+                "descripcion": f"Activo {i}",
+                "cuenta_gasto_id": cuentas[0].id,
+                "cuenta_amortizacion_id": cuentas[1].id,
+                "fecha_alta": date(2023, 1 + i % 12, 1),
+                "valor_adquisicion": Decimal(1000 + i % 5000),
+                "valor_residual": Decimal(0),
+                "vida_util_meses": 60 + (i % 5) * 12,
+                "metodo": METODO_DIGITOS if i % 3 == 0 else METODO_LINEAL,
+                "amortizacion_acumulada": Decimal(0),
+            }
+            for i in range(N_ACTIVOS)
+        ])
+        db.commit()
+    return SessionLocal
+
+
+def bench_amortizacion():
+    with tempfile.TemporaryDirectory() as directorio:
+        for por_activo in (False, True):
+            SessionLocal = _preparar(os.path.join(directorio, f"amortizacion_{por_activo}.db"))
+            with SessionLocal() as db:
+                service = AmortizacionService(db)
+                inicio = time.perf_counter()
+                cuotas = service.calcular_cuotas(1, 2024, 1)
+                calculo = time.perf_counter() - inicio
+
+                inicio = time.perf_counter()
+                resultado = service.contabilizar_periodo(1, 2024, 1, por_activo=por_activo)
+                total = time.perf_counter() - inicio
+
+            modo = "un asiento por activo" if por_activo else "asiento agregado"
+            print(f"{N_ACTIVOS} activos, {modo}:")
+            print(f"  Cálculo de cuotas: {calculo:.3f} s ({len(cuotas)} cuotas)")
+            print(f"  Contabilización:   {total:.3f} s ({len(resultado.asientos)} asientos, total {resultado.total})")
+
+
+if __name__ == "__main__":
+    bench_amortizacion()
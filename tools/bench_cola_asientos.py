@@ -0,0 +1,76 @@
+import sys
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import Base
+from app.models import CuentaContable, Empresa, EjercicioFiscal
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+from app.services.asiento_service import AsientoService
+from app.services.cola_asientos import ColaAsientos
+
+N_ASIENTOS = 2_000
+CLIENTES = 8
+
+
+def _preparar(ruta: str) -> sessionmaker:
+    engine = create_engine(f"sqlite:///{ruta}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    with SessionLocal() as db:
+        db.add(Empresa(cif="B00000000", nombre="Benchmark S.L."))
+        db.add_all([CuentaContable(codigo="572", descripcion="Bancos"), CuentaContable(codigo="430", descripcion="Clientes")])
+        db.flush()
+        db.add(EjercicioFiscal(empresa_id=1, fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 12, 31)))
+        db.commit()
+    return SessionLocal
+
+
+def _asiento() -> AsientoCreate:
+    return AsientoCreate(
+        fecha=date(2024, 5, 1),
+        concepto="Cobro",
+        ejercicio_id=1,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="572", descripcion="Banco", debe=Decimal("10.00"), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("0"), haber=Decimal("10.00")),
+        ]
+    )
+
+
+def bench_cola_asientos():
+    datos = _asiento()
+    with tempfile.TemporaryDirectory() as directorio:
+        SessionLocal = _preparar(os.path.join(directorio, "secuencial.db"))
+        with SessionLocal() as db:
+            service = AsientoService(db)
+            inicio = time.perf_counter()
+            for _ in range(N_ASIENTOS):
+                service.crear_asiento(datos)
+            secuencial = time.perf_counter() - inicio
+
+        SessionLocal = _preparar(os.path.join(directorio, "cola.db"))
+        inicio = time.perf_counter()
+        with ColaAsientos(SessionLocal, max_lote=500, max_espera_ms=5) as cola:
+            with ThreadPoolExecutor(max_workers=CLIENTES) as clientes:
+                futuros = list(clientes.map(lambda _: cola.enviar(datos), range(N_ASIENTOS)))
+            for futuro in futuros:
+                futuro.result()
+        agrupado = time.perf_counter() - inicio
+
+    print(f"\n=== REGISTRO DE {N_ASIENTOS} ASIENTOS (SQLite en fichero) ===\n")
+    print(f"{'crear_asiento (un commit por asiento)':<45} {N_ASIENTOS / secuencial:>10.0f} asientos/s")
+    print(f"{f'ColaAsientos ({CLIENTES} clientes, commit por lote)':<45} {N_ASIENTOS / agrupado:>10.0f} asientos/s")
+
+
+if __name__ == "__main__":
+    bench_cola_asientos()
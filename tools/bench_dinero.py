@@ -0,0 +1,68 @@
+import sys
+import os
+import random
+import time
+from decimal import Decimal
+
+from sqlalchemy import create_engine, select, func
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.dinero import centimos_sql, desde_centimos, sumar_centimos
+
+N_APUNTES = 200_000
+
+
+def _medir(nombre: str, fn, repeticiones: int = 3):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = fn()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"{nombre:<45} {mejor * 1000:>10.2f} ms  -> {resultado}")
+    return resultado
+
+
+def bench_dinero():
+    rng = random.Random(0)
+    centimos = [rng.randint(0, 10**8) for _ in range(N_APUNTES)]
+    importes = [Decimal(c).scaleb(-2) for c in centimos]
+
+    print(f"\n=== AGREGACIÓN DE {N_APUNTES} IMPORTES ===\n")
+    a = _medir("sum(Decimal)", lambda: sum(importes))
+    b = _medir("sumar_centimos(Decimal) (con conversión)", lambda: desde_centimos(sumar_centimos(importes)))
+    c = _medir("sum(int) (céntimos ya disponibles)", lambda: desde_centimos(sum(centimos)))
+    assert a == b == c
+
+    # Lectura desde la base de datos: Decimal por fila frente a céntimos agregados
+    from app.database import Base
+    from app.models import ApunteContable
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            ApunteContable.__table__.insert(),
+            [
+                {"asiento_id": 1, "cuenta_id": 1, "descripcion": "x", "debe": importe, "haber": Decimal(0)}
+                for importe in importes
+            ]
+        )
+    with engine.connect() as conn:
+        d = _medir(
+            "SELECT debe + sum(Decimal)",
+            lambda: sum(conn.execute(select(ApunteContable.debe)).scalars())
+        )
+        e = _medir(
+            "SELECT debe en céntimos + sum(int)",
+            lambda: desde_centimos(sum(conn.execute(select(centimos_sql(ApunteContable.debe))).scalars()))
+        )
+        f = _medir(
+            "SUM en céntimos en SQL",
+            lambda: desde_centimos(conn.execute(select(func.sum(centimos_sql(ApunteContable.debe)))).scalar())
+        )
+    assert d == e == f == a
+
+
+if __name__ == "__main__":
+    bench_dinero()
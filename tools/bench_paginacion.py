@@ -0,0 +1,103 @@
+import sys
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import Base
+from app.models import Asiento, ApunteContable, CuentaContable, Empresa, EjercicioFiscal
+from app.services.paginacion_service import PaginacionService
+
+N_ASIENTOS = 200_000
+LIMITE = 50
+PAGINAS = (1, 100, 1_000, 3_999)
+
+
+def _preparar(ruta: str) -> sessionmaker:
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    with SessionLocal() as db:
+        db.add(Empresa(cif="B00000000", nombre="Benchmark S.L."))
+        db.add_all([
+            CuentaContable(codigo="430", descripcion="Clientes"),
+            CuentaContable(codigo="700", descripcion="Ventas"),
+        ])
+        db.flush()
+        db.add(EjercicioFiscal(empresa_id=1, fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 12, 31)))
+        asientos = [
+            {
+                "ejercicio_id": 1,
+                "numero": i + 1,
+                "fecha": date(2024, 1, 1) + timedelta(days=(i * 7919) % 366),
+                "concepto": f"Venta {i}",
+            }
+            for i in range(N_ASIENTOS)
+        ]
+        db.execute(insert(Asiento), asientos)
+        db.execute(insert(ApunteContable), [
+            {
+                "asiento_id": i + 1, "ejercicio_id": 1, "fecha": asiento["fecha"], "numero": asiento["numero"],
+                "cuenta_id": cuenta, "descripcion": "Venta", "debe": debe, "haber": haber
+            }
+            for i, asiento in enumerate(asientos)
+            for cuenta, debe, haber in ((1, Decimal("12.10"), Decimal(0)), (2, Decimal(0), Decimal("12.10")))
+        ])
+        db.commit()
+        # Estadísticas para el planificador, como en una base de datos en uso
+        db.execute(text("ANALYZE"))
+    return SessionLocal
+
+
+def _offset(db, pagina: int):
+    return db.execute(
+        select(Asiento)
+        .where(Asiento.ejercicio_id == 1)
+        .order_by(Asiento.fecha, Asiento.numero, Asiento.id)
+        .offset((pagina - 1) * LIMITE)
+        .limit(LIMITE)
+    ).scalars().all()
+
+
+def bench_paginacion():
+    with tempfile.TemporaryDirectory() as directorio:
+        SessionLocal = _preparar(os.path.join(directorio, "paginacion.db"))
+        with SessionLocal() as db:
+            service = PaginacionService(db)
+            # Cursores de las páginas a medir (el recorrido completo no se cronometra)
+            cursores, cursor = {1: None}, None
+            for pagina in range(2, max(PAGINAS) + 1):
+                cursor = service.asientos(1, cursor, LIMITE).siguiente
+                cursores[pagina] = cursor
+
+            print(f"{N_ASIENTOS} asientos, páginas de {LIMITE}:")
+            for pagina in PAGINAS:
+                db.expunge_all()
+                inicio = time.perf_counter()
+                _offset(db, pagina)
+                offset = time.perf_counter() - inicio
+
+                db.expunge_all()
+                inicio = time.perf_counter()
+                service.asientos(1, cursores[pagina], LIMITE)
+                keyset = time.perf_counter() - inicio
+                print(f"  Página {pagina:>5}: OFFSET {offset * 1000:7.2f} ms | clave {keyset * 1000:6.2f} ms")
+
+            ultimo = None
+            for _ in range(max(PAGINAS) - 1):
+                ultimo = service.apuntes_cuenta(1, "430", ultimo, LIMITE).siguiente
+            for pagina, cursor in ((1, None), (max(PAGINAS), ultimo)):
+                inicio = time.perf_counter()
+                service.apuntes_cuenta(1, "430", cursor, LIMITE)
+                print(f"  Mayor de 430, página {pagina:>5}: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    bench_paginacion()
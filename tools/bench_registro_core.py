@@ -0,0 +1,72 @@
+import sys
+import os
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import Base
+from app.models import CuentaContable, Empresa, EjercicioFiscal
+from app.schemas.asiento import AsientoCreate, ApunteCreate
+from app.services.asiento_service import AsientoService
+
+N_ASIENTOS = 2_000
+
+
+def _preparar(url: str) -> sessionmaker:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as db:
+        db.add(Empresa(cif="B00000000", nombre="Benchmark S.L."))
+        db.add_all([
+            CuentaContable(codigo="430", descripcion="Clientes"),
+            CuentaContable(codigo="700", descripcion="Ventas"),
+            CuentaContable(codigo="477", descripcion="H.P. IVA Repercutido"),
+        ])
+        db.flush()
+        db.add(EjercicioFiscal(empresa_id=1, fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 12, 31)))
+        db.commit()
+    return SessionLocal
+
+
+def _asiento() -> AsientoCreate:
+    return AsientoCreate(
+        fecha=date(2024, 5, 1),
+        concepto="Factura de venta",
+        ejercicio_id=1,
+        apuntes=[
+            ApunteCreate(cuenta_codigo="430", descripcion="Cliente", debe=Decimal("121.00"), haber=Decimal("0")),
+            ApunteCreate(cuenta_codigo="700", descripcion="Venta", debe=Decimal("0"), haber=Decimal("100.00")),
+            ApunteCreate(cuenta_codigo="477", descripcion="IVA 21%", debe=Decimal("0"), haber=Decimal("21.00")),
+        ]
+    )
+
+
+def _medir(SessionLocal: sessionmaker, ligero: bool) -> float:
+    datos = _asiento()
+    with SessionLocal() as db:
+        service = AsientoService(db)
+        registrar = service.registrar_asiento if ligero else service.crear_asiento
+        inicio = time.perf_counter()
+        for _ in range(N_ASIENTOS):
+            registrar(datos)
+        return time.perf_counter() - inicio
+
+
+def bench_registro_core():
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, ligero in (("crear_asiento (ORM)", False), ("registrar_asiento (Core)", True)):
+            SessionLocal = _preparar(f"sqlite:///{os.path.join(directorio, f'{ligero}.db')}")
+            tiempo = _medir(SessionLocal, ligero)
+            print(f"{nombre:<26} {N_ASIENTOS} asientos: {tiempo:.3f} s ({tiempo / N_ASIENTOS * 1e3:.3f} ms/asiento)")
+
+
+if __name__ == "__main__":
+    bench_registro_core()
@@ -0,0 +1,68 @@
+import sys
+import os
+import json
+import time
+from decimal import Decimal
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.schemas.asiento import (
+    AsientoCreate,
+    ApunteCreate,
+    validar_asientos,
+    validar_asientos_json
+)
+
+N_APUNTES = 10_000
+APUNTES_POR_ASIENTO = 2
+
+
+def _payload(n_asientos: int) -> list[dict]:
+    return [
+        {
+            "fecha": "2024-03-01",
+            "concepto": f"Asiento {i}",
+            "ejercicio_id": 1,
+            "apuntes": [
+                {"cuenta_codigo": "572", "descripcion": "Cobro", "debe": "100.00", "haber": "0"},
+                {"cuenta_codigo": "430", "descripcion": "Cliente", "debe": "0", "haber": "100.00"},
+            ],
+        }
+        for i in range(n_asientos)
+    ]
+
+
+def _medir(nombre: str, fn, repeticiones: int = 5) -> None:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"{nombre:<45} {mejor * 1000:>10.2f} ms / {N_APUNTES} apuntes")
+
+
+def bench_validacion():
+    n_asientos = N_APUNTES // APUNTES_POR_ASIENTO
+    payload = _payload(n_asientos)
+    payload_json = json.dumps(payload)
+    tuplas = [
+        ("572", "Cobro", Decimal("100.00"), Decimal("0")),
+        ("430", "Cliente", Decimal("0"), Decimal("100.00")),
+    ]
+
+    print("\n=== COSTE DE VALIDACIÓN ===\n")
+    _medir("Modelo a modelo (AsientoCreate(**d))", lambda: [AsientoCreate(**d) for d in payload])
+    _medir("En bloque (validar_asientos)", lambda: validar_asientos(payload))
+    _medir("En bloque desde JSON (validar_asientos_json)", lambda: validar_asientos_json(payload_json))
+    _medir(
+        "ApunteCreate validado (interno)",
+        lambda: [ApunteCreate(cuenta_codigo=c, descripcion=d, debe=de, haber=h)
+                 for _ in range(n_asientos) for c, d, de, h in tuplas]
+    )
+    # Ruta interna (crear_asiento_factura -> _registrar_asiento): los apuntes
+    # viajan como tuplas y no se construye ningún modelo.
+    _medir("Tuplas internas (sin modelos)", lambda: [list(tuplas) for _ in range(n_asientos)])
+
+if __name__ == "__main__":
+    bench_validacion()
@@ -0,0 +1,43 @@
+import sys
+import os
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import SessionLocal
+from app.services.eventos_service import EventosService
+from app.services.sumideros_eventos import SumideroFichero, SumideroSQLite
+
+def sincronizar_eventos(destino: str, purgar: bool):
+    """
+    Copia los eventos nuevos de la bandeja de salida a un fichero local.
+
+    Un destino .db/.sqlite se escribe como base de datos SQLite; cualquier
+    otro, como JSON Lines. Puede ejecutarse periódicamente: cada ejecución
+    continúa desde el último evento del destino.
+    """
+    if destino.endswith((".db", ".sqlite")):
+        sumidero = SumideroSQLite(destino)
+    else:
+        sumidero = SumideroFichero(destino)
+
+    db = SessionLocal()
+    try:
+        service = EventosService(db)
+        enviados = service.sincronizar(sumidero)
+        print(f"Eventos sincronizados: {enviados} (último cursor {sumidero.ultimo_cursor()})")
+        if purgar:
+            borrados = service.purgar(sumidero.ultimo_cursor())
+            print(f"Eventos purgados de la bandeja de salida: {borrados}")
+    finally:
+        db.close()
+        if isinstance(sumidero, SumideroSQLite):
+            sumidero.cerrar()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sincroniza la bandeja de salida de eventos contables con un fichero local.")
+    parser.add_argument("destino", help="Fichero JSON Lines o base de datos SQLite (.db, .sqlite)")
+    parser.add_argument("--purgar", action="store_true", help="Borrar de la bandeja los eventos ya sincronizados")
+    args = parser.parse_args()
+    sincronizar_eventos(args.destino, args.purgar)
@@ -2,39 +2,50 @@ import sys
 import os
 from decimal import Decimal
 
+from sqlalchemy import select, func
+
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.database import SessionLocal
-from app.models.asiento import Asiento
 from app.models.apunte import ApunteContable
 from app.models.cuenta import CuentaContable
+from app.models.ejercicio import EjercicioFiscal
+from app.services.archivo_service import saldos_archivados
+from app.services.libro_service import LibroService
+from app.utils.dinero import centimos_sql, desde_centimos
 
 def ver_diario():
     db = SessionLocal()
     try:
         print("\n=== LIBRO DIARIO ===\n")
-        asientos = db.query(Asiento).order_by(Asiento.fecha, Asiento.numero).all()
+        # Incluye los ejercicios archivados (LibroService une archivo y tablas vivas)
+        lineas = LibroService(db).diario()
         
         # Header
         print(f"{'FECHA':<12} {'Nº':<5} {'CUENTA':<12} {'DESCRIPCIÓN':<45} {'DEBE':>12} {'HABER':>12}")
         print("=" * 105)
         
-        for asiento in asientos:
-            first_line = True
-            for apunte in asiento.apuntes:
-                fecha_str = str(asiento.fecha) if first_line else ""
-                numero_str = str(asiento.numero) if first_line else ""
-                cuenta_cod = apunte.cuenta.codigo if apunte.cuenta else "???"
-                desc_cortada = (apunte.descripcion[:42] + '..') if len(apunte.descripcion) > 42 else apunte.descripcion
-                
-                print(f"{fecha_str:<12} {numero_str:<5} {cuenta_cod:<12} {desc_cortada:<45} {apunte.debe:>12.2f} {apunte.haber:>12.2f}")
-                first_line = False
+        asiento_actual = None
+        for linea in lineas:
+            first_line = linea.asiento_id != asiento_actual
+            if first_line and asiento_actual is not None:
+                print("-" * 105)
+            asiento_actual = linea.asiento_id
+            fecha_str = str(linea.fecha) if first_line else ""
+            numero_str = str(linea.numero) if first_line else ""
+            desc_cortada = (linea.descripcion[:42] + '..') if len(linea.descripcion) > 42 else linea.descripcion
+            
+            print(f"{fecha_str:<12} {numero_str:<5} {linea.cuenta_codigo:<12} {desc_cortada:<45} {linea.debe:>12.2f} {linea.haber:>12.2f}")
+        if asiento_actual is not None:
             print("-" * 105)
 
         # Saldos
         print("\n=== SALDOS ESPECÍFICOS ===\n")
         cuentas_interes = ['477', '430']
+        archivados = db.execute(
+            select(EjercicioFiscal.id).where(EjercicioFiscal.archivado.is_(True))
+        ).scalars().all()
         
         for codigo_busqueda in cuentas_interes:
             # Buscar cuentas que empiecen por el código (para incluir subcuentas como 430.0)
@@ -44,11 +55,35 @@ def ver_diario():
                 print(f"No se encontraron cuentas para el código base '{codigo_busqueda}'")
                 continue
                 
+            ids_cuentas = {c.id for c in cuentas}
+            # Un único agregado por cuenta, sumado en céntimos enteros en la propia
+            # base de datos; Decimal solo para mostrar el resultado.
+            totales = {
+                cuenta_id: [debe or 0, haber or 0]
+                for cuenta_id, debe, haber in db.execute(
+                    select(
+                        ApunteContable.cuenta_id,
+                        func.sum(centimos_sql(ApunteContable.debe)),
+                        func.sum(centimos_sql(ApunteContable.haber))
+                    )
+                    .where(ApunteContable.cuenta_id.in_(ids_cuentas))
+                    .group_by(ApunteContable.cuenta_id)
+                )
+            }
+
+            # Ejercicios archivados: sumas finales guardadas en su fichero
+            for ejercicio_id in archivados:
+                for cuenta_id, (debe, haber) in saldos_archivados(ejercicio_id).items():
+                    if cuenta_id in ids_cuentas:
+                        acumulado = totales.setdefault(cuenta_id, [0, 0])
+                        acumulado[0] += debe
+                        acumulado[1] += haber
+
             for cuenta in cuentas:
-                apuntes = db.query(ApunteContable).filter_by(cuenta_id=cuenta.id).all()
-                total_debe = sum(a.debe for a in apuntes)
-                total_haber = sum(a.haber for a in apuntes)
-                saldo = total_debe - total_haber
+                debe_centimos, haber_centimos = totales.get(cuenta.id, (0, 0))
+                total_debe = desde_centimos(debe_centimos)
+                total_haber = desde_centimos(haber_centimos)
+                saldo = desde_centimos(debe_centimos - haber_centimos)
                 
                 print(f"Cuenta {cuenta.codigo} - {cuenta.descripcion}")
                 print(f"  Debe: {total_debe:>10.2f} €")
@@ -0,0 +1,43 @@
+import sys
+import os
+import argparse
+import json
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import SessionLocal
+from app.services.integridad_service import IntegridadService
+
+def verificar_integridad(ejercicio_ids, workers: int):
+    """
+    Comprueba la integridad del libro y escribe el resultado en JSON Lines.
+
+    Una línea por incidencia y una línea final de resumen. Sale con código 1
+    si hay incidencias (apto para tareas programadas).
+    """
+    db = SessionLocal()
+    try:
+        resultado = IntegridadService(db).verificar(ejercicio_ids, workers=workers)
+    finally:
+        db.close()
+
+    for incidencia in resultado.incidencias:
+        print(json.dumps(incidencia.a_dict(), ensure_ascii=False))
+    print(json.dumps({
+        "resumen": {
+            "ejercicios_verificados": resultado.ejercicios_verificados,
+            "incidencias": len(resultado.incidencias),
+            "por_tipo": resultado.por_tipo(),
+        }
+    }, ensure_ascii=False))
+    if not resultado.valido:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comprueba la integridad de los datos contables.")
+    parser.add_argument("--ejercicio", type=int, action="append", dest="ejercicio_ids",
+                        help="Ejercicio a comprobar (repetible; por defecto, todos)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    verificar_integridad(args.ejercicio_ids, args.workers)